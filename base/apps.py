@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class BaseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'base'
+
+    def ready(self):
+        from django.conf import settings
+        from . import signals  # noqa: F401
+
+        if settings.SLOW_QUERY_LOG_ENABLED:
+            from study_companion_api import slow_queries
+            slow_queries.install()
@@ -0,0 +1,80 @@
+"""
+Message archival and the room history that reads across it.
+
+``Message`` grows without bound and every listing reads it. ``python
+manage.py archive_messages`` moves messages not updated for
+``MESSAGE_ARCHIVE_AFTER_DAYS`` into ``ArchivedMessage``, keeping their ids,
+in batches of ``--batch-size`` rows: each batch is locked, copied and
+deleted in one transaction, so a message is always in exactly one of the
+two tables and the archived copy is the last version. The
+hot table and its indexes then only hold recent messages.
+
+Archived messages are read-only. ``/api/messages/`` and ``/api/sync/`` only
+see the hot table; ``room_history`` pages newest-first by id over both.
+Soft-deleted messages and messages of deleted rooms are left to the purge
+job (base/soft_delete.py), which also clears a deleted room's archive.
+"""
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from base.models import ArchivedMessage, Message
+from base.profiles import invalidate_profiles
+from base.sync import tombstones_suppressed
+
+ARCHIVED_FIELDS = ['id', 'user_id', 'room_id', 'body', 'updated', 'created']
+
+
+def archive_cutoff(days):
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(older_than, batch_size):
+    """Move up to ``batch_size`` messages not updated since ``older_than``; returns the count."""
+    with transaction.atomic():
+        # Locked until the delete commits, so an edit can't land between the
+        # copy and the delete and be lost; rows being edited wait for a later batch
+        rows = list(
+            Message.objects.filter(updated__lt=older_than, room__deleted_at__isnull=True)
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by().values(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        ArchivedMessage.objects.bulk_create([ArchivedMessage(**row) for row in rows])
+        # Moved, not deleted: clients keep their copy, so no tombstones
+        with tombstones_suppressed():
+            Message.all_objects.filter(id__in=[row['id'] for row in rows]).delete()
+        # Profiles only list hot messages
+        invalidate_profiles(row['user_id'] for row in rows)
+    return len(rows)
+
+
+def archive(older_than, batch_size, max_batches=None, log=None):
+    log = log or (lambda message: None)
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(older_than, batch_size)
+        if not moved:
+            break
+        batches += 1
+        total += moved
+        log(f'{total} messages archived')
+    return total
+
+
+def room_history(room, before=None, limit=50):
+    """
+    The room's ``limit`` newest messages with an id below ``before``, from
+    the hot table and the archive merged. Ids are only compared, so a message
+    kept hot by a recent edit still sorts among its archived neighbours.
+    """
+    hot = Message.objects.filter(room=room).select_related('user').order_by('-id')
+    archived = ArchivedMessage.objects.filter(room=room).select_related('user').order_by('-id')
+    if before is not None:
+        hot, archived = hot.filter(id__lt=before), archived.filter(id__lt=before)
+    merged = heapq.merge(hot[:limit], archived[:limit], key=lambda message: -message.id)
+    return list(islice(merged, limit))
@@ -0,0 +1,97 @@
+"""
+/api/feed/: recent messages from the rooms a user participates in.
+
+Fan-out on read. Each room keeps its ``FEED_ROOM_CACHE_SIZE`` newest
+message ids in the ``feed`` cache. ``create_message`` and the bulk endpoint
+prepend to it after commit. A feed request looks up the user's rooms, reads
+every room's list in one ``get_many`` and merges them by id. Rooms missing
+from the cache are filled with one windowed query (the newest N per room,
+served by the ``room_id`` index), never a scan of the message table.
+Writes cost one cache update however many participants a room has.
+
+Concurrent writers to one room can lose each other's prepend; entries
+expire after ``FEED_CACHE_TIMEOUT`` seconds, which bounds how long a
+message can be missing. Deleted messages are dropped when the page is
+loaded, so a page can be shorter than ``limit``; follow ``next`` regardless.
+"""
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from base.models import Message, Room
+
+
+def room_key(room_id):
+    return f'feed:room:{room_id}'
+
+
+def newest_ids(room_ids, count, before=None):
+    """The ``count`` newest message ids of each room (newest first), in one query."""
+    messages = Message.objects.filter(room_id__in=room_ids)
+    if before is not None:
+        messages = messages.filter(id__lt=before)
+    rows = messages.annotate(
+        rank=Window(RowNumber(), partition_by=F('room_id'), order_by=F('id').desc())
+    ).filter(rank__lte=count).order_by('room_id', '-id').values_list('room_id', 'id')
+    ids = {room_id: [] for room_id in room_ids}
+    for room_id, message_id in rows:
+        ids[room_id].append(message_id)
+    return ids
+
+
+def cached_ids(room_ids):
+    """Each room's cached newest ids, filling misses from the database."""
+    cache = caches['feed']
+    keys = {room_key(room_id): room_id for room_id in room_ids}
+    found = cache.get_many(keys)
+    ids = {keys[key]: value for key, value in found.items()}
+    missing = [room_id for room_id in room_ids if room_id not in ids]
+    if missing:
+        loaded = newest_ids(missing, settings.FEED_ROOM_CACHE_SIZE)
+        cache.set_many({room_key(room_id): value for room_id, value in loaded.items()}, settings.FEED_CACHE_TIMEOUT)
+        ids.update(loaded)
+    return ids
+
+
+def remember_messages(room_id, message_ids):
+    """Prepend new messages to the room's cached ids once the transaction commits."""
+    def update():
+        cache = caches['feed']
+        key = room_key(room_id)
+        current = cache.get(key)
+        if current is None:
+            # The next read loads it with these messages included
+            return
+        newest = sorted(message_ids, reverse=True) + current
+        cache.set(key, newest[:settings.FEED_ROOM_CACHE_SIZE], settings.FEED_CACHE_TIMEOUT)
+    transaction.on_commit(update)
+
+
+def feed_page(user, before=None, limit=50):
+    """
+    Ids of the ``limit`` newest messages below ``before`` in ``user``'s
+    rooms, and the cursor for the next page (``None`` on the last one).
+    """
+    room_ids = list(Room.objects.filter(participants=user).order_by().values_list('id', flat=True))
+    if not room_ids:
+        return [], None
+    ids = cached_ids(room_ids)
+
+    # A full cached list may stop short of ``before``; read those rooms deeper
+    deep = []
+    for room_id, cached in ids.items():
+        if before is not None:
+            ids[room_id] = [message_id for message_id in cached if message_id < before]
+        if len(ids[room_id]) < limit and len(cached) >= settings.FEED_ROOM_CACHE_SIZE:
+            deep.append(room_id)
+    if deep:
+        ids.update(newest_ids(deep, limit, before))
+
+    page = list(islice(heapq.merge(*ids.values(), reverse=True), limit))
+    return page, page[-1] if len(page) == limit else None
+
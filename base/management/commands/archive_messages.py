@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from base.archive import archive, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        'Move messages not updated for MESSAGE_ARCHIVE_AFTER_DAYS into the archive table, '
+        'in bounded batches. Run it from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=settings.MESSAGE_ARCHIVE_AFTER_DAYS,
+            help='Archive messages not updated for this many days',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.MESSAGE_ARCHIVE_BATCH_SIZE,
+            help='Messages moved per transaction',
+        )
+        parser.add_argument(
+            '--max-batches', type=int, default=None,
+            help='Stop after this many batches; the next run carries on',
+        )
+
+    def handle(self, *args, **options):
+        log = self.stdout.write if options['verbosity'] > 1 else None
+        count = archive(
+            archive_cutoff(options['older_than_days']),
+            options['batch_size'],
+            max_batches=options['max_batches'],
+            log=log,
+        )
+        self.stdout.write(f'Archived {count} messages.')
@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+# What a preloaded gunicorn master imports (see study_companion_api/preload.py)
+WARM_UP = (
+    'import study_companion_api.asgi\n'
+    'from study_companion_api.preload import warm_up\n'
+    'warm_up()\n'
+)
+
+
+def parse_importtime(output):
+    """Return (module, self_us, cumulative_us, depth) tuples from ``-X importtime`` output."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def entry_points(modules):
+    """
+    (module, importer, cumulative_us) for each import that enters a new
+    top-level package, heaviest first. Children are listed before their
+    parent, so a module's importer is the next entry one level shallower.
+    """
+    importers = [None] * len(modules)
+    pending = {}
+    for index, (name, _, _, depth) in enumerate(modules):
+        for child in pending.pop(depth + 1, []):
+            importers[child] = name
+        pending.setdefault(depth, []).append(index)
+
+    edges = [
+        (name, importer, cumulative_us)
+        for (name, _, cumulative_us, _), importer in zip(modules, importers)
+        if importer is None or importer.split('.')[0] != name.split('.')[0]
+    ]
+    return sorted(edges, key=lambda edge: -edge[2])
+
+
+class Command(BaseCommand):
+    help = 'Audit import time of the application as a gunicorn worker loads it (python -X importtime).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help='Number of rows in each table.')
+        parser.add_argument('--module', help='Import only this module after django.setup() instead of the app.')
+
+    def handle(self, *args, **options):
+        script = f'import {options["module"]}\n' if options['module'] else WARM_UP
+        script = 'import django\ndjango.setup()\n' + script
+        # A fresh interpreter, so nothing is already imported by manage.py
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            'DJANGO_SETTINGS_MODULE', 'study_companion_api.settings'
+        ))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            capture_output=True, text=True, env=env,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+
+        modules = parse_importtime(result.stderr)
+        limit = options['limit']
+        total = sum(cumulative for _, _, cumulative, depth in modules if depth == 0)
+        self.stdout.write(f'{len(modules)} modules imported in {total / 1000:.1f} ms\n')
+
+        packages = defaultdict(lambda: [0, 0])
+        for name, self_us, _, _ in modules:
+            package = packages[name.split('.')[0]]
+            package[0] += self_us
+            package[1] += 1
+        self.stdout.write(f"{'self ms':>9}  {'modules':>7}  package")
+        for name, (self_us, count) in sorted(packages.items(), key=lambda item: -item[1][0])[:limit]:
+            self.stdout.write(f'{self_us / 1000:>9.1f}  {count:>7}  {name}')
+
+        # A dependency's time is charged to whichever module imported it
+        # first; list the edges where one package pulls in another
+        self.stdout.write(f"\n{'cum. ms':>9}  package <- first imported by")
+        for name, importer, cumulative_us in entry_points(modules)[:limit]:
+            self.stdout.write(f'{cumulative_us / 1000:>9.1f}  {name} <- {importer or "(top level)"}')
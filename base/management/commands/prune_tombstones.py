@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from base.models import Tombstone
+from base.sync import tombstone_horizon
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS. '
+        'Clients with older tokens get 410 from /api/sync/ and resync in full.'
+    )
+
+    def handle(self, *args, **options):
+        count, _ = Tombstone.objects.filter(deleted__lt=tombstone_horizon()).delete()
+        self.stdout.write(f'Pruned {count} tombstones.')
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from base.soft_delete import purge, purge_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        'Hard-delete rooms and messages soft-deleted more than '
+        'SOFT_DELETE_PURGE_AFTER_HOURS ago, in bounded batches. Run it from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-hours', type=int, default=settings.SOFT_DELETE_PURGE_AFTER_HOURS,
+            help='Only purge rows deleted at least this many hours ago',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.SOFT_DELETE_PURGE_BATCH_SIZE,
+            help='Rows deleted per statement and transaction',
+        )
+        parser.add_argument(
+            '--max-batches', type=int, default=None,
+            help='Stop after this many batches; the next run carries on',
+        )
+
+    def handle(self, *args, **options):
+        log = self.stdout.write if options['verbosity'] > 1 else None
+        counts = purge(
+            purge_cutoff(options['older_than_hours']),
+            options['batch_size'],
+            max_batches=options['max_batches'],
+            log=log,
+        )
+        self.stdout.write(
+            f"Purged {counts['messages']} messages, {counts['participants']} participants "
+            f"and {counts['rooms']} rooms."
+        )
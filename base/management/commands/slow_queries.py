@@ -0,0 +1,43 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from study_companion_api import slow_queries
+
+
+class Command(BaseCommand):
+    help = (
+        'Show the slowest query fingerprints by total time over the last '
+        'SLOW_QUERY_WINDOW_BUCKETS intervals (see study_companion_api/slow_queries.py).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help='Number of fingerprints to show.')
+        parser.add_argument('--sql', action='store_true', help='Print the full normalized SQL of each entry.')
+        parser.add_argument('--reset', action='store_true', help='Clear the table.')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            slow_queries.reset()
+            self.stdout.write('Slow-query table cleared.')
+            return
+
+        entries = slow_queries.top_queries(options['limit'])
+        if not entries:
+            self.stdout.write('No slow queries recorded.')
+            return
+
+        self.stdout.write(
+            f"{'fingerprint':<12}  {'total ms':>10}  {'count':>6}  {'avg ms':>8}  {'max ms':>8}  view / field"
+        )
+        for entry in entries:
+            origin = entry['view'] or '-'
+            if entry['field']:
+                origin += f" / {entry['field']}"
+            self.stdout.write(
+                f"{entry['fingerprint']:<12}  {entry['total_ms']:>10.1f}  {entry['count']:>6}  "
+                f"{entry['total_ms'] / entry['count']:>8.1f}  {entry['max_ms']:>8.1f}  {origin}"
+            )
+            last_seen = datetime.datetime.fromtimestamp(entry['last_seen'], datetime.timezone.utc)
+            sql = entry['sql'] if options['sql'] else entry['sql'][:120]
+            self.stdout.write(f"    last seen {last_seen:%Y-%m-%d %H:%M:%S} UTC  {sql}")
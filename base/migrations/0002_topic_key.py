@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0001_initial'),
+    ]
+
+    # Nullable until 0002_topic_key_backfill fills it; made unique by
+    # 0002_topic_key_unique. Separate migrations so the backfill's updates and
+    # deletes commit before PostgreSQL alters the table again
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='key',
+            field=models.CharField(editable=False, max_length=200, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def normalize(name):
+    return ' '.join(name.split()).casefold()
+
+
+def populate_topic_keys(apps, schema_editor):
+    """Fill Topic.key and merge topics whose names only differ by case/spacing."""
+    Topic = apps.get_model('base', 'Topic')
+    Room = apps.get_model('base', 'Room')
+
+    kept = {}
+    for topic in Topic.objects.order_by('id'):
+        key = normalize(topic.name)
+        if key in kept:
+            Room.objects.filter(topic_id=topic.id).update(topic_id=kept[key])
+            topic.delete()
+        else:
+            kept[key] = topic.id
+            Topic.objects.filter(id=topic.id).update(key=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0002_topic_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_topic_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0002_topic_key_backfill'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='topic',
+            name='key',
+            field=models.CharField(editable=False, max_length=200, unique=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_room_counts(apps, schema_editor):
+    Topic = apps.get_model('base', 'Topic')
+    for topic in Topic.objects.annotate(rooms=Count('room')).filter(rooms__gt=0):
+        Topic.objects.filter(id=topic.id).update(room_count=topic.rooms)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0002_topic_key_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='room_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_room_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['-room_count', 'name'], name='topic_popularity_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_topic_room_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['-updated', '-created'], name='message_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['-updated', '-created'], name='room_recent_idx'),
+        ),
+    ]
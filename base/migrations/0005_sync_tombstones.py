@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_recent_activity_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('room', 'Room'), ('message', 'Message'), ('topic', 'Topic')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['deleted'], name='tombstone_deleted_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0005_sync_tombstones'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='message',
+            name='message_recent_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='room',
+            name='room_recent_idx',
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['-updated', '-created'], name='message_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='message_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['-updated', '-created'], name='room_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='room_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0006_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('body', models.TextField()),
+                ('updated', models.DateTimeField()),
+                ('created', models.DateTimeField()),
+                ('room', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='base.room')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['room', '-id'], name='archived_room_history_idx')],
+            },
+        ),
+    ]
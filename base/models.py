@@ -1,8 +1,12 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import AbstractUser
 
 # Create your models here.
 
+# Largest id a BigAutoField (DEFAULT_AUTO_FIELD) can hold
+MAX_ID = 2 ** 63 - 1
+
 class User(AbstractUser):
     name = models.CharField(max_length=200, null=True)
     email = models.EmailField(unique=True, null=False, blank=False)
@@ -13,12 +17,42 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
+def normalize_topic_name(name):
+    """Case- and whitespace-insensitive key used to deduplicate topics."""
+    return ' '.join(name.split()).casefold()
+
 class Topic(models.Model):
     name = models.CharField(max_length=200)
+    key = models.CharField(max_length=200, unique=True, editable=False)
+    # Maintained by base.signals / base.topics.adjust_room_counts
+    room_count = models.PositiveIntegerField(default=0, editable=False)
+    # Also bumped with room_count, so /api/sync/ picks up new counts
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-room_count', 'name'], name='topic_popularity_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.key = normalize_topic_name(self.name)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
+class LiveManager(models.Manager):
+    """
+    Default manager that hides soft-deleted rows (``deleted_at`` set).
+    ``all_objects`` still sees them; related-object access (``message.room``)
+    goes through the unfiltered base manager. Messages of a soft-deleted room
+    stay live until purged; views listing messages across rooms filter on
+    ``room__deleted_at``. See base/soft_delete.py.
+    """
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Room(models.Model):
     host = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     topic = models.ForeignKey(Topic, on_delete=models.SET_NULL, null=True)
@@ -27,9 +61,19 @@ class Room(models.Model):
     participants = models.ManyToManyField(User, related_name='participants', blank=True)
     updated = models.DateTimeField(auto_now=True)
     created = models.DateTimeField(auto_now_add=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ['-updated', '-created']
+        indexes = [
+            models.Index(
+                fields=['-updated', '-created'], name='room_recent_idx', condition=Q(deleted_at__isnull=True)
+            ),
+            models.Index(fields=['deleted_at'], name='room_deleted_idx', condition=Q(deleted_at__isnull=False)),
+        ]
 
     def __str__(self):
         return self.name
@@ -40,13 +84,67 @@ class Message(models.Model):
     body = models.TextField()
     updated = models.DateTimeField(auto_now=True)
     created = models.DateTimeField(auto_now_add=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     class Meta:
-        ordering = ['-updated', '-created'] 
+        ordering = ['-updated', '-created']
+        indexes = [
+            models.Index(
+                fields=['-updated', '-created'], name='message_recent_idx', condition=Q(deleted_at__isnull=True)
+            ),
+            models.Index(fields=['deleted_at'], name='message_deleted_idx', condition=Q(deleted_at__isnull=False)),
+        ]
 
     def __str__(self):
         return self.body[0:50]
 
 
-    
-    
\ No newline at end of file
+class ArchivedMessage(models.Model):
+    """
+    A message moved out of ``Message`` by ``manage.py archive_messages`` once
+    it is older than ``MESSAGE_ARCHIVE_AFTER_DAYS``, keeping its id. Read
+    back through /api/rooms/<id>/messages/history/ (see base/archive.py).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Covered by archived_room_history_idx
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, db_index=False)
+    body = models.TextField()
+    updated = models.DateTimeField()
+    created = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['room', '-id'], name='archived_room_history_idx'),
+        ]
+
+    def __str__(self):
+        return self.body[0:50]
+
+
+class Tombstone(models.Model):
+    """
+    Records a deleted room, message or topic so /api/sync/ can tell clients
+    to drop it. Written by base.signals; pruned by ``manage.py
+    prune_tombstones`` after ``SYNC_TOMBSTONE_RETENTION_DAYS``.
+    """
+    ROOM = 'room'
+    MESSAGE = 'message'
+    TOPIC = 'topic'
+    KIND_CHOICES = [(ROOM, 'Room'), (MESSAGE, 'Message'), (TOPIC, 'Topic')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}'
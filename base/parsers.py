@@ -0,0 +1,38 @@
+import codecs
+import io
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """
+    ``JSONParser`` that decodes UTF-8 bodies with orjson when it is installed.
+
+    orjson rejects ``NaN``/``Infinity`` as DRF's strict mode does. Other
+    encodings, and bodies orjson refuses (including invalid JSON, so the
+    error message stays the same), are handed to ``JSONParser``. Unlike the
+    stdlib, orjson reads integers beyond 64 bits as floats; no field in this
+    API accepts such values.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
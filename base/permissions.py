@@ -0,0 +1,19 @@
+import hmac
+
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+
+class HasMetricsToken(BasePermission):
+    """
+    Allows access with an ``X-Metrics-Token`` header matching
+    ``settings.METRICS_TOKEN``, so a Prometheus scraper doesn't need a JWT.
+    Always denies when no token is configured.
+    """
+
+    def has_permission(self, request, view):
+        expected = settings.METRICS_TOKEN
+        provided = request.headers.get('X-Metrics-Token')
+        if not expected or not provided:
+            return False
+        return hmac.compare_digest(provided.encode(), expected.encode())
@@ -0,0 +1,107 @@
+"""
+User profiles for /api/users/<pk>/profile/.
+
+A profile is the user, the number of live rooms they host and have joined
+and their ``PROFILE_RECENT_MESSAGES`` newest messages. Building one costs
+two indexed queries: the user row with both counts as correlated
+subqueries (``host_id`` and ``room_participants.user_id`` indexes), and
+the newest messages by ``user_id``. Only the serialized response is kept
+in the 'profiles' cache, for ``PROFILE_CACHE_TIMEOUT`` seconds; the view
+makes the avatar URL absolute per request.
+
+Entries are dropped after commit by ``invalidate_profiles``: from
+base.signals for saved users, new rooms and messages and participant
+changes, and explicitly from the write paths that bypass signals (bulk
+messages, message soft deletes, archival). Deleting rooms touches the
+counts and messages of every participant and author; rather than list
+them, ``invalidate_all_profiles`` starts a new key generation.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from base.models import Message, Room, User
+from base.serializers import ProfileMessageSerializer, UserSerializer
+
+GENERATION_KEY = 'profile:generation'
+
+
+def generation(cache):
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        # Never set or evicted: start one that no cached profile belongs to
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        value = cache.get(GENERATION_KEY)
+    return value
+
+
+def profile_key(user_id, generation):
+    return f'profile:{generation}:{user_id}'
+
+
+def _count(queryset, field):
+    counts = queryset.order_by().values(field).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def profile_user(user_id):
+    """The user row of a profile, with both room counts annotated."""
+    Participant = Room.participants.through
+    return User.objects.filter(pk=user_id).annotate(
+        rooms_hosted=_count(Room.objects.filter(host=OuterRef('pk')), 'host'),
+        rooms_joined=_count(
+            Participant.objects.filter(user=OuterRef('pk'), room__deleted_at__isnull=True), 'user'
+        ),
+    )
+
+
+def recent_messages(user_id):
+    """The newest messages of a profile, in live rooms only."""
+    messages = Message.objects.filter(user=user_id, room__deleted_at__isnull=True)
+    return messages.order_by('-id')[:settings.PROFILE_RECENT_MESSAGES]
+
+
+def build_profile(user_id):
+    """The profile of ``user_id`` from the database, or ``None`` if there is no such user."""
+    user = profile_user(user_id).first()
+    if user is None:
+        return None
+    messages = recent_messages(user.pk)
+    # Serialized without a request: the avatar URL is made absolute by the view
+    profile = dict(UserSerializer(user).data)
+    profile['rooms_hosted'] = user.rooms_hosted
+    profile['rooms_joined'] = user.rooms_joined
+    profile['recent_messages'] = ProfileMessageSerializer(messages, many=True).data
+    return profile
+
+
+def get_profile(user_id):
+    cache = caches['profiles']
+    key = profile_key(user_id, generation(cache))
+    profile = cache.get(key)
+    if profile is None:
+        profile = build_profile(user_id)
+        if profile is not None:
+            cache.set(key, profile, settings.PROFILE_CACHE_TIMEOUT)
+    return profile
+
+
+def invalidate_profiles(user_ids):
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+
+    def delete():
+        cache = caches['profiles']
+        current = generation(cache)
+        cache.delete_many([profile_key(user_id, current) for user_id in user_ids])
+
+    if user_ids:
+        transaction.on_commit(delete)
+
+
+def invalidate_all_profiles():
+    """Drop every cached profile after commit; the old entries expire unread."""
+    transaction.on_commit(lambda: caches['profiles'].set(GENERATION_KEY, time.time_ns(), timeout=None))
@@ -0,0 +1,38 @@
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` that encodes with orjson when it is installed.
+
+    The output is byte-for-byte what DRF's renderer produces for API
+    payloads: compact separators, UTF-8 rather than ``\\u`` escapes, ``Z``
+    for UTC datetimes, ``\\u2028``/``\\u2029`` escaped. Anything orjson
+    doesn't know (Decimal, lazy translations, querysets, ...) goes through
+    DRF's ``JSONEncoder.default``. Indented output (the browsable API,
+    ``Accept: application/json; indent=4``), non-default JSON settings and
+    values orjson rejects, such as integers beyond 64 bits, are rendered by
+    ``JSONRenderer`` itself. Floats are the one difference: orjson writes
+    ``1e16`` where the stdlib writes ``1e+16``, and NaN as ``null``.
+    """
+    options = orjson.OPT_UTC_Z if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safe escaping as JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,234 @@
+"""
+Synthetic dataset generation for benchmarks and local reproduction of
+production scale (``python manage.py seed``).
+
+Distributions are chosen to look like real usage rather than uniform noise:
+
+* topic popularity follows a Zipf law, so a few topics hold most rooms;
+* room sizes follow a Pareto (power-law) distribution: most rooms have a
+  handful of participants, a few have hundreds (capped at ``ROOM_SIZE_MAX``);
+* messages go to rooms in proportion to their size and are written by the
+  room's participants;
+* message timestamps come in bursts (a conversation of several messages
+  seconds apart) scattered over the last ``days`` days.
+
+Users, topics and rooms are inserted with chunked ``bulk_create``;
+participants (the m2m through table) and messages, which make up nearly all
+rows, with raw chunked ``executemany``. Everything runs in one transaction. Every user's password is ``PASSWORD``.
+"""
+import random
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from base.models import Message, Room, Topic, User, normalize_topic_name
+
+SCALES = {
+    'small': {'users': 200, 'topics': 20, 'rooms': 500, 'messages': 10_000},
+    'medium': {'users': 2_000, 'topics': 100, 'rooms': 5_000, 'messages': 100_000},
+    'large': {'users': 10_000, 'topics': 300, 'rooms': 50_000, 'messages': 1_000_000},
+}
+
+PASSWORD = 'seed-password'
+CHUNK_SIZE = 5_000
+
+# Zipf exponent for topic popularity
+TOPIC_SKEW = 1.1
+# Pareto shape and scale for room sizes: median ~3 participants, long tail
+ROOM_SIZE_ALPHA = 1.3
+ROOM_SIZE_MIN = 2
+ROOM_SIZE_MAX = 1_000
+# Messages per burst (mean) and seconds between messages within a burst (mean)
+BURST_LENGTH = 8
+BURST_GAP_SECONDS = 40
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Let ``bulk_create`` store the given ``created``/``updated`` values.
+
+    ``auto_now``/``auto_now_add`` fields overwrite any value on insert; this
+    switches them off for the duration of the block. Only meant for
+    single-purpose processes such as the seed command.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def burst_times(rng, count, begin, end):
+    """``count`` timestamps between ``begin`` and ``end``, grouped in bursts."""
+    span = (end - begin).total_seconds()
+    times = []
+    while len(times) < count:
+        moment = begin + timedelta(seconds=span * rng.random())
+        length = min(count - len(times), 1 + int(rng.expovariate(1 / BURST_LENGTH)))
+        for _ in range(length):
+            times.append(min(moment, end))
+            moment += timedelta(seconds=rng.expovariate(1 / BURST_GAP_SECONDS))
+    times.sort()
+    return times
+
+
+def insert_rows(model, fields, rows, chunk_size):
+    """Raw ``executemany`` INSERT of ``rows`` (tuples of db-ready values) into ``model``'s table."""
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(model._meta.get_field(name).column) for name in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    with connection.cursor() as cursor:
+        for chunk in chunked(rows, chunk_size):
+            cursor.executemany(sql, chunk)
+
+
+def free_topic_names(count):
+    """``count`` names ``Topic <n>`` whose keys no existing topic uses."""
+    taken = set(Topic.objects.filter(key__startswith='topic ').values_list('key', flat=True))
+    names = []
+    number = 0
+    while len(names) < count:
+        number += 1
+        name = f'Topic {number}'
+        if normalize_topic_name(name) not in taken:
+            names.append(name)
+    return names
+
+
+def seed(users, topics, rooms, messages, days=90, seed_value=0, chunk_size=CHUNK_SIZE, log=None):
+    """Add a synthetic dataset to the database and return the row counts."""
+    if messages and not rooms:
+        raise ValueError('Messages need at least one room.')
+    log = log or (lambda message: None)
+    rng = random.Random(seed_value)
+    now = timezone.now()
+    begin = now - timedelta(days=days)
+
+    def moment(after=begin):
+        return after + (now - after) * rng.random()
+
+    with transaction.atomic(), explicit_timestamps(Room):
+        # Names continue after existing rows, so seeding twice doesn't collide
+        offset = User.objects.aggregate(last=Max('id'))['last'] or 0
+        password = make_password(PASSWORD)
+        user_ids = []
+        for chunk in chunked((
+            User(
+                username=f'user{offset + i}',
+                email=f'user{offset + i}@example.com',
+                name=f'User {offset + i}',
+                password=password,
+                date_joined=moment(),
+            )
+            for i in range(1, users + 1)
+        ), chunk_size):
+            user_ids += [user.id for user in User.objects.bulk_create(chunk)]
+        log(f'{len(user_ids)} users')
+
+        # Topic keys are unique and may be taken by real topics (or renamed ones)
+        names = free_topic_names(topics)
+        topic_ids = [
+            topic.id for topic in Topic.objects.bulk_create(
+                [Topic(name=name, key=normalize_topic_name(name)) for name in names],
+                batch_size=chunk_size,
+            )
+        ]
+        log(f'{len(topic_ids)} topics')
+
+        topic_weights = list(accumulate(1 / rank ** TOPIC_SKEW for rank in range(1, topics + 1)))
+        room_topics = rng.choices(topic_ids, cum_weights=topic_weights, k=rooms)
+        room_members = []
+        room_objects = []
+        for i in range(rooms):
+            size = min(len(user_ids), ROOM_SIZE_MAX, int(ROOM_SIZE_MIN * rng.paretovariate(ROOM_SIZE_ALPHA)))
+            members = rng.sample(user_ids, size)
+            created = moment()
+            room_members.append(members)
+            room_objects.append(Room(
+                host_id=members[0],
+                topic_id=room_topics[i],
+                name=f'Study room {i + 1}',
+                description=f'Study group number {i + 1}',
+                created=created,
+                updated=created,
+            ))
+        room_ids = []
+        for chunk in chunked(room_objects, chunk_size):
+            room_ids += [room.id for room in Room.objects.bulk_create(chunk)]
+        log(f'{len(room_ids)} rooms')
+
+        insert_rows(
+            Room.participants.through,
+            ('room', 'user'),
+            ((room_id, user_id) for room_id, members in zip(room_ids, room_members) for user_id in members),
+            chunk_size,
+        )
+        participants = sum(len(members) for members in room_members)
+        log(f'{participants} participants')
+
+        # Bigger rooms are busier. choices() fails on no rooms even for k=0
+        per_room = Counter()
+        if messages:
+            per_room.update(rng.choices(range(rooms), weights=[len(m) for m in room_members], k=messages))
+
+        adapt = connection.ops.adapt_datetimefield_value
+
+        def generate_messages():
+            for index, count in per_room.items():
+                members = room_members[index]
+                room_id = room_ids[index]
+                for i, created in enumerate(burst_times(rng, count, room_objects[index].created, now)):
+                    created = adapt(created)
+                    yield (rng.choice(members), room_id, f'Message {i + 1} in study room {index + 1}', created, created)
+
+        # Raw inserts: building and compiling a million model instances would dominate the run
+        insert_rows(Message, ('user', 'room', 'body', 'created', 'updated'), generate_messages(), chunk_size)
+        log(f'{messages} messages')
+
+        # Bulk and raw inserts bypass the model signals and auto_now fields
+        if room_ids:
+            latest = Message.objects.filter(room=OuterRef('pk')).order_by().values('room').annotate(
+                last=Max('updated')
+            ).values('last')
+            Room.objects.filter(id__gte=room_ids[0]).update(updated=Coalesce(Subquery(latest), F('updated')))
+        room_count = Room.objects.filter(topic=OuterRef('pk')).order_by().values('topic').annotate(
+            count=Count('*')
+        ).values('count')
+        Topic.objects.update(room_count=Coalesce(Subquery(room_count), Value(0), output_field=IntegerField()))
+
+    return {
+        'users': users,
+        'topics': topics,
+        'rooms': rooms,
+        'participants': participants,
+        'messages': messages,
+    }
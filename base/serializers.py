@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from base.models import Room, Topic, Message, User
+from base.models import MAX_ID, Room, Topic, Message, User
 from django.contrib.auth.password_validation import validate_password
 from rest_framework.validators import UniqueValidator
 from django.conf import settings
@@ -70,7 +70,7 @@ class RegisterSerializer(serializers.ModelSerializer):
 class TopicSerializer(serializers.ModelSerializer):
     class Meta:
         model = Topic
-        fields = '__all__'
+        fields = ['id', 'name', 'room_count']
 
 
 class RoomSerializer(serializers.ModelSerializer):
@@ -80,7 +80,7 @@ class RoomSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Room
-        fields = '__all__'
+        exclude = ['deleted_at']
         extra_kwargs = {
             'topic': {'required': True},
             'name': {'required': True}
@@ -92,13 +92,44 @@ class RoomSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class RoomBatchUpdateSerializer(serializers.Serializer):
+    """One entry of a batch room update: the room id plus the fields to change."""
+    id = serializers.IntegerField(min_value=1, max_value=MAX_ID)
+    name = serializers.CharField(max_length=200, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    topic = serializers.CharField(max_length=200, required=False)
+
+    def validate_topic(self, value):
+        value = value.strip()
+        if not value:
+            raise serializers.ValidationError('Topic cannot be empty')
+        return value
+
+
 class MessageSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     room = RoomSerializer(read_only=True)
     
     class Meta:
         model = Message
-        fields = '__all__'
+        exclude = ['deleted_at']
+
+
+class MessageSummarySerializer(serializers.ModelSerializer):
+    """Message with the room as a plain id, returned from write endpoints."""
+    user = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Message
+        fields = ['id', 'user', 'room', 'body', 'updated', 'created']
+
+
+class ProfileMessageSerializer(serializers.ModelSerializer):
+    """Message on its author's profile, so without the nested user."""
+
+    class Meta:
+        model = Message
+        fields = ['id', 'room', 'body', 'updated', 'created']
 
 
 class UserUpdateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,70 @@
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_migrate, post_save
+from django.dispatch import receiver
+
+from base.models import Message, Room, Topic, User
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def invalidate_topic_cache(sender, instance, **kwargs):
+    from base.topics import topic_cache
+    topic_cache.discard(instance.key, instance.id)
+
+
+@receiver(post_migrate)
+def reset_topic_cache(sender, **kwargs):
+    # Also sent after `flush`, which would otherwise leave stale ids cached
+    from base.topics import topic_cache
+    topic_cache.clear()
+
+
+@receiver(post_init, sender=Room)
+def remember_room_topic(sender, instance, **kwargs):
+    instance._saved_topic_id = instance.topic_id
+
+
+@receiver(post_save, sender=Room)
+def count_saved_room(sender, instance, created, **kwargs):
+    from base.topics import adjust_room_counts
+    previous = None if created else instance._saved_topic_id
+    if previous != instance.topic_id:
+        adjust_room_counts({previous: -1, instance.topic_id: 1})
+    instance._saved_topic_id = instance.topic_id
+
+
+@receiver(post_delete, sender=Room)
+def count_deleted_room(sender, instance, **kwargs):
+    from base.topics import adjust_room_counts
+    # Soft-deleted rooms were uncounted when they were deleted
+    if instance.deleted_at is None:
+        adjust_room_counts({instance.topic_id: -1})
+
+
+@receiver(post_delete, sender=Room)
+@receiver(post_delete, sender=Message)
+@receiver(post_delete, sender=Topic)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    from base.sync import record_deletion
+    record_deletion(instance, origin)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_profile(sender, instance, **kwargs):
+    from base.profiles import invalidate_profiles
+    invalidate_profiles([instance.pk])
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_save, sender=Message)
+def invalidate_author_profile(sender, instance, created, **kwargs):
+    from base.profiles import invalidate_profiles
+    if created:
+        invalidate_profiles([instance.host_id if sender is Room else instance.user_id])
+
+
+@receiver(m2m_changed, sender=Room.participants.through)
+def invalidate_participant_profiles(sender, instance, action, reverse, pk_set, **kwargs):
+    from base.profiles import invalidate_profiles
+    if action in ('post_add', 'post_remove'):
+        invalidate_profiles([instance.pk] if reverse else pk_set)
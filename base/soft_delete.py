@@ -0,0 +1,106 @@
+"""
+Soft delete for rooms and messages, and the purge job that removes them.
+
+Deleting a room used to cascade over all of its messages and participant
+rows inside the request. Now the request only sets ``deleted_at`` (one
+UPDATE, whatever the room's size), writes the sync tombstone and adjusts
+the topic's room count. The default managers hide soft-deleted rooms and
+messages (see ``LiveManager`` in base/models.py); views listing messages
+across rooms also skip those of soft-deleted rooms. Tombstones and counts
+follow the rows actually updated, which are locked first, so deleting an
+already deleted or missing id is a no-op.
+
+``python manage.py purge_deleted`` later hard-deletes rows soft-deleted
+more than ``SOFT_DELETE_PURGE_AFTER_HOURS`` ago, in batches of at most
+``--batch-size`` rows per statement and transaction: messages (hot and
+archived) first, then participant rows, then the emptied rooms.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from base.models import ArchivedMessage, Message, Room, Tombstone
+from base.profiles import invalidate_all_profiles, invalidate_profiles
+from base.sync import record_deletions, tombstones_suppressed
+from base.topics import adjust_room_counts
+
+
+def soft_delete_rooms(room_ids):
+    """Soft-delete live rooms by id; their messages disappear with them."""
+    with transaction.atomic():
+        # Locked, so a concurrent delete of the same room can't count it twice
+        rooms = Room.objects.filter(id__in=room_ids).select_for_update().order_by()
+        rows = list(rooms.values_list('id', 'topic_id'))
+        room_ids = [room_id for room_id, _ in rows]
+        if not room_ids:
+            return
+        # Every participant's and author's profile changes; listing them would
+        # make the delete as large as the room again
+        invalidate_all_profiles()
+        Room.objects.filter(id__in=room_ids).update(deleted_at=timezone.now())
+        record_deletions(Tombstone.ROOM, room_ids)
+        topic_counts = Counter(topic_id for _, topic_id in rows)
+        adjust_room_counts({topic_id: -count for topic_id, count in topic_counts.items()})
+
+
+def soft_delete_messages(message_ids):
+    with transaction.atomic():
+        messages = Message.objects.filter(id__in=message_ids).select_for_update().order_by()
+        rows = list(messages.values_list('id', 'user_id'))
+        message_ids = [message_id for message_id, _ in rows]
+        if not message_ids:
+            return
+        invalidate_profiles(user_id for _, user_id in rows)
+        Message.objects.filter(id__in=message_ids).update(deleted_at=timezone.now())
+        record_deletions(Tombstone.MESSAGE, message_ids)
+
+
+def _delete_batch(queryset, batch_size):
+    ids = list(queryset.order_by().values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return 0
+    with transaction.atomic():
+        queryset.model._base_manager.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def purge(older_than, batch_size, max_batches=None, log=None):
+    """
+    Hard-delete rows soft-deleted before ``older_than``, ``batch_size`` rows
+    per statement. Stops after ``max_batches`` batches if given, so a cron
+    run has a bounded duration; the next run continues. Returns row counts.
+    """
+    log = log or (lambda message: None)
+    Participant = Room.participants.through
+    stages = [
+        # Two passes rather than an OR across the join, so each uses an index
+        ('messages', Message.all_objects.filter(deleted_at__lt=older_than)),
+        ('messages', Message.all_objects.filter(room__deleted_at__lt=older_than)),
+        ('messages', ArchivedMessage.objects.filter(room__deleted_at__lt=older_than)),
+        ('participants', Participant.objects.filter(room__deleted_at__lt=older_than)),
+        # Only rooms already emptied by the stages above, so no cascade is unbounded
+        ('rooms', Room.all_objects.filter(deleted_at__lt=older_than).filter(
+            ~Exists(Message.all_objects.filter(room=OuterRef('pk'))),
+            ~Exists(ArchivedMessage.objects.filter(room=OuterRef('pk'))),
+            ~Exists(Participant.objects.filter(room=OuterRef('pk'))),
+        )),
+    ]
+    counts = {'messages': 0, 'participants': 0, 'rooms': 0}
+    batches = 0
+    with tombstones_suppressed():
+        for name, queryset in stages:
+            while max_batches is None or batches < max_batches:
+                deleted = _delete_batch(queryset, batch_size)
+                if not deleted:
+                    break
+                batches += 1
+                counts[name] += deleted
+                log(f'{counts[name]} {name} purged')
+    return counts
+
+
+def purge_cutoff(hours):
+    return timezone.now() - timedelta(hours=hours)
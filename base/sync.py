@@ -0,0 +1,163 @@
+"""
+Delta sync for /api/sync/.
+
+A sync token is an opaque timestamp (microseconds since the epoch). Rooms,
+messages and topics with ``updated`` after it are returned in full, and
+deletions after it come from the ``Tombstone`` table. The next token is
+the time the response was built minus ``SYNC_OVERLAP_SECONDS``: a row
+written by a transaction that started before that moment but committed
+after it would otherwise fall between two syncs. Clients therefore see the
+last few seconds twice and must apply changes idempotently (upsert by id,
+then apply deletions).
+
+Each response holds at most ``limit`` rows of each collection (rooms,
+messages, topics and tombstones), oldest change first by ``(updated, id)``.
+While ``has_more`` is true, ``next`` is a cursor holding each collection's
+last ``(updated, id)`` sent, and the client asks again at once; the last
+page's ``next`` is a plain token as above. A row changed between pages
+moves past the cursor and is sent again later, so paging never skips one.
+
+Deleting a room deletes its messages; only the room gets a tombstone, and
+clients drop its messages with it. Rooms and messages are soft-deleted (see
+base/soft_delete.py) and get their tombstone then, not when the purge job
+removes the rows.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from base.models import MAX_ID, Message, Room, Tombstone, Topic
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+# Set while purging rows whose deletion clients have already been told about
+_suppressed = ContextVar('tombstones_suppressed', default=False)
+
+
+class ExpiredToken(Exception):
+    """The token is older than the tombstones kept; the client must resync in full."""
+
+
+# The collections a cursor holds a position for, in order
+COLLECTIONS = ('rooms', 'messages', 'topics', 'deleted')
+
+
+def encode_token(moment):
+    return str((moment - EPOCH) // MICROSECOND)
+
+
+def encode_cursor(positions):
+    return '.'.join(f'{encode_token(positions[name][0])}_{positions[name][1]}' for name in COLLECTIONS)
+
+
+def _decode_moment(value):
+    try:
+        return EPOCH + int(value) * MICROSECOND
+    except OverflowError:
+        raise ValueError(value)
+
+
+def decode_token(token):
+    """
+    The ``{collection: (moment, id)}`` positions a token or cursor continues
+    after. Raise ValueError for malformed tokens and ExpiredToken for stale ones.
+    """
+    parts = token.split('.')
+    if len(parts) == 1:
+        # A plain token: everything updated after it
+        positions = dict.fromkeys(COLLECTIONS, (_decode_moment(token), MAX_ID))
+    elif len(parts) == len(COLLECTIONS):
+        positions = {}
+        for name, part in zip(COLLECTIONS, parts):
+            moment, object_id = part.split('_')
+            object_id = int(object_id)
+            if not 0 <= object_id <= MAX_ID:
+                raise ValueError(token)
+            positions[name] = (_decode_moment(moment), object_id)
+    else:
+        raise ValueError(token)
+    if positions['deleted'][0] < tombstone_horizon():
+        raise ExpiredToken(token)
+    return positions
+
+
+def full_sync_positions(now):
+    """Everything from the start, and deletions from the first page on."""
+    positions = dict.fromkeys(COLLECTIONS, (EPOCH, 0))
+    positions['deleted'] = (now - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS), MAX_ID)
+    return positions
+
+
+def after(queryset, field, position):
+    """Rows after ``position``, ordered by ``(field, id)``."""
+    moment, object_id = position
+    return queryset.filter(
+        Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'id__gt': object_id})
+    ).order_by(field, 'id')
+
+
+def page(queryset, field, position, limit):
+    """
+    Up to ``limit`` rows after ``position`` by ``(field, id)``, whether there
+    are more, and the position of the last row returned.
+    """
+    rows = list(after(queryset, field, position)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        position = (getattr(rows[-1], field), rows[-1].id)
+    return rows, has_more, position
+
+
+def tombstone_horizon():
+    return timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def next_token(now):
+    return encode_token(now - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS))
+
+
+def deleted_page(position, limit):
+    """Ids deleted after ``position`` by kind, as ``page`` returns its rows."""
+    deleted = {Tombstone.ROOM: [], Tombstone.MESSAGE: [], Tombstone.TOPIC: []}
+    tombstones = Tombstone.objects.only('kind', 'object_id', 'deleted')
+    tombstones, has_more, position = page(tombstones, 'deleted', position, limit)
+    for tombstone in tombstones:
+        deleted[tombstone.kind].append(tombstone.object_id)
+    return deleted, has_more, position
+
+
+def deleted_by_room(origin):
+    """Whether a deletion was started by deleting rooms (so cascades to their messages)."""
+    if isinstance(origin, QuerySet):
+        return origin.model is Room
+    return isinstance(origin, Room)
+
+
+@contextmanager
+def tombstones_suppressed():
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def record_deletion(instance, origin=None):
+    """post_delete hook: tombstone for a row deleted outright."""
+    if _suppressed.get() or getattr(instance, 'deleted_at', None) is not None:
+        return
+    kind = {Room: Tombstone.ROOM, Message: Tombstone.MESSAGE, Topic: Tombstone.TOPIC}[type(instance)]
+    if kind == Tombstone.MESSAGE and deleted_by_room(origin):
+        return
+    Tombstone.objects.create(kind=kind, object_id=instance.pk)
+
+
+def record_deletions(kind, object_ids):
+    """Tombstones for soft-deleted rows, in one INSERT."""
+    Tombstone.objects.bulk_create([Tombstone(kind=kind, object_id=object_id) for object_id in object_ids])
@@ -0,0 +1,101 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from base.archive import archive
+from base.models import ArchivedMessage, Message, Room, Tombstone, Topic
+from base.soft_delete import purge, soft_delete_rooms
+
+User = get_user_model()
+
+
+class ArchiveTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        cls.topic = Topic.objects.create(name='Python')
+        cls.room = Room.objects.create(host=cls.user, topic=cls.topic, name='Python room')
+        cls.other_room = Room.objects.create(host=cls.user, topic=cls.topic, name='Other room')
+        cls.messages = [Message.objects.create(user=cls.user, room=cls.room, body=f'Message {i}') for i in range(6)]
+        Message.objects.create(user=cls.user, room=cls.other_room, body='Elsewhere')
+        # The first four messages are old
+        old = timezone.now() - timedelta(days=100)
+        Message.objects.filter(id__in=[message.id for message in cls.messages[:4]]).update(updated=old)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def cutoff(self):
+        return timezone.now() - timedelta(days=90)
+
+    def history(self, **params):
+        response = self.client.get(reverse('room-history', args=[self.room.pk]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_archive_moves_old_messages(self):
+        self.assertEqual(archive(self.cutoff(), batch_size=3), 4)
+
+        ids = [message.id for message in self.messages]
+        self.assertEqual(sorted(ArchivedMessage.objects.values_list('id', flat=True)), ids[:4])
+        self.assertEqual(list(Message.objects.filter(room=self.room).order_by('id').values_list('id', flat=True)), ids[4:])
+        self.assertEqual(ArchivedMessage.objects.get(id=ids[0]).body, 'Message 0')
+        # Clients keep archived messages, so nothing tells them to drop them
+        self.assertFalse(Tombstone.objects.exists())
+
+    def test_archive_stops_after_max_batches(self):
+        self.assertEqual(archive(self.cutoff(), batch_size=3, max_batches=1), 3)
+        self.assertEqual(archive(self.cutoff(), batch_size=3), 1)
+
+    def test_history_reads_across_the_archive(self):
+        archive(self.cutoff(), batch_size=10)
+        ids = [message.id for message in reversed(self.messages)]
+
+        data = self.history(limit=4)
+        self.assertEqual([message['id'] for message in data['messages']], ids[:4])
+        self.assertEqual(data['messages'][0]['room'], self.room.pk)
+        self.assertEqual(data['next'], ids[3])
+
+        data = self.history(limit=4, before=data['next'])
+        self.assertEqual([message['id'] for message in data['messages']], ids[4:])
+        self.assertIsNone(data['next'])
+
+    def test_history_query_count(self):
+        archive(self.cutoff(), batch_size=10)
+        # room exists, hot page, archived page
+        with self.assertNumQueries(3):
+            self.history()
+
+    @override_settings(MESSAGE_HISTORY_MAX_LIMIT=2)
+    def test_history_limit_is_capped(self):
+        self.assertEqual(len(self.history(limit=10)['messages']), 2)
+
+    def test_history_errors(self):
+        url = reverse('room-history', args=[self.room.pk])
+        self.assertEqual(self.client.get(url, {'before': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('room-history', args=[9999])).status_code, 404)
+
+        soft_delete_rooms([self.room.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_purge_clears_archive_of_deleted_rooms(self):
+        archive(self.cutoff(), batch_size=10)
+        soft_delete_rooms([self.room.pk])
+
+        counts = purge(timezone.now() + timedelta(seconds=1), batch_size=2)
+
+        self.assertEqual(counts['messages'], 6)
+        self.assertEqual(counts['rooms'], 1)
+        self.assertFalse(ArchivedMessage.objects.exists())
+
+    def test_archive_command(self):
+        out = StringIO()
+        call_command('archive_messages', '--batch-size', '2', stdout=out)
+        self.assertIn('Archived 4 messages.', out.getvalue())
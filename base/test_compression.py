@@ -0,0 +1,131 @@
+import gzip
+import unittest
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from base.models import Room, Topic
+from study_companion_api import compression
+
+User = get_user_model()
+
+
+class NegotiationTest(SimpleTestCase):
+    codecs = [compression.ZstdCodec(3), compression.BrotliCodec(4), compression.GzipCodec(6)]
+
+    def negotiate(self, header):
+        codec = compression.negotiate(header, self.codecs)
+        return codec and codec.name
+
+    def test_prefers_server_order_on_ties(self):
+        self.assertEqual(self.negotiate('gzip, deflate, br, zstd'), 'zstd')
+        self.assertEqual(self.negotiate('gzip, br'), 'br')
+        self.assertEqual(self.negotiate('*'), 'zstd')
+
+    def test_q_values(self):
+        self.assertEqual(self.negotiate('zstd;q=0.5, gzip;q=0.9'), 'gzip')
+        self.assertEqual(self.negotiate('zstd;q=0, *;q=0.1'), 'br')
+        self.assertEqual(self.negotiate('X-GZIP'), 'gzip')
+        self.assertIsNone(self.negotiate('gzip;q=0, deflate'))
+        self.assertIsNone(self.negotiate(''))
+        self.assertIsNone(self.negotiate('identity'))
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        topic = Topic.objects.create(name='Python')
+        for i in range(10):
+            Room.objects.create(host=user, topic=topic, name=f'Room {i}', description='Shared description')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_compresses_large_api_responses(self):
+        plain = self.client.get(reverse('room-list'))
+        response = self.client.get(reverse('room-list'), HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    @unittest.skipIf(compression.zstandard is None, 'zstandard is not installed')
+    def test_zstd(self):
+        plain = self.client.get(reverse('room-list'))
+        response = self.client.get(reverse('room-list'), HTTP_ACCEPT_ENCODING='gzip, br, zstd')
+
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+        self.assertEqual(compression.zstandard.ZstdDecompressor().decompress(response.content), plain.content)
+
+    @unittest.skipIf(compression.brotli is None, 'brotli is not installed')
+    def test_brotli(self):
+        plain = self.client.get(reverse('room-list'))
+        response = self.client.get(reverse('room-list'), HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), plain.content)
+
+    def test_skips_small_and_uncompressible_requests(self):
+        with self.settings(COMPRESSION_MIN_SIZE=10 ** 6):
+            response = self.client.get(reverse('room-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = self.client.get(reverse('room-list'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_credential_endpoints_are_not_compressed(self):
+        response = self.client.post(
+            reverse('token_obtain_pair'),
+            {'email': 'test@example.com', 'password': 'testpass123'},
+            format='json',
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(response.content), 100)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class StreamingCompressionTest(SimpleTestCase):
+    chunks = [b'{"rows": [', *[b'{"name": "Study room", "topic": "Python"},' for _ in range(50)], b'{}]}']
+
+    def middleware(self, response, path='/api/rooms/'):
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING='gzip')
+        return compression.CompressionMiddleware(lambda request: response)(request)
+
+    def test_streaming_response(self):
+        response = self.middleware(StreamingHttpResponse(iter(self.chunks)))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(self.chunks))
+
+    def test_async_streaming_response(self):
+        async def stream():
+            for chunk in self.chunks:
+                yield chunk
+
+        async def collect(response):
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        response = self.middleware(StreamingHttpResponse(stream()))
+        self.assertEqual(gzip.decompress(async_to_sync(collect)(response)), b''.join(self.chunks))
+
+    def test_strong_etag_is_weakened(self):
+        plain = HttpResponse(b''.join(self.chunks))
+        plain['ETag'] = '"abc"'
+        response = self.middleware(plain)
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_non_api_paths_are_left_alone(self):
+        response = self.middleware(HttpResponse(b''.join(self.chunks)), path='/admin/')
+        self.assertFalse(response.has_header('Content-Encoding'))
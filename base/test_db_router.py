@@ -0,0 +1,145 @@
+import time
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from base.models import Topic
+from study_companion_api import db_router
+
+User = get_user_model()
+
+ROUTED_MIDDLEWARE = [
+    'study_companion_api.db_router.ReplicaRoutingMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'], MIDDLEWARE=ROUTED_MIDDLEWARE)
+class ReplicaRoutingTest(TestCase):
+    """Primary and replicas are separate SQLite test databases."""
+    databases = {'default', 'replica_1', 'replica_2'}
+
+    def setUp(self):
+        for state in (db_router._unhealthy_until, db_router._healthy_until):
+            state.clear()
+            self.addCleanup(state.clear)
+        Topic.objects.create(name='From primary')
+        Topic.objects.using('replica_1').create(name='From replica')
+        Topic.objects.using('replica_2').create(name='From replica')
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        for alias in ['replica_1', 'replica_2']:
+            self.user.save(using=alias, force_insert=True)
+        self.token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token.access_token}')
+
+    def break_replica(self, alias):
+        patcher = patch.object(
+            connections[alias], 'ensure_connection', side_effect=OperationalError('replica down')
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def topic_names(self):
+        response = self.client.get(reverse('topics-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [topic['name'] for topic in response.data]
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.topic_names(), ['From replica'])
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(list(Topic.objects.values_list('name', flat=True)), ['From primary'])
+
+    def test_own_write_pins_reads_to_primary(self):
+        response = self.client.post(reverse('create-room'), {'name': 'Room', 'topic': 'From primary'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(db_router.STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.topic_names(), ['From primary'])
+
+    def test_failed_write_does_not_pin(self):
+        response = self.client.post(reverse('create-room'), {'name': 'Room'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn(db_router.STICKY_COOKIE, response.cookies)
+        self.assertNotIn(db_router.PIN_HEADER, response.headers)
+
+    def test_echoed_pin_header_pins_reads_without_cookies(self):
+        response = self.client.post(reverse('create-room'), {'name': 'Room', 'topic': 'From primary'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.cookies.clear()
+        self.assertEqual(self.topic_names(), ['From replica'])
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {self.token.access_token}',
+            HTTP_X_PRIMARY_PIN=response.headers[db_router.PIN_HEADER],
+        )
+        self.assertEqual(self.topic_names(), ['From primary'])
+
+    def test_pin_header_outside_sticky_window_is_ignored(self):
+        now = time.time_ns() // 1_000_000
+        window = settings.DATABASE_REPLICA_STICKY_SECONDS * 1000
+        for pin in [now - window - 1000, now + window + 1000, 'soon']:
+            with self.subTest(pin=pin):
+                self.client.credentials(
+                    HTTP_AUTHORIZATION=f'Bearer {self.token.access_token}',
+                    HTTP_X_PRIMARY_PIN=str(pin),
+                )
+                self.assertEqual(self.topic_names(), ['From replica'])
+
+    def test_cross_origin_clients_may_send_and_read_the_pin(self):
+        response = self.client.options(
+            reverse('topics-list'),
+            HTTP_ORIGIN='http://localhost:3000',
+            HTTP_ACCESS_CONTROL_REQUEST_METHOD='GET',
+            HTTP_ACCESS_CONTROL_REQUEST_HEADERS='authorization, x-primary-pin',
+        )
+        self.assertIn('x-primary-pin', response.headers['Access-Control-Allow-Headers'])
+
+        response = self.client.post(
+            reverse('create-room'), {'name': 'Room', 'topic': 'From primary'}, HTTP_ORIGIN='http://localhost:3000'
+        )
+        self.assertIn(db_router.PIN_HEADER, response.headers['Access-Control-Expose-Headers'])
+
+    def test_unhealthy_replica_is_skipped(self):
+        Topic.objects.using('replica_2').update(name='Stale replica')
+        self.break_replica('replica_2')
+        for _ in range(5):
+            self.assertEqual(self.topic_names(), ['From replica'])
+        self.assertIn('replica_2', db_router._unhealthy_until)
+
+    def test_one_replica_per_request(self):
+        # topics_list runs exists() and the list: both must hit the same replica
+        with patch.object(db_router.random, 'choice', wraps=db_router.random.choice) as choice, \
+                patch.object(db_router.ReplicaRouter, 'db_for_read', autospec=True,
+                             side_effect=db_router.ReplicaRouter.db_for_read) as db_for_read:
+            self.topic_names()
+        self.assertEqual(choice.call_count, 1)
+        self.assertEqual(len({call.args[0] for call in db_for_read.call_args_list}), 1)
+        self.assertGreater(db_for_read.call_count, 1)
+
+    def test_health_probes_are_cached(self):
+        # Queries connect through django.db.connections; only probes go through the router's
+        with patch.object(db_router, 'connections') as probed:
+            for _ in range(3):
+                self.topic_names()
+        self.assertEqual(
+            [call.args[0] for call in probed.__getitem__.call_args_list], ['replica_1', 'replica_2']
+        )
+
+    def test_falls_back_to_primary_without_healthy_replica(self):
+        self.break_replica('replica_1')
+        self.break_replica('replica_2')
+        self.assertEqual(self.topic_names(), ['From primary'])
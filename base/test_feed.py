@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from base.feed import feed_page, newest_ids
+from base.models import Message, Room, Topic
+from base.soft_delete import soft_delete_messages, soft_delete_rooms
+
+User = get_user_model()
+
+
+@override_settings(FEED_ROOM_CACHE_SIZE=3)
+class FeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        cls.other_user = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        topic = Topic.objects.create(name='Python')
+        cls.rooms = [Room.objects.create(host=cls.user, topic=topic, name=f'Room {i}') for i in range(2)]
+        cls.elsewhere = Room.objects.create(host=cls.other_user, topic=topic, name='Elsewhere')
+        for room in cls.rooms:
+            room.participants.add(cls.user)
+        # Interleaved so the feed has to merge the two rooms
+        cls.messages = [
+            Message.objects.create(user=cls.other_user, room=cls.rooms[i % 2], body=f'Message {i}')
+            for i in range(8)
+        ]
+        Message.objects.create(user=cls.other_user, room=cls.elsewhere, body='Not in my rooms')
+
+    def setUp(self):
+        caches['feed'].clear()
+        self.addCleanup(caches['feed'].clear)
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+
+    def feed(self, **params):
+        response = self.client.get(reverse('feed'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def newest(self, count):
+        return [message.id for message in reversed(self.messages)][:count]
+
+    def test_feed_merges_participating_rooms(self):
+        data = self.feed(limit=4)
+
+        self.assertEqual([message['id'] for message in data['messages']], self.newest(4))
+        self.assertEqual(data['messages'][0]['user']['username'], 'other')
+        self.assertEqual(data['next'], self.newest(4)[-1])
+
+    def test_pages_read_past_the_cached_window(self):
+        data = self.feed(limit=5)
+        ids = [message['id'] for message in data['messages']]
+        data = self.feed(limit=5, before=data['next'])
+        ids += [message['id'] for message in data['messages']]
+
+        self.assertEqual(ids, self.newest(8))
+        self.assertIsNone(data['next'])
+
+    def test_cache_hit_skips_message_queries(self):
+        self.feed(limit=3)
+        # user, participating rooms, page of messages
+        with self.assertNumQueries(3):
+            self.feed(limit=3)
+
+    def test_cache_miss_is_one_query_for_all_rooms(self):
+        ids = newest_ids([room.id for room in self.rooms], 2)
+        self.assertEqual(ids, {
+            self.rooms[0].id: [self.messages[6].id, self.messages[4].id],
+            self.rooms[1].id: [self.messages[7].id, self.messages[5].id],
+        })
+
+    def test_create_message_updates_the_cache(self):
+        self.feed()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('create-message', args=[self.rooms[0].id]), {'body': 'New'}, format='json')
+        new = Message.objects.get(body='New')
+
+        with self.assertNumQueries(3):
+            data = self.feed(limit=2)
+        self.assertEqual([message['id'] for message in data['messages']], [new.id, self.messages[7].id])
+
+    def test_posting_joins_the_room_feed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('create-message', args=[self.elsewhere.id]), {'body': 'Hi'}, format='json')
+        self.assertEqual(len(self.feed()['messages']), 10)
+
+    def test_deleted_messages_and_rooms_are_left_out(self):
+        self.feed()
+        soft_delete_messages([self.messages[7].id])
+        soft_delete_rooms([self.rooms[0].id])
+
+        ids = [message['id'] for message in self.feed()['messages']]
+        self.assertEqual(ids, [self.messages[5].id, self.messages[3].id, self.messages[1].id])
+
+    def test_user_without_rooms(self):
+        self.assertEqual(feed_page(self.other_user), ([], None))
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get(reverse('feed')).status_code, 401)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(reverse('feed'), {'before': 'x'}).status_code, 400)
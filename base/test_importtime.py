@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from base.management.commands.importtime import entry_points, parse_importtime
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     urllib3.util
+import time:       300 |        400 |   urllib3
+import time:       200 |        600 | requests
+import time:        50 |         50 |   rest_framework.settings
+import time:       500 |        550 | rest_framework
+"""
+
+
+class ImportTimeTest(SimpleTestCase):
+    def test_parse_importtime(self):
+        self.assertEqual(parse_importtime(SAMPLE), [
+            ('urllib3.util', 100, 100, 2),
+            ('urllib3', 300, 400, 1),
+            ('requests', 200, 600, 0),
+            ('rest_framework.settings', 50, 50, 1),
+            ('rest_framework', 500, 550, 0),
+        ])
+
+    def test_entry_points_skip_imports_within_a_package(self):
+        self.assertEqual(entry_points(parse_importtime(SAMPLE)), [
+            ('requests', None, 600),
+            ('rest_framework', None, 550),
+            ('urllib3', 'requests', 400),
+        ])
+
+    def test_command_audits_a_module(self):
+        out = StringIO()
+        call_command('importtime', module='base.topics', limit=5, stdout=out)
+        self.assertIn('modules imported in', out.getvalue())
+        self.assertIn('first imported by', out.getvalue())
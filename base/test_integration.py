@@ -176,14 +176,17 @@ class MultiUserInteractionTest(TransactionTestCase):
 class AuthenticationFlowTest(TestCase):
     """Test complete authentication flows"""
     
-    def setUp(self):
-        self.client = APIClient()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
 
+    def setUp(self):
+        self.client = APIClient()
+
     def test_login_logout_flow(self):
         # Login
         login_data = {
@@ -231,13 +234,16 @@ class AuthenticationFlowTest(TestCase):
 class DataIntegrityTest(TestCase):
     """Test data relationships and constraints"""
     
-    def setUp(self):
-        self.client = APIClient()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
+
+    def setUp(self):
+        self.client = APIClient()
         self.token = RefreshToken.for_user(self.user)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token.access_token}')
 
@@ -0,0 +1,44 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+User = get_user_model()
+
+
+class ApiMiddlewareProfileTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+
+    def test_api_skips_browser_middleware(self):
+        client = APIClient()
+        client.cookies['sessionid'] = 'stale'
+        response = client.get(reverse('api-routes'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Frame-Options', response.headers)
+        self.assertFalse(hasattr(response.wsgi_request, 'session'))
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_admin_keeps_full_stack(self):
+        response = self.client.get('/admin/login/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', response.cookies)
+        self.assertTrue(hasattr(response.wsgi_request, 'session'))
+
+    @patch('base.views.verify_recaptcha', return_value=True)
+    def test_login_records_last_login_without_session(self, verify_recaptcha):
+        response = APIClient().post(
+            reverse('login'), {'email': 'test@example.com', 'password': 'testpass123'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+        self.assertNotIn('sessionid', response.cookies)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
@@ -52,14 +52,60 @@ class TopicModelTest(TestCase):
         self.assertEqual(topic.name, 'Python')
         self.assertEqual(str(topic), 'Python')
 
+class TopicRoomCountTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='pass123'
+        )
+        cls.python = Topic.objects.create(name='Python')
+        cls.django = Topic.objects.create(name='Django')
+
+    def assertRoomCounts(self, python, django):
+        self.python.refresh_from_db()
+        self.django.refresh_from_db()
+        self.assertEqual((self.python.room_count, self.django.room_count), (python, django))
+
+    def test_counts_created_rooms(self):
+        Room.objects.create(host=self.user, topic=self.python, name='A')
+        Room.objects.create(host=self.user, topic=self.python, name='B')
+        Room.objects.create(host=self.user, topic=None, name='C')
+        self.assertRoomCounts(2, 0)
+
+    def test_counts_retopiced_rooms(self):
+        room = Room.objects.create(host=self.user, topic=self.python, name='A')
+        room.topic = self.django
+        room.save()
+        room.name = 'Renamed'
+        room.save()
+        self.assertRoomCounts(0, 1)
+
+    def test_counts_rooms_loaded_from_db(self):
+        Room.objects.create(host=self.user, topic=self.python, name='A')
+        room = Room.objects.get(name='A')
+        room.topic = self.django
+        room.save()
+        self.assertRoomCounts(0, 1)
+
+    def test_counts_deleted_rooms(self):
+        room = Room.objects.create(host=self.user, topic=self.python, name='A')
+        Room.objects.create(host=self.user, topic=self.python, name='B')
+        room.delete()
+        self.assertRoomCounts(1, 0)
+        Room.objects.all().delete()
+        self.assertRoomCounts(0, 0)
+
 class RoomModelTest(TestCase):
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='pass123'
         )
-        self.topic = Topic.objects.create(name='Python')
+        cls.topic = Topic.objects.create(name='Python')
 
     def test_create_room(self):
         room = Room.objects.create(
@@ -88,16 +134,17 @@ class RoomModelTest(TestCase):
         self.assertIn(participant, room.participants.all())
 
 class MessageModelTest(TestCase):
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='pass123'
         )
-        self.topic = Topic.objects.create(name='Python')
-        self.room = Room.objects.create(
-            host=self.user,
-            topic=self.topic,
+        cls.topic = Topic.objects.create(name='Python')
+        cls.room = Room.objects.create(
+            host=cls.user,
+            topic=cls.topic,
             name='Test Room'
         )
 
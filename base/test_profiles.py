@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from base.archive import archive
+from base.models import Message, Room, Topic
+from base.profiles import GENERATION_KEY, generation, profile_key
+from base.soft_delete import soft_delete_messages, soft_delete_rooms
+
+User = get_user_model()
+
+
+@override_settings(PROFILE_RECENT_MESSAGES=3)
+class ProfileTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        cls.other_user = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        topic = Topic.objects.create(name='Python')
+        cls.hosted = [Room.objects.create(host=cls.user, topic=topic, name=f'Mine {i}') for i in range(2)]
+        cls.joined = Room.objects.create(host=cls.other_user, topic=topic, name='Theirs')
+        cls.joined.participants.add(cls.user)
+        cls.hosted[0].participants.add(cls.user)
+        cls.messages = [Message.objects.create(user=cls.user, room=cls.joined, body=f'Message {i}') for i in range(4)]
+        Message.objects.create(user=cls.other_user, room=cls.joined, body='Not mine')
+
+    def setUp(self):
+        caches['profiles'].clear()
+        self.addCleanup(caches['profiles'].clear)
+        self.client = APIClient()
+
+    def profile(self, user=None):
+        response = self.client.get(reverse('user-profile', args=[(user or self.user).pk]))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_profile(self):
+        data = self.profile()
+
+        self.assertEqual(data['username'], 'testuser')
+        self.assertEqual(data['rooms_hosted'], 2)
+        self.assertEqual(data['rooms_joined'], 2)
+        self.assertEqual(
+            [message['id'] for message in data['recent_messages']],
+            [message.id for message in reversed(self.messages)][:3],
+        )
+        self.assertEqual(data['recent_messages'][0]['room'], self.joined.id)
+
+    def test_empty_profile(self):
+        user = User.objects.create_user(username='new', email='new@example.com', password='testpass123')
+        data = self.profile(user)
+        self.assertEqual((data['rooms_hosted'], data['rooms_joined'], data['recent_messages']), (0, 0, []))
+
+    def test_two_queries_then_cached(self):
+        with self.assertNumQueries(2):
+            self.profile()
+        with self.assertNumQueries(0):
+            self.profile()
+
+    def test_cache_holds_only_the_response(self):
+        data = self.profile()
+        cache = caches['profiles']
+        cached = cache.get(profile_key(self.user.pk, generation(cache)))
+        # The avatar is made absolute per request
+        self.assertEqual(data['avatar'], f"http://testserver{cached['avatar']}")
+        self.assertEqual(cached['recent_messages'], data['recent_messages'])
+        self.assertEqual(
+            set(cached),
+            {'id', 'username', 'email', 'name', 'bio', 'avatar', 'rooms_hosted', 'rooms_joined', 'recent_messages'},
+        )
+
+    def test_lost_generation_drops_cached_profiles(self):
+        self.profile()
+        caches['profiles'].delete(GENERATION_KEY)
+        with self.assertNumQueries(2):
+            self.profile()
+
+    def test_missing_user(self):
+        self.assertEqual(self.client.get(reverse('user-profile', args=[9999])).status_code, 404)
+
+    def test_new_message_invalidates(self):
+        self.profile()
+        token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('create-message', args=[self.hosted[1].id]), {'body': 'New'}, format='json')
+
+        data = self.profile()
+        self.assertEqual(data['recent_messages'][0]['body'], 'New')
+        self.assertEqual(data['rooms_joined'], 3)
+
+    def test_bulk_messages_invalidate(self):
+        self.profile()
+        token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('create-messages-bulk', args=[self.joined.id]),
+                {'messages': [{'body': 'One'}, {'body': 'Two'}]},
+                format='json',
+            )
+        self.assertEqual([message['body'] for message in self.profile()['recent_messages']][:2], ['Two', 'One'])
+
+    def test_soft_deletes_invalidate(self):
+        self.profile()
+        self.profile(self.other_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            soft_delete_messages([self.messages[3].id])
+        self.assertEqual(self.profile()['recent_messages'][0]['id'], self.messages[2].id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            soft_delete_rooms([self.joined.id])
+        data = self.profile()
+        self.assertEqual((data['rooms_hosted'], data['rooms_joined'], data['recent_messages']), (2, 1, []))
+        self.assertEqual(self.profile(self.other_user)['rooms_hosted'], 0)
+
+    def test_room_delete_invalidates_message_authors(self):
+        author = User.objects.create_user(username='author', email='author@example.com', password='testpass123')
+        Message.objects.create(user=author, room=self.joined, body='Drive-by')
+        self.assertEqual(len(self.profile(author)['recent_messages']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            soft_delete_rooms([self.joined.id])
+        self.assertEqual(self.profile(author)['recent_messages'], [])
+
+    def test_archive_invalidates(self):
+        self.profile()
+        with self.captureOnCommitCallbacks(execute=True):
+            archive(timezone.now() + timedelta(seconds=1), batch_size=100)
+        self.assertEqual(self.profile()['recent_messages'], [])
+
+    def test_user_update_invalidates(self):
+        self.profile()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.bio = 'Updated'
+            self.user.save()
+        self.assertEqual(self.profile()['bio'], 'Updated')
@@ -0,0 +1,132 @@
+"""
+EXPLAIN every query path listed in QUERY_PATHS.md against SQLite.
+
+A path fails when SQLite plans a full table scan ("SCAN <table>" without
+an index) for it, unless it is listed in FULL_SCAN_ALLOWED with the reason
+no index can help. Add new query paths here together with their index.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Exists, F, OuterRef, Q, Window
+from django.db.models.functions import RowNumber
+from django.test import TestCase
+from django.utils import timezone
+
+from base.models import ArchivedMessage, Room, Topic, Message, Tombstone
+from base.profiles import profile_user, recent_messages
+from base.sync import after
+from base.views import message_queryset, room_queryset
+
+User = get_user_model()
+
+# Paths where a full scan is inherent to the query, not a missing index
+FULL_SCAN_ALLOWED = {
+    'topics_list': 'returns every topic',
+    'get_users': 'returns every user',
+    'search.rooms': "icontains is LIKE '%q%', which no B-tree index can serve",
+    'search.topics': "icontains is LIKE '%q%', which no B-tree index can serve",
+    'search.messages': "icontains is LIKE '%q%', which no B-tree index can serve",
+    'sync.topics': 'topics are few, and an index on updated would be rewritten on every room count change',
+}
+
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?! USING (?:COVERING )?INDEX)(?:\s|$)')
+
+
+def query_paths():
+    """
+    Querysets issued by base/views.py and base/serializers.py, by path name.
+
+    Built from the helpers the views use wherever one exists, so a change
+    to a helper's filters or joins is planned here too.
+    """
+    q = 'python'
+    since = timezone.now()
+    position = (since, 1)
+    return {
+        # base/views.py
+        'topics_list': Topic.objects.all(),
+        'topics_list.popular': Topic.objects.order_by('-room_count', 'name')[:10],
+        'search.rooms': room_queryset().filter(
+            Q(name__icontains=q) | Q(description__icontains=q) |
+            Q(topic__name__icontains=q) | Q(host__username__icontains=q)
+        ),
+        'search.topics': Topic.objects.filter(name__icontains=q),
+        'search.messages': message_queryset().filter(
+            Q(body__icontains=q) | Q(room__name__icontains=q) | Q(user__username__icontains=q)
+        ),
+        'resolve_topic': Topic.objects.filter(key=q),
+        'resolve_topics': Topic.objects.filter(key__in=[q, 'django']),
+        'room_list': room_queryset(),
+        'room_detail': room_queryset().filter(pk=1),
+        'check_room_hosts': Room.objects.filter(id__in=[1, 2]).order_by().values_list('id', 'host_id'),
+        'touch_room': Room.objects.filter(pk=1),
+        'login_user.email_exists': User.objects.filter(email='a@example.com'),
+        'get_user': User.objects.filter(pk=1),
+        'get_users': User.objects.all(),
+        'get_users.ids': User.objects.filter(pk__in=[1, 2]),
+        'message_list': message_queryset(),
+        'message_detail': message_queryset().filter(pk=1),
+        'sync.rooms': after(room_queryset(), 'updated', position)[:201],
+        'sync.messages': after(
+            Message.objects.filter(room__deleted_at__isnull=True).select_related('user'), 'updated', position
+        )[:201],
+        'sync.topics': after(Topic.objects.all(), 'updated', position)[:201],
+        'sync.tombstones': after(Tombstone.objects.all(), 'deleted', position)[:201],
+        # base/archive.py
+        'archive.candidates': Message.objects.filter(
+            updated__lt=since, room__deleted_at__isnull=True
+        ).order_by().values_list('id')[:100],
+        'room_history.messages': Message.objects.filter(room=1, id__lt=100).order_by('-id')[:50],
+        'room_history.archived': ArchivedMessage.objects.filter(room=1, id__lt=100).order_by('-id')[:50],
+        # base/profiles.py
+        'profile.user': profile_user(1),
+        'profile.messages': recent_messages(1),
+        # base/feed.py
+        'feed.rooms': Room.objects.filter(participants=1).order_by().values_list('id', flat=True),
+        # Without the rank filter: Django puts EXPLAIN inside the QUALIFY subquery
+        'feed.newest_ids': Message.objects.filter(room_id__in=[1, 2]).annotate(
+            rank=Window(RowNumber(), partition_by=F('room_id'), order_by=F('id').desc())
+        ).order_by('room_id', '-id').values_list('room_id', 'id'),
+        'feed.messages': Message.objects.filter(id__in=[1, 2]).select_related('user').order_by('-id'),
+        # base/soft_delete.py
+        'purge.messages': Message.all_objects.filter(deleted_at__lt=since).order_by().values_list('id')[:100],
+        'purge.room_messages': Message.all_objects.filter(room__deleted_at__lt=since).order_by().values_list('id')[:100],
+        'purge.archived_messages': ArchivedMessage.objects.filter(
+            room__deleted_at__lt=since
+        ).order_by().values_list('id')[:100],
+        'purge.participants': Room.participants.through.objects.filter(
+            room__deleted_at__lt=since
+        ).order_by().values_list('id')[:100],
+        'purge.rooms': Room.all_objects.filter(deleted_at__lt=since).filter(
+            ~Exists(Message.all_objects.filter(room=OuterRef('pk'))),
+            ~Exists(ArchivedMessage.objects.filter(room=OuterRef('pk'))),
+            ~Exists(Room.participants.through.objects.filter(room=OuterRef('pk'))),
+        ).order_by().values_list('id')[:100],
+        # base/serializers.py
+        'RoomSerializer.host': User.objects.filter(pk=1),
+        'RoomSerializer.topic': Topic.objects.filter(pk=1),
+        'RoomSerializer.participants': User.objects.filter(participants__id__in=[1, 2]),
+        'MessageSerializer.user': User.objects.filter(pk=1),
+        'MessageSerializer.room': Room.objects.filter(pk=1),
+        'RegisterSerializer.email': User.objects.filter(email='a@example.com'),
+        'RegisterSerializer.username': User.objects.filter(username='a'),
+    }
+
+
+class QueryPlanTest(TestCase):
+    def test_no_unexpected_full_table_scans(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('query plans are checked against SQLite')
+
+        for name, queryset in query_paths().items():
+            with self.subTest(path=name):
+                plan = queryset.explain()
+                scans = FULL_SCAN.findall(plan)
+                if name in FULL_SCAN_ALLOWED:
+                    continue
+                self.assertEqual(scans, [], f'{name} scans {scans}:\n{plan}')
+
+    def test_allowlist_entries_are_real_paths(self):
+        self.assertLessEqual(FULL_SCAN_ALLOWED.keys(), query_paths().keys())
@@ -0,0 +1,99 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from base import parsers, renderers
+from base.models import Message, Room, Topic
+from base.serializers import RoomSerializer
+
+User = get_user_model()
+
+
+class ORJSONRendererTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        cls.room = Room.objects.create(
+            host=cls.user, topic=Topic.objects.create(name='Python'), name='Ünïcode room', description='line\u2028break'
+        )
+        cls.room.participants.add(cls.user)
+        Message.objects.create(user=cls.user, room=cls.room, body='Hello 👋')
+
+    def assertSameOutput(self, data, accepted_media_type=None, renderer_context=None):
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(data, accepted_media_type, renderer_context),
+            JSONRenderer().render(data, accepted_media_type, renderer_context),
+        )
+
+    def test_serializer_output_is_byte_compatible(self):
+        self.assertSameOutput(RoomSerializer(Room.objects.all(), many=True).data)
+
+    def test_python_types_match_drf_encoder(self):
+        self.assertSameOutput({
+            'utc': timezone.now(),
+            'offset': datetime.datetime(2024, 5, 1, 8, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+            'naive': datetime.datetime(2024, 5, 1, 8, 30, 0, 120),
+            'date': datetime.date(2024, 5, 1),
+            'decimal': Decimal('1.50'),
+            'uuid': uuid.UUID(int=1),
+            'separators': '\u2028\u2029',
+            'big': 2 ** 70,
+            'none': None,
+        })
+
+    def test_indent_and_empty_data(self):
+        self.assertSameOutput({'a': [1, 2]}, 'application/json; indent=4')
+        self.assertSameOutput({'a': [1, 2]}, renderer_context={'indent': 2})
+        self.assertEqual(renderers.ORJSONRenderer().render(None), b'')
+
+    def test_falls_back_without_orjson(self):
+        data = RoomSerializer(self.room).data
+        with patch.object(renderers, 'orjson', None):
+            self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_api_responses_use_renderer(self):
+        response = APIClient().get(reverse('room-list'))
+        self.assertIsInstance(response.accepted_renderer, renderers.ORJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+
+class ORJSONParserTest(TestCase):
+    def parse(self, body, parser_context=None):
+        return parsers.ORJSONParser().parse(io.BytesIO(body), 'application/json', parser_context)
+
+    def test_parses_like_json_parser(self):
+        body = '{"name": "Ünïcode", "n": [1, 2.5, null, true]}'.encode()
+        self.assertEqual(self.parse(body), JSONParser().parse(io.BytesIO(body)))
+
+    def test_invalid_json_keeps_drf_error(self):
+        with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+            self.parse(b'{"name": ')
+        with self.assertRaises(ParseError):
+            self.parse(b'{"n": NaN}')
+
+    def test_other_encodings_and_fallback(self):
+        body = '{"name": "é"}'.encode('latin-1')
+        self.assertEqual(self.parse(body, {'encoding': 'latin-1'}), {'name': 'é'})
+        with patch.object(parsers, 'orjson', None):
+            self.assertEqual(self.parse(b'{"a": 1}'), {'a': 1})
+
+    def test_api_requests_use_parser(self):
+        user = User.objects.create_user(username='writer', email='writer@example.com', password='testpass123')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.post(
+            reverse('create-room'), '{"name": "Parsed room", "topic": "Django"}', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['name'], 'Parsed room')
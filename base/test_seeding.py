@@ -0,0 +1,62 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Max
+from django.test import TestCase
+
+from base.models import Message, Room, Topic, User
+from base.seeding import seed
+
+
+class SeedTest(TestCase):
+    def test_seed_counts_and_consistency(self):
+        counts = seed(users=30, topics=4, rooms=20, messages=300, seed_value=1)
+
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Topic.objects.count(), 4)
+        self.assertEqual(Room.objects.count(), 20)
+        self.assertEqual(Message.objects.count(), 300)
+        self.assertEqual(Room.participants.through.objects.count(), counts['participants'])
+
+        # Authors and hosts take part in their rooms
+        for message in Message.objects.select_related('room'):
+            self.assertTrue(message.room.participants.filter(pk=message.user_id).exists())
+        for room in Room.objects.all():
+            self.assertTrue(room.participants.filter(pk=room.host_id).exists())
+
+        # Counters and timestamps match the inserted rows
+        for topic in Topic.objects.annotate(rooms=Count('room')):
+            self.assertEqual(topic.room_count, topic.rooms)
+        for room in Room.objects.annotate(last=Max('message__updated')):
+            self.assertEqual(room.updated, room.last or room.created)
+        self.assertGreater(Message.objects.values('created').distinct().count(), 1)
+
+    def test_seed_is_reproducible_and_repeatable(self):
+        seed(users=5, topics=2, rooms=5, messages=20, seed_value=7)
+        first = list(Message.objects.order_by('id').values_list('room__name', 'body'))
+        seed(users=5, topics=2, rooms=5, messages=20, seed_value=7)
+        second = list(Message.objects.order_by('id').values_list('room__name', 'body'))[20:]
+
+        self.assertEqual(first, second)
+        self.assertEqual(User.objects.count(), 10)
+
+    def test_seed_skips_taken_topic_names(self):
+        Topic.objects.create(name='topic 2')
+        Topic.objects.create(name='Topic 40')
+        seed(users=5, topics=3, rooms=5, messages=0)
+        self.assertEqual(
+            sorted(Topic.objects.values_list('name', flat=True)),
+            ['Topic 1', 'Topic 3', 'Topic 4', 'Topic 40', 'topic 2'],
+        )
+
+    def test_seed_command(self):
+        out = StringIO()
+        call_command('seed', users=10, topics=2, rooms=5, messages=50, stdout=out)
+        self.assertEqual(Message.objects.count(), 50)
+        self.assertIn('Seeded', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('seed', users=0, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('seed', rooms=0, messages=10, stdout=StringIO())
+        call_command('seed', users=3, topics=1, rooms=0, messages=0, stdout=StringIO())
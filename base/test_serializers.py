@@ -10,9 +10,9 @@ from rest_framework.test import APIRequestFactory
 User = get_user_model()
 
 class UserSerializerTest(TestCase):
-    def setUp(self):
-        self.factory = APIRequestFactory()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             name='Test User',
@@ -20,6 +20,9 @@ class UserSerializerTest(TestCase):
             password='testpass123'
         )
 
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
     def test_user_serialization(self):
         request = self.factory.get('/')
         serializer = UserSerializer(self.user, context={'request': request})
@@ -78,21 +81,24 @@ class RegisterSerializerTest(TestCase):
         self.assertIn('email', serializer.errors)
 
 class RoomSerializerTest(TestCase):
-    def setUp(self):
-        self.factory = APIRequestFactory()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.topic = Topic.objects.create(name='Python')
-        self.room = Room.objects.create(
-            host=self.user,
-            topic=self.topic,
+        cls.topic = Topic.objects.create(name='Python')
+        cls.room = Room.objects.create(
+            host=cls.user,
+            topic=cls.topic,
             name='Test Room',
             description='Test Description'
         )
 
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
     def test_room_serialization(self):
         request = self.factory.get('/')
         serializer = RoomSerializer(self.room, context={'request': request})
@@ -115,25 +121,28 @@ class RoomSerializerTest(TestCase):
         self.assertTrue(serializer.is_valid())
 
 class MessageSerializerTest(TestCase):
-    def setUp(self):
-        self.factory = APIRequestFactory()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.topic = Topic.objects.create(name='Python')
-        self.room = Room.objects.create(
-            host=self.user,
-            topic=self.topic,
+        cls.topic = Topic.objects.create(name='Python')
+        cls.room = Room.objects.create(
+            host=cls.user,
+            topic=cls.topic,
             name='Test Room'
         )
-        self.message = Message.objects.create(
-            user=self.user,
-            room=self.room,
+        cls.message = Message.objects.create(
+            user=cls.user,
+            room=cls.room,
             body='Test message'
         )
 
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
     def test_message_serialization(self):
         request = self.factory.get('/')
         serializer = MessageSerializer(self.message, context={'request': request})
@@ -158,8 +167,9 @@ class TopicSerializerTest(TestCase):
         self.assertIn('id', data)
 
 class UserUpdateSerializerTest(TestCase):
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
@@ -0,0 +1,115 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from base.models import Room, Topic
+from base.serializers import RoomSerializer
+from study_companion_api import slow_queries
+
+User = get_user_model()
+
+
+class NormalizeSqlTest(TestCase):
+    def test_literals_and_in_lists_are_normalized(self):
+        self.assertEqual(
+            slow_queries.normalize_sql("SELECT * FROM t WHERE a = 'x''y' AND b = 42 AND c IN (%s, %s,  %s)"),
+            'SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)'
+        )
+
+    def test_same_call_same_fingerprint(self):
+        self.assertEqual(
+            slow_queries.fingerprint('SELECT id FROM t WHERE id IN (%s, %s)'),
+            slow_queries.fingerprint('SELECT id FROM t WHERE id IN (%s)')
+        )
+
+
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.room = Room.objects.create(host=user, topic=Topic.objects.create(name='Python'), name='Python room')
+        self.room.participants.add(user)
+        slow_queries.reset()
+
+    def tearDown(self):
+        slow_queries.reset()
+
+    def test_queries_are_attributed_to_view(self):
+        client = APIClient()
+        with self.settings(SLOW_QUERY_THRESHOLD_MS=0), \
+                self.assertLogs('study_companion_api.slow_queries', 'WARNING') as logs:
+            client.get(reverse('search'), {'q': 'Python'})
+
+        views = {entry['view'] for entry in slow_queries.top_queries()}
+        self.assertEqual(views, {'base.views.search'})
+        self.assertTrue(all('view=base.views.search' in line for line in logs.output))
+
+    def test_queries_are_attributed_to_serializer_field(self):
+        room = Room.objects.get(pk=self.room.pk)
+        with self.settings(SLOW_QUERY_THRESHOLD_MS=0), \
+                self.assertLogs('study_companion_api.slow_queries', 'WARNING'):
+            RoomSerializer(room).data
+
+        fields = {entry['field'] for entry in slow_queries.top_queries()}
+        self.assertLessEqual({'RoomSerializer.host', 'RoomSerializer.participants'}, fields)
+
+    @override_settings(SLOW_QUERY_TOP_N=2)
+    def test_keeps_top_n_by_total_time(self):
+        slow_queries.record('SELECT 1 FROM a', 5.0, None, None)
+        slow_queries.record('SELECT 1 FROM b', 50.0, None, None)
+        slow_queries.record('SELECT 1 FROM c', 20.0, None, None)
+        slow_queries.record('SELECT 1 FROM b', 10.0, None, None)
+
+        entries = slow_queries.top_queries()
+        self.assertEqual([entry['sql'] for entry in entries], ['SELECT ? FROM b', 'SELECT ? FROM c'])
+        self.assertEqual((entries[0]['count'], entries[0]['total_ms'], entries[0]['max_ms']), (2, 60.0, 50.0))
+
+    @override_settings(SLOW_QUERY_TOP_N=2)
+    def test_new_fingerprint_is_not_evicted_at_once(self):
+        slow_queries.record('SELECT 1 FROM a', 500.0, None, None)
+        slow_queries.record('SELECT 1 FROM b', 400.0, None, None)
+        slow_queries.record('SELECT 1 FROM c', 1.0, None, None)
+
+        sqls = [entry['sql'] for entry in slow_queries.top_queries()]
+        self.assertEqual(sqls, ['SELECT ? FROM a', 'SELECT ? FROM c'])
+
+    @override_settings(SLOW_QUERY_BUCKET_SECONDS=60, SLOW_QUERY_WINDOW_BUCKETS=2)
+    def test_window_merges_recent_buckets_only(self):
+        now = 6000.0
+        slow_queries.record('SELECT 1 FROM old', 900.0, None, None, now=now - 120)
+        slow_queries.record('SELECT 1 FROM a', 50.0, 'base.views.first', None, now=now - 60)
+        slow_queries.record('SELECT 1 FROM a', 70.0, 'base.views.second', None, now=now)
+
+        entries = slow_queries.top_queries(now=now)
+        self.assertEqual([entry['sql'] for entry in entries], ['SELECT ? FROM a'])
+        self.assertEqual(
+            (entries[0]['count'], entries[0]['total_ms'], entries[0]['max_ms'], entries[0]['view']),
+            (2, 120.0, 70.0, 'base.views.second'),
+        )
+        caches['slow_queries'].delete_many(slow_queries.window_keys(now) + [slow_queries.bucket_key(98)])
+
+    def test_busy_lock_drops_the_sample_without_waiting(self):
+        cache = caches['slow_queries']
+        cache.add(slow_queries.LOCK_KEY, 'other', timeout=5)
+        self.addCleanup(cache.delete, slow_queries.LOCK_KEY)
+
+        with patch.object(cache, 'add', wraps=cache.add) as add:
+            slow_queries.record('SELECT 1 FROM a', 500.0, None, None)
+
+        self.assertEqual(add.call_count, 1)
+        self.assertEqual(slow_queries.top_queries(), [])
+
+    def test_management_command(self):
+        slow_queries.record('SELECT * FROM base_message', 120.0, 'base.views.message_list', None)
+        out = StringIO()
+        call_command('slow_queries', stdout=out)
+        self.assertIn('base.views.message_list', out.getvalue())
+        self.assertIn('SELECT * FROM base_message', out.getvalue())
+
+        call_command('slow_queries', '--reset', stdout=StringIO())
+        self.assertEqual(slow_queries.top_queries(), [])
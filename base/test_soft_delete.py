@@ -0,0 +1,128 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from base.models import Message, Room, Tombstone, Topic
+from base.soft_delete import purge, soft_delete_messages, soft_delete_rooms
+
+User = get_user_model()
+
+
+class SoftDeleteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        cls.topic = Topic.objects.create(name='Python')
+        cls.room = Room.objects.create(host=cls.user, topic=cls.topic, name='Python room')
+        cls.room.participants.add(cls.user)
+        cls.other_room = Room.objects.create(host=cls.user, topic=cls.topic, name='Other room')
+        cls.messages = [Message.objects.create(user=cls.user, room=cls.room, body=f'Message {i}') for i in range(5)]
+        cls.other_message = Message.objects.create(user=cls.user, room=cls.other_room, body='Elsewhere')
+
+    def setUp(self):
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+
+    def test_delete_room_does_not_touch_its_messages(self):
+        # user, room, host, savepoint, locked ids and topics, update,
+        # tombstone, count update, release
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(reverse('delete-room', args=[self.room.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(queries), 9)
+        # Nothing reads or writes per-message or per-participant rows
+        self.assertFalse([
+            query['sql'] for query in queries
+            if 'base_message' in query['sql'] or 'base_room_participants' in query['sql']
+        ])
+
+        self.assertFalse(Room.objects.filter(pk=self.room.pk).exists())
+        self.assertFalse(Message.all_objects.filter(deleted_at__isnull=False).exists())
+        listed = self.client.get(reverse('message-list')).data
+        self.assertEqual([message['id'] for message in listed], [self.other_message.pk])
+        self.assertIsNotNone(Room.all_objects.get(pk=self.room.pk).deleted_at)
+        self.assertEqual(self.client.get(reverse('room-detail', args=[self.room.pk])).status_code, 404)
+
+    def test_delete_room_updates_topic_count_and_tombstones(self):
+        soft_delete_rooms([self.room.pk])
+
+        self.topic.refresh_from_db()
+        self.assertEqual(self.topic.room_count, 1)
+        self.assertEqual(
+            list(Tombstone.objects.values_list('kind', 'object_id')), [(Tombstone.ROOM, self.room.pk)]
+        )
+
+    def test_tombstones_only_for_rows_deleted(self):
+        soft_delete_rooms([self.room.pk])
+        soft_delete_rooms([self.room.pk, 9999])
+        soft_delete_messages([self.other_message.pk, 9999])
+        soft_delete_messages([self.other_message.pk])
+
+        self.assertEqual(
+            sorted(Tombstone.objects.values_list('kind', 'object_id')),
+            sorted([(Tombstone.ROOM, self.room.pk), (Tombstone.MESSAGE, self.other_message.pk)]),
+        )
+        self.topic.refresh_from_db()
+        self.assertEqual(self.topic.room_count, 1)
+
+    def test_delete_message(self):
+        message = self.messages[0]
+        response = self.client.delete(reverse('message-detail', args=[message.pk]))
+        self.assertEqual(response.status_code, 204)
+
+        self.assertFalse(Message.objects.filter(pk=message.pk).exists())
+        self.assertTrue(Message.all_objects.filter(pk=message.pk).exists())
+        self.assertEqual(
+            list(Tombstone.objects.values_list('kind', 'object_id')), [(Tombstone.MESSAGE, message.pk)]
+        )
+
+    def test_purge_respects_age(self):
+        soft_delete_rooms([self.room.pk])
+
+        counts = purge(timezone.now() - timedelta(hours=1), batch_size=2)
+
+        self.assertEqual(counts, {'messages': 0, 'participants': 0, 'rooms': 0})
+        self.assertTrue(Room.all_objects.filter(pk=self.room.pk).exists())
+
+    def test_purge_in_batches(self):
+        soft_delete_rooms([self.room.pk])
+        soft_delete_messages([self.other_message.pk])
+        tombstones = Tombstone.objects.count()
+
+        counts = purge(timezone.now() + timedelta(seconds=1), batch_size=2)
+
+        self.assertEqual(counts, {'messages': 6, 'participants': 1, 'rooms': 1})
+        self.assertFalse(Room.all_objects.filter(pk=self.room.pk).exists())
+        self.assertEqual(list(Room.all_objects.all()), [self.other_room])
+        self.assertFalse(Message.all_objects.exists())
+        # Clients were told at soft-delete time; counts were adjusted then too
+        self.assertEqual(Tombstone.objects.count(), tombstones)
+        self.topic.refresh_from_db()
+        self.assertEqual(self.topic.room_count, 1)
+
+    def test_purge_stops_after_max_batches(self):
+        soft_delete_rooms([self.room.pk])
+        cutoff = timezone.now() + timedelta(seconds=1)
+
+        self.assertEqual(purge(cutoff, batch_size=2, max_batches=2)['messages'], 4)
+        self.assertEqual(purge(cutoff, batch_size=2), {'messages': 1, 'participants': 1, 'rooms': 1})
+
+    def test_purge_command(self):
+        soft_delete_rooms([self.room.pk])
+        Room.all_objects.filter(pk=self.room.pk).update(deleted_at=timezone.now() - timedelta(days=2))
+        out = StringIO()
+
+        call_command('purge_deleted', '--batch-size', '3', stdout=out)
+
+        self.assertIn('Purged 5 messages, 1 participants and 1 rooms.', out.getvalue())
+        self.assertFalse(Room.all_objects.filter(pk=self.room.pk).exists())
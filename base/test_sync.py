@@ -0,0 +1,147 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from base.models import Message, Room, Tombstone, Topic
+from base.sync import encode_token
+
+User = get_user_model()
+
+
+class SyncTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        cls.topic = Topic.objects.create(name='Python')
+        cls.room = Room.objects.create(host=cls.user, topic=cls.topic, name='Python room')
+        cls.message = Message.objects.create(user=cls.user, room=cls.room, body='Hello')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def sync(self, since=None):
+        response = self.client.get(reverse('sync'), {'since': since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def backdate(self, seconds=60):
+        # Moves every existing row before the token the next sync starts from
+        past = timezone.now() - timedelta(seconds=seconds)
+        Room.objects.update(updated=past)
+        Message.objects.update(updated=past)
+        Topic.objects.update(updated=past)
+        Tombstone.objects.update(deleted=past)
+        return encode_token(past + timedelta(seconds=1))
+
+    def test_full_sync_without_token(self):
+        data = self.sync()
+
+        self.assertEqual([room['id'] for room in data['rooms']], [self.room.id])
+        self.assertEqual([message['id'] for message in data['messages']], [self.message.id])
+        self.assertEqual(data['messages'][0]['room'], self.room.id)
+        self.assertEqual([topic['id'] for topic in data['topics']], [self.topic.id])
+        self.assertEqual(data['deleted'], {'rooms': [], 'messages': [], 'topics': []})
+        self.assertTrue(data['next'].isdigit())
+        self.assertFalse(data['has_more'])
+
+    def test_only_changes_since_token(self):
+        since = self.backdate()
+        self.assertEqual(self.sync(since)['rooms'], [])
+
+        other = Room.objects.create(host=self.user, topic=self.topic, name='Another room')
+        reply = Message.objects.create(user=self.user, room=self.room, body='Reply')
+        data = self.sync(since)
+
+        self.assertEqual({room['id'] for room in data['rooms']}, {other.id})
+        self.assertEqual([message['id'] for message in data['messages']], [reply.id])
+        # The new room bumped its topic's room_count
+        self.assertEqual([(topic['id'], topic['room_count']) for topic in data['topics']], [(self.topic.id, 2)])
+
+    def test_deletions_are_reported(self):
+        doomed = Room.objects.create(host=self.user, topic=self.topic, name='Doomed room')
+        Message.objects.create(user=self.user, room=doomed, body='Gone with the room')
+        since = self.backdate()
+
+        room_id, message_id = doomed.id, self.message.id
+        self.message.delete()
+        doomed.delete()
+        data = self.sync(since)
+
+        # The room's own messages go with its tombstone
+        self.assertEqual(data['deleted'], {'rooms': [room_id], 'messages': [message_id], 'topics': []})
+        self.assertEqual(Tombstone.objects.filter(kind=Tombstone.MESSAGE).count(), 1)
+
+    def test_pages_until_has_more_is_false(self):
+        rooms = [Room.objects.create(host=self.user, topic=self.topic, name=f'Room {i}') for i in range(4)]
+        since = self.backdate()
+        for room in rooms:
+            room.save()
+        Message.objects.create(user=self.user, room=self.room, body='Reply')
+        doomed = rooms.pop(0)
+        deleted_id = doomed.id
+        doomed.delete()
+
+        seen, deleted, token, pages = set(), [], since, 0
+        while True:
+            response = self.client.get(reverse('sync'), {'since': token, 'limit': 2})
+            data = response.data
+            seen.update(room['id'] for room in data['rooms'])
+            deleted += data['deleted']['rooms']
+            pages += 1
+            token = data['next']
+            if not data['has_more']:
+                break
+            self.assertEqual(len(data['rooms']), 2)
+
+        self.assertEqual(pages, 2)
+        self.assertEqual(seen, {room.id for room in rooms})
+        self.assertEqual(deleted, [deleted_id])
+        self.assertTrue(token.isdigit())
+
+    def test_row_changed_between_pages_is_sent_again(self):
+        rooms = [Room.objects.create(host=self.user, topic=self.topic, name=f'Room {i}') for i in range(3)]
+        data = self.client.get(reverse('sync'), {'limit': 2}).data
+        self.assertTrue(data['has_more'])
+        first = [room['id'] for room in data['rooms']]
+
+        Room.objects.get(pk=first[0]).save()
+        sent = list(first)
+        while data['has_more']:
+            data = self.client.get(reverse('sync'), {'since': data['next'], 'limit': 2}).data
+            sent += [room['id'] for room in data['rooms']]
+
+        self.assertEqual(sorted(sent), sorted([self.room.id, first[0], *(room.id for room in rooms)]))
+
+    def test_limit_is_capped(self):
+        with self.settings(SYNC_MAX_LIMIT=1):
+            Room.objects.create(host=self.user, topic=self.topic, name='Another room')
+            data = self.client.get(reverse('sync'), {'limit': 50}).data
+        self.assertEqual(len(data['rooms']), 1)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(self.client.get(reverse('sync'), {'limit': 0}).status_code, 400)
+
+    def test_next_token_overlaps(self):
+        data = self.sync()
+        # Rows written within SYNC_OVERLAP_SECONDS before the response are sent again
+        self.assertEqual([room['id'] for room in self.sync(data['next'])['rooms']], [self.room.id])
+
+    def test_invalid_and_expired_tokens(self):
+        for token in ['yesterday', '1_2.3', '1_2.3_4.5_6.7_99999999999999999999', '1_x.3_4.5_6.7_8']:
+            with self.subTest(token=token):
+                self.assertEqual(self.client.get(reverse('sync'), {'since': token}).status_code, 400)
+        expired = encode_token(timezone.now() - timedelta(days=365))
+        self.assertEqual(self.client.get(reverse('sync'), {'since': expired}).status_code, 410)
+
+    def test_prune_tombstones(self):
+        self.message.delete()
+        Tombstone.objects.update(deleted=timezone.now() - timedelta(days=365))
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('Pruned 1', out.getvalue())
+        self.assertFalse(Tombstone.objects.exists())
@@ -0,0 +1,71 @@
+from django.db import IntegrityError
+from django.test import TestCase, TransactionTestCase
+from base.models import Topic, normalize_topic_name
+from base.topics import TopicCache, resolve_topic, resolve_topics, topic_cache
+
+
+class TopicKeyTest(TestCase):
+    def test_normalize_topic_name(self):
+        self.assertEqual(normalize_topic_name('  Machine   Learning '), 'machine learning')
+        self.assertEqual(normalize_topic_name('PYTHON'), 'python')
+
+    def test_key_is_set_on_save(self):
+        topic = Topic.objects.create(name='Data  Science')
+        self.assertEqual(topic.key, 'data science')
+
+    def test_key_is_unique(self):
+        Topic.objects.create(name='Python')
+        with self.assertRaises(IntegrityError):
+            Topic.objects.create(name='python')
+
+
+class TopicCacheTest(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = TopicCache(maxsize=2)
+        cache.put('a', (1, 'A'))
+        cache.put('b', (2, 'B'))
+        cache.get('a')
+        cache.put('c', (3, 'C'))
+        self.assertEqual(cache.get('a'), (1, 'A'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), (3, 'C'))
+
+
+class ResolveTopicTest(TransactionTestCase):
+    def setUp(self):
+        topic_cache.clear()
+        self.addCleanup(topic_cache.clear)
+
+    def test_resolve_creates_once(self):
+        first = resolve_topic('Python')
+        second = resolve_topic(' python ')
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(Topic.objects.count(), 1)
+
+    def test_cache_hit_costs_no_queries(self):
+        topic = resolve_topic('Python')
+        with self.assertNumQueries(0):
+            cached = resolve_topic('PYTHON')
+        self.assertEqual(cached.id, topic.id)
+        self.assertEqual(cached.name, 'Python')
+
+    def test_rename_invalidates_cache(self):
+        topic = resolve_topic('Python')
+        topic.name = 'Python 3'
+        topic.save()
+        self.assertIsNone(topic_cache.get('python'))
+        self.assertNotEqual(resolve_topic('Python').id, topic.id)
+
+    def test_delete_invalidates_cache(self):
+        topic = resolve_topic('Python')
+        Topic.objects.get(id=topic.id).delete()
+        self.assertNotEqual(resolve_topic('Python').id, topic.id)
+
+    def test_resolve_topics_in_bulk(self):
+        existing = Topic.objects.create(name='Django')
+        topics = resolve_topics(['django', 'Flask', ' flask'])
+        self.assertEqual(topics['django'].id, existing.id)
+        self.assertEqual(topics['Flask'].id, topics[' flask'].id)
+        self.assertEqual(Topic.objects.count(), 2)
+        with self.assertNumQueries(0):
+            resolve_topics(['Django', 'FLASK'])
@@ -1,4 +1,6 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -6,6 +8,11 @@ from django.contrib.auth import get_user_model
 from base.models import Room, Topic, Message
 from rest_framework_simplejwt.tokens import RefreshToken
 import json
+from unittest.mock import patch
+from django.core.cache import caches
+from django.conf import settings
+from study_companion_api.profiling import histograms
+from base.topics import topic_cache
 
 User = get_user_model()
 
@@ -55,14 +62,17 @@ class AuthenticationTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 class UserViewTestCase(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123',
             name='Test User'
         )
+
+    def setUp(self):
+        self.client = APIClient()
         self.token = RefreshToken.for_user(self.user)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token.access_token}')
 
@@ -78,6 +88,42 @@ class UserViewTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['email'], 'test@example.com')
 
+    def test_get_missing_user(self):
+        response = self.client.get(reverse('user', kwargs={'pk': 9999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_users_by_ids(self):
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        # The authenticated user, then every requested id at once
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('users'), {'ids': f'{self.user.id},{other.id},9999,{other.id}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['users']), {str(self.user.id), str(other.id)})
+        self.assertEqual(response.data['users'][str(other.id)]['username'], 'other')
+        self.assertEqual(response.data['missing'], [9999])
+
+    def test_post_users_by_ids(self):
+        response = self.client.post(reverse('users'), {'ids': [self.user.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['users'][str(self.user.id)]['email'], 'test@example.com')
+        self.assertEqual(response.data['missing'], [])
+
+    @override_settings(USER_BATCH_MAX_SIZE=2)
+    def test_get_users_by_ids_validation(self):
+        for ids in ['', '1,x', '1,2,3', '1,1,1', '0', '-1', '1.5', '9' * 40]:
+            with self.subTest(ids=ids):
+                response = self.client.get(reverse('users'), {'ids': ids})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for ids in ['nope', [True], [1.7], [10 ** 40], [[1]], ['9' * 40]]:
+            with self.subTest(ids=ids):
+                response = self.client.post(reverse('users'), {'ids': ids}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_users_by_string_ids(self):
+        response = self.client.post(reverse('users'), {'ids': [str(self.user.id), self.user.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data['users']), [str(self.user.id)])
+
     def test_update_user_profile(self):
         url = reverse('update-user')
         update_data = {
@@ -90,20 +136,23 @@ class UserViewTestCase(TestCase):
         self.assertEqual(self.user.name, 'Updated Name')
 
 class RoomViewTestCase(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.topic = Topic.objects.create(name='Python')
-        self.room = Room.objects.create(
-            host=self.user,
-            topic=self.topic,
+        cls.topic = Topic.objects.create(name='Python')
+        cls.room = Room.objects.create(
+            host=cls.user,
+            topic=cls.topic,
             name='Test Room',
             description='Test Description'
         )
+
+    def setUp(self):
+        self.client = APIClient()
         self.token = RefreshToken.for_user(self.user)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token.access_token}')
 
@@ -113,11 +162,24 @@ class RoomViewTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
 
+    def test_rooms_list_queries_do_not_grow_with_rooms(self):
+        for i in range(3):
+            host = User.objects.create_user(username=f'host{i}', email=f'host{i}@example.com', password='testpass123')
+            room = Room.objects.create(host=host, topic=Topic.objects.create(name=f'Topic {i}'), name=f'Room {i}')
+            room.participants.add(self.user, host)
+
+        url = reverse('room-list')
+        # Token user lookup, exists(), the list and one participants prefetch
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 4)
+
     def test_get_room_detail(self):
         url = reverse('room-detail', kwargs={'pk': self.room.id})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['name'], 'Test Room')
+        self.assertNotIn('deleted_at', response.data)
 
     def test_create_room(self):
         url = reverse('create-room')
@@ -142,6 +204,33 @@ class RoomViewTestCase(TestCase):
         self.room.refresh_from_db()
         self.assertEqual(self.room.name, 'Updated Room')
 
+    def test_update_room_topic(self):
+        url = reverse('update-room', kwargs={'pk': self.room.id})
+        response = self.client.put(url, {'topic': 'Django'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['topic']['name'], 'Django')
+        self.assertEqual(response.data['topic']['room_count'], 1)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.topic.name, 'Django')
+
+    def test_create_room_reuses_normalized_topic(self):
+        topic_cache.clear()
+        self.addCleanup(topic_cache.clear)
+        url = reverse('create-room')
+        # The topic is only cached once the request's transaction commits
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as first:
+            response = self.client.post(url, {'name': 'Another Room', 'topic': '  python '})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['topic']['id'], self.topic.id)
+        self.assertEqual(response.data['topic']['room_count'], 2)
+        self.assertEqual(Topic.objects.count(), 1)
+
+        # Served from the topic cache, still with the current count
+        with CaptureQueriesContext(connection) as cached:
+            response = self.client.post(url, {'name': 'Third Room', 'topic': 'Python'})
+        self.assertEqual(response.data['topic']['room_count'], 3)
+        self.assertLess(len(cached), len(first))
+
     def test_update_room_as_non_host(self):
         other_user = User.objects.create_user(
             username='otheruser',
@@ -162,25 +251,69 @@ class RoomViewTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Room.objects.filter(id=self.room.id).exists())
 
-class MessageViewTestCase(TestCase):
+class StaleTopicTestCase(TransactionTestCase):
+    """
+    A topic deleted by another worker stays in this worker's topic cache.
+    Foreign keys are only checked at commit, which a TestCase never reaches.
+    """
+
     def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.room = Room.objects.create(host=self.user, topic=Topic.objects.create(name='Python'), name='Room')
         self.client = APIClient()
-        self.user = User.objects.create_user(
+        self.client.force_authenticate(self.user)
+        topic_cache.clear()
+        self.addCleanup(topic_cache.clear)
+        topic_cache.put('ghost', (9999, 'Ghost'))
+
+    def assert_ghost_recreated(self, topic_id):
+        ghost = Topic.objects.get(key='ghost')
+        self.assertEqual(topic_id, ghost.id)
+        self.assertNotEqual(ghost.id, 9999)
+        self.assertEqual(ghost.room_count, 1)
+
+    def test_create_room_with_deleted_topic(self):
+        response = self.client.post(reverse('create-room'), {'name': 'Haunted', 'topic': 'Ghost'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assert_ghost_recreated(response.data['topic']['id'])
+        self.assertEqual(topic_cache.get('ghost')[0], response.data['topic']['id'])
+
+    def test_update_room_with_deleted_topic(self):
+        response = self.client.put(reverse('update-room', kwargs={'pk': self.room.id}), {'topic': 'Ghost'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assert_ghost_recreated(response.data['topic']['id'])
+
+    def test_batch_update_with_deleted_topic(self):
+        data = {'rooms': [{'id': self.room.id, 'topic': 'Ghost'}]}
+        response = self.client.put(reverse('batch-update-rooms'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.room.refresh_from_db()
+        self.assert_ghost_recreated(self.room.topic_id)
+        self.assertEqual(Topic.objects.get(name='Python').room_count, 0)
+
+
+class MessageViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.topic = Topic.objects.create(name='Python')
-        self.room = Room.objects.create(
-            host=self.user,
-            topic=self.topic,
+        cls.topic = Topic.objects.create(name='Python')
+        cls.room = Room.objects.create(
+            host=cls.user,
+            topic=cls.topic,
             name='Test Room'
         )
-        self.message = Message.objects.create(
-            user=self.user,
-            room=self.room,
+        cls.message = Message.objects.create(
+            user=cls.user,
+            room=cls.room,
             body='Test message'
         )
+
+    def setUp(self):
+        self.client = APIClient()
         self.token = RefreshToken.for_user(self.user)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token.access_token}')
 
@@ -189,6 +322,21 @@ class MessageViewTestCase(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
+        self.assertNotIn('deleted_at', response.data[0])
+        self.assertNotIn('deleted_at', response.data[0]['room'])
+
+    def test_messages_list_queries_do_not_grow_with_messages(self):
+        for i in range(3):
+            author = User.objects.create_user(username=f'author{i}', email=f'author{i}@example.com', password='testpass123')
+            room = Room.objects.create(host=author, topic=self.topic, name=f'Room {i}')
+            room.participants.add(author)
+            Message.objects.create(user=author, room=room, body=f'Message {i}')
+
+        url = reverse('message-list')
+        # Token user lookup, exists(), the list and one participants prefetch
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 4)
 
     def test_create_message(self):
         url = reverse('create-message', kwargs={'room_pk': self.room.id})
@@ -199,6 +347,47 @@ class MessageViewTestCase(TestCase):
         # Check if user was added to participants
         self.assertIn(self.user, self.room.participants.all())
 
+    def test_create_message_compact_response(self):
+        url = reverse('create-message', kwargs={'room_pk': self.room.id})
+        response = self.client.post(url, {'body': 'New message'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['room'], self.room.id)
+        self.assertEqual(response.data['user']['id'], self.user.id)
+        self.assertEqual(response.data['body'], 'New message')
+
+    def test_create_message_bumps_room_activity(self):
+        previous_update = self.room.updated
+        url = reverse('create-message', kwargs={'room_pk': self.room.id})
+        self.client.post(url, {'body': 'New message'})
+        self.room.refresh_from_db()
+        self.assertGreater(self.room.updated, previous_update)
+
+    def test_create_message_repeat_poster(self):
+        url = reverse('create-message', kwargs={'room_pk': self.room.id})
+        self.client.post(url, {'body': 'First'})
+        # user, room update, savepoint, participant insert, message insert, release
+        with self.assertNumQueries(6):
+            response = self.client.post(url, {'body': 'Second'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.room.participants.count(), 1)
+
+    def test_create_message_missing_room(self):
+        url = reverse('create-message', kwargs={'room_pk': 9999})
+        response = self.client.post(url, {'body': 'New message'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_create_message_invalid_does_not_touch_room(self):
+        previous_update = self.room.updated
+        url = reverse('create-message', kwargs={'room_pk': self.room.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'body': ''})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Rejected before any write, not rolled back after one
+        self.assertFalse([q['sql'] for q in queries if q['sql'].startswith(('UPDATE', 'INSERT'))])
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.updated, previous_update)
+        self.assertEqual(self.room.participants.count(), 0)
+
     def test_delete_own_message(self):
         url = reverse('message-detail', kwargs={'msg_pk': self.message.id})
         response = self.client.delete(url)
@@ -219,26 +408,29 @@ class MessageViewTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 class SearchViewTestCase(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.topic = Topic.objects.create(name='Python Programming')
-        self.room = Room.objects.create(
-            host=self.user,
-            topic=self.topic,
+        cls.topic = Topic.objects.create(name='Python Programming')
+        cls.room = Room.objects.create(
+            host=cls.user,
+            topic=cls.topic,
             name='Python Study Group',
             description='Learning Python together'
         )
-        self.message = Message.objects.create(
-            user=self.user,
-            room=self.room,
+        cls.message = Message.objects.create(
+            user=cls.user,
+            room=cls.room,
             body='Hello Python developers!'
         )
 
+    def setUp(self):
+        self.client = APIClient()
+
     def test_search_rooms(self):
         url = reverse('search')
         response = self.client.get(url, {'q': 'Python'})
@@ -247,6 +439,19 @@ class SearchViewTestCase(TestCase):
         self.assertEqual(len(response.data['topics']), 1)
         self.assertEqual(len(response.data['messages']), 1)
 
+    def test_search_queries_do_not_grow_with_results(self):
+        for i in range(3):
+            host = User.objects.create_user(username=f'host{i}', email=f'host{i}@example.com', password='testpass123')
+            room = Room.objects.create(host=host, topic=self.topic, name=f'Python room {i}')
+            room.participants.add(host)
+            Message.objects.create(user=host, room=room, body=f'Python message {i}')
+
+        url = reverse('search')
+        with self.assertNumQueries(5):
+            response = self.client.get(url, {'q': 'Python'})
+        self.assertEqual(len(response.data['rooms']), 4)
+        self.assertEqual(len(response.data['messages']), 4)
+
     def test_search_no_results(self):
         url = reverse('search')
         response = self.client.get(url, {'q': 'NonExistent'})
@@ -256,13 +461,352 @@ class SearchViewTestCase(TestCase):
         self.assertEqual(len(response.data['messages']), 0)
 
 class TopicViewTestCase(TestCase):
-    def setUp(self):
-        self.client = APIClient()
+    @classmethod
+    def setUpTestData(cls):
         Topic.objects.create(name='Python')
         Topic.objects.create(name='Django')
 
+    def setUp(self):
+        self.client = APIClient()
+
     def test_get_topics_list(self):
         url = reverse('topics-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
\ No newline at end of file
+        self.assertEqual(len(response.data), 2)
+
+    def test_popular_topics(self):
+        user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        django = Topic.objects.get(name='Django')
+        Topic.objects.create(name='Flask')
+        for i in range(2):
+            Room.objects.create(host=user, topic=django, name=f'Room {i}')
+
+        url = reverse('topics-list')
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'sort': 'popular', 'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(topic['name'], topic['room_count']) for topic in response.data],
+            [('Django', 2), ('Flask', 0)]
+        )
+
+    def test_topics_invalid_limit(self):
+        response = self.client.get(reverse('topics-list'), {'limit': 'all'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RateLimitTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        caches['throttle'].clear()
+        self.addCleanup(caches['throttle'].clear)
+
+    @patch('base.views.verify_recaptcha', return_value=False)
+    def test_login_throttled_per_email(self, verify_recaptcha):
+        login_data = {'email': 'victim@example.com', 'password': 'guess'}
+        for _ in range(5):
+            response = self.client.post(reverse('login'), login_data)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(reverse('login'), login_data)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        # Rejected before any outbound reCAPTCHA call
+        self.assertEqual(verify_recaptcha.call_count, 5)
+
+    @patch('base.views.verify_recaptcha', return_value=False)
+    def test_login_email_window_is_normalized(self, verify_recaptcha):
+        for email in ['Victim@Example.com', ' victim@example.com', 'VICTIM@example.com ']:
+            self.client.post(reverse('login'), {'email': email, 'password': 'x'})
+        self.client.post(reverse('login'), {'email': 'victim@example.com', 'password': 'x'})
+        self.client.post(reverse('login'), {'email': 'victim@example.com', 'password': 'x'})
+
+        response = self.client.post(reverse('login'), {'email': 'victim@example.com', 'password': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @patch('base.views.verify_recaptcha', return_value=False)
+    def test_login_throttled_per_ip(self, verify_recaptcha):
+        for i in range(20):
+            self.client.post(reverse('login'), {'email': f'user{i}@example.com', 'password': 'x'})
+
+        response = self.client.post(reverse('login'), {'email': 'fresh@example.com', 'password': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @patch('base.views.verify_recaptcha', return_value=True)
+    def test_login_non_string_email(self, verify_recaptcha):
+        response = self.client.post(reverse('login'), {'email': 5, 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('base.views.verify_recaptcha', return_value=False)
+    def test_forwarded_for_is_not_trusted(self, verify_recaptcha):
+        for i in range(20):
+            self.client.post(
+                reverse('login'), {'email': f'user{i}@example.com', 'password': 'x'},
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{i}',
+            )
+
+        response = self.client.post(
+            reverse('login'), {'email': 'fresh@example.com', 'password': 'x'}, HTTP_X_FORWARDED_FOR='10.0.1.1'
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @patch('base.views.verify_recaptcha', return_value=False)
+    def test_register_throttled_per_email(self, verify_recaptcha):
+        register_data = {'email': 'new@example.com', 'username': 'new'}
+        for _ in range(3):
+            self.client.post(reverse('register'), register_data)
+
+        response = self.client.post(reverse('register'), register_data)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(verify_recaptcha.call_count, 3)
+
+class BulkMessageViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        cls.topic = Topic.objects.create(name='Python')
+        cls.room = Room.objects.create(
+            host=cls.user,
+            topic=cls.topic,
+            name='Test Room'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('create-messages-bulk', kwargs={'room_pk': self.room.id})
+        self.token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token.access_token}')
+
+    def test_bulk_create_messages(self):
+        data = {'messages': [{'body': f'Message {i}'} for i in range(10)]}
+        # user, room, savepoint, participant insert, one multi-row insert, release
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['ids']), 10)
+        self.assertEqual(Message.objects.filter(room=self.room, user=self.user).count(), 10)
+        self.assertIn(self.user, self.room.participants.all())
+
+    def test_bulk_create_accepts_plain_list(self):
+        response = self.client.post(self.url, [{'body': 'One'}, {'body': 'Two'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(Message.objects.filter(id__in=response.data['ids']).values_list('body', flat=True).order_by('id')),
+            ['One', 'Two']
+        )
+
+    def test_bulk_create_is_all_or_nothing(self):
+        data = {'messages': [{'body': 'Valid'}, {'body': ''}]}
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Message.objects.exists())
+
+    @override_settings(MESSAGE_BULK_MAX_SIZE=2)
+    def test_bulk_create_size_cap(self):
+        data = {'messages': [{'body': 'a'}, {'body': 'b'}, {'body': 'c'}]}
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Message.objects.exists())
+
+    def test_bulk_create_missing_room(self):
+        url = reverse('create-messages-bulk', kwargs={'room_pk': 9999})
+        response = self.client.post(url, {'messages': [{'body': 'Hi'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class BatchRoomViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        cls.other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='pass123'
+        )
+        cls.topic = Topic.objects.create(name='Python')
+        cls.rooms = [
+            Room.objects.create(host=cls.user, topic=cls.topic, name=f'Room {i}')
+            for i in range(3)
+        ]
+        cls.other_room = Room.objects.create(host=cls.other_user, topic=cls.topic, name='Other')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token.access_token}')
+
+    def test_batch_update_rooms(self):
+        data = {'rooms': [
+            {'id': self.rooms[0].id, 'name': 'Renamed', 'topic': 'Django'},
+            {'id': self.rooms[1].id, 'description': 'New description', 'topic': 'Django'},
+            {'id': self.rooms[2].id, 'topic': 'Python'},
+        ]}
+        response = self.client.put(reverse('batch-update-rooms'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for room in self.rooms:
+            room.refresh_from_db()
+        self.assertEqual(self.rooms[0].name, 'Renamed')
+        self.assertEqual(self.rooms[1].description, 'New description')
+        self.assertEqual(self.rooms[0].topic, self.rooms[1].topic)
+        self.assertEqual(self.rooms[0].topic.name, 'Django')
+        self.assertEqual(self.rooms[2].topic, self.topic)
+        self.assertEqual(Topic.objects.filter(name='Django').count(), 1)
+        self.topic.refresh_from_db()
+        self.assertEqual(self.topic.room_count, 2)
+        self.assertEqual(Topic.objects.get(name='Django').room_count, 2)
+
+    def test_batch_update_query_count_is_constant(self):
+        data = {'rooms': [{'id': room.id, 'name': 'Renamed', 'topic': 'Django'} for room in self.rooms]}
+        # user, savepoint, host check, topic lookup, topic insert, topic read-back,
+        # rooms, bulk update, one counter update per distinct delta, release
+        with self.assertNumQueries(11):
+            self.client.put(reverse('batch-update-rooms'), data, format='json')
+
+    def test_batch_update_rejects_foreign_rooms(self):
+        data = {'rooms': [
+            {'id': self.rooms[0].id, 'name': 'Renamed'},
+            {'id': self.other_room.id, 'name': 'Hacked'},
+        ]}
+        response = self.client.put(reverse('batch-update-rooms'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['ids'], [self.other_room.id])
+        self.rooms[0].refresh_from_db()
+        self.assertEqual(self.rooms[0].name, 'Room 0')
+
+    def test_batch_update_missing_room(self):
+        data = {'rooms': [{'id': 9999, 'name': 'Ghost'}]}
+        response = self.client.put(reverse('batch-update-rooms'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['missing'], [9999])
+
+    def test_batch_update_empty_topic(self):
+        data = {'rooms': [{'id': self.rooms[0].id, 'topic': '  '}]}
+        response = self.client.put(reverse('batch-update-rooms'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_delete_rooms(self):
+        Message.objects.create(user=self.user, room=self.rooms[0], body='Hello')
+        ids = [self.rooms[0].id, self.rooms[1].id]
+        response = self.client.delete(reverse('batch-delete-rooms'), {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Room.objects.filter(id__in=ids).exists())
+        self.assertEqual(self.client.get(reverse('message-list')).json(), [])
+        self.assertTrue(Room.objects.filter(id=self.rooms[2].id).exists())
+
+    def test_batch_delete_rejects_foreign_rooms(self):
+        ids = [self.rooms[0].id, self.other_room.id]
+        response = self.client.delete(reverse('batch-delete-rooms'), {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Room.objects.filter(id__in=ids).count(), 2)
+
+    @override_settings(ROOM_BATCH_MAX_SIZE=2)
+    def test_batch_delete_size_cap(self):
+        ids = [room.id for room in self.rooms]
+        response = self.client.delete(reverse('batch-delete-rooms'), {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_ids_must_be_integers(self):
+        for ids in [['abc'], [[1]], [{'a': 1}], [10 ** 30], [True], [1.5], [0]]:
+            with self.subTest(ids=ids):
+                response = self.client.delete(reverse('batch-delete-rooms'), {'ids': ids}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                data = {'rooms': [{'id': ids[0], 'name': 'Renamed'}]}
+                response = self.client.put(reverse('batch-update-rooms'), data, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class DatabasePoolStatsViewTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('db-pool-stats')
+
+    def authenticate(self, **extra):
+        user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            **extra
+        )
+        token = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+
+    def test_pool_stats_for_staff(self):
+        self.authenticate(is_staff=True)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # SQLite has no connection pool
+        self.assertEqual(response.data['pools'], {})
+
+    def test_pool_stats_requires_staff(self):
+        self.authenticate()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class MetricsViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('metrics')
+        histograms.clear()
+        token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+
+    def test_metrics_empty_when_profiling_off(self):
+        self.client.get(reverse('room-list'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertNotIn('_bucket', response.content.decode())
+
+    def test_sampled_requests_are_broken_down_by_phase(self):
+        Room.objects.create(host=self.user, topic=Topic.objects.create(name='Python'), name='Room')
+        middleware = ['study_companion_api.profiling.ProfilingMiddleware'] + settings.MIDDLEWARE
+        with override_settings(PROFILING_SAMPLE_RATE=1.0, MIDDLEWARE=middleware):
+            client = APIClient()
+            client.credentials(**self.client._credentials)
+            client.get(reverse('room-list'))
+            client.get(reverse('room-list'))
+        body = self.client.get(self.url).content.decode()
+
+        self.assertIn('# TYPE api_request_phase_seconds histogram', body)
+        for phase in ('total', 'db', 'serialization', 'authentication', 'other'):
+            self.assertIn(
+                f'api_request_phase_seconds_count{{endpoint="room-list",phase="{phase}"}} 2', body
+            )
+        self.assertIn('api_request_phase_seconds_bucket{endpoint="room-list",phase="db",le="+Inf"} 2', body)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_with_scrape_token(self):
+        client = APIClient()
+        self.assertEqual(client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = client.get(self.url, HTTP_X_METRICS_TOKEN='wrong')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = client.get(self.url, HTTP_X_METRICS_TOKEN='scrape-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_metrics_requires_staff(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,56 @@
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class CredentialRateThrottle(SimpleRateThrottle):
+    """
+    Sliding-window throttle for the credential endpoints.
+
+    DRF keeps a per-key history of request timestamps and drops the ones
+    older than the window, so this is a true sliding window rather than a
+    fixed bucket. Throttles run in ``APIView.initial()``, i.e. before the
+    view body, so a rejected request never reaches reCAPTCHA or PBKDF2.
+
+    History lives in the ``throttle`` cache alias: local memory by default,
+    a shared Redis cache when ``RATE_LIMIT_CACHE_URL`` is set so that all
+    workers see the same counters.
+    """
+    cache = caches['throttle']
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_key(request)
+        if not ident:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class EmailRateThrottle(CredentialRateThrottle):
+    """Keys the window on the normalized email from the request body."""
+
+    def get_ident_key(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not email:
+            return None
+        if not isinstance(email, str):
+            # Malformed JSON body: still count it, against the client's IP
+            return self.get_ident(request)
+        return email.lower().strip()
+
+
+class LoginIPRateThrottle(CredentialRateThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailRateThrottle(EmailRateThrottle):
+    scope = 'login_email'
+
+
+class RegisterIPRateThrottle(CredentialRateThrottle):
+    scope = 'register_ip'
+
+
+class RegisterEmailRateThrottle(EmailRateThrottle):
+    scope = 'register_email'
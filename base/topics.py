@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from base.models import Topic, normalize_topic_name
+
+
+class TopicCache:
+    """
+    Thread-safe, bounded LRU mapping a normalized topic key to (id, name).
+
+    Entries are only added after the surrounding transaction commits, so a
+    rolled-back request can never leave a dangling topic id behind. Each
+    worker process keeps its own cache; it is invalidated locally when a
+    topic is saved or deleted, so other workers keep a renamed topic's old
+    name (or a deleted topic's id) until the entry is evicted or the worker
+    restarts. Topics are only renamed or deleted from the admin. A write
+    that fails on a deleted topic's id calls ``forget_deleted_topics`` and
+    resolves the name again.
+
+    Only ids and names are cached: a topic built from an entry has the
+    default ``room_count``, so responses that show it must read it back.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key, topic_id=None):
+        """Drop ``key`` and, after a rename, any stale key for ``topic_id``."""
+        with self._lock:
+            self._data.pop(key, None)
+            if topic_id is not None:
+                stale = [k for k, (cached_id, _) in self._data.items() if cached_id == topic_id]
+                for k in stale:
+                    del self._data[k]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+topic_cache = TopicCache(settings.TOPIC_CACHE_SIZE)
+
+
+def _from_cache(key):
+    cached = topic_cache.get(key)
+    if cached is None:
+        return None
+    topic_id, name = cached
+    topic = Topic(id=topic_id, name=name, key=key)
+    topic._state.adding = False
+    topic._state.db = 'default'
+    return topic
+
+
+def _remember(topics):
+    entries = [(topic.key, (topic.id, topic.name)) for topic in topics]
+    transaction.on_commit(lambda: [topic_cache.put(key, value) for key, value in entries])
+
+
+def resolve_topic(name):
+    """
+    Return the Topic for ``name``, creating it if needed.
+
+    Costs zero queries on a cache hit and one unique-index probe on a miss.
+    Concurrent creators of the same topic are safe: ``get_or_create`` falls
+    back to a lookup when the unique ``key`` insert conflicts.
+    """
+    key = normalize_topic_name(name)
+    topic = _from_cache(key)
+    if topic is None:
+        topic, created = Topic.objects.get_or_create(key=key, defaults={'name': ' '.join(name.split())})
+        _remember([topic])
+    return topic
+
+
+def resolve_topics(names):
+    """
+    Resolve many topic names at once, returning a ``{name: Topic}`` dict.
+
+    Cache misses are fetched with one ``key IN (...)`` query; topics that
+    still don't exist are inserted with ``ignore_conflicts`` and read back,
+    so concurrent batches can't create duplicates.
+    """
+    keys = {name: normalize_topic_name(name) for name in names}
+    by_key = {}
+    for key in set(keys.values()):
+        topic = _from_cache(key)
+        if topic is not None:
+            by_key[key] = topic
+
+    missing = set(keys.values()) - by_key.keys()
+    if missing:
+        fetched = list(Topic.objects.filter(key__in=missing))
+        unknown = missing - {topic.key for topic in fetched}
+        if unknown:
+            first_names = {}
+            for name, key in keys.items():
+                first_names.setdefault(key, ' '.join(name.split()))
+            Topic.objects.bulk_create(
+                [Topic(key=key, name=first_names[key]) for key in unknown],
+                ignore_conflicts=True
+            )
+            fetched += list(Topic.objects.filter(key__in=unknown))
+        _remember(fetched)
+        by_key.update((topic.key, topic) for topic in fetched)
+
+    return {name: by_key[key] for name, key in keys.items()}
+
+
+def forget_deleted_topics(topics):
+    """
+    Evict those of ``topics`` that no longer exist from the cache, after a
+    write referencing them failed its foreign key. Returns whether there were
+    any, i.e. whether resolving the names again and retrying can help.
+    """
+    ids = {topic.id for topic in topics}
+    deleted = ids - set(Topic.objects.filter(id__in=ids).values_list('id', flat=True))
+    for topic in topics:
+        if topic.id in deleted:
+            topic_cache.discard(topic.key, topic.id)
+    return bool(deleted)
+
+
+def adjust_room_counts(deltas):
+    """
+    Apply ``{topic_id: delta}`` changes to ``Topic.room_count``.
+
+    Used by write paths that bypass model signals (``bulk_update``,
+    queryset ``update``). Topics sharing the same delta are updated by one
+    statement.
+    """
+    now = timezone.now()
+    by_delta = {}
+    for topic_id, delta in deltas.items():
+        if topic_id is not None and delta:
+            by_delta.setdefault(delta, []).append(topic_id)
+    for delta, topic_ids in by_delta.items():
+        Topic.objects.filter(id__in=topic_ids).update(room_count=F('room_count') + delta, updated=now)
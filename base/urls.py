@@ -15,6 +15,7 @@ urlpatterns = [
     # Users
     path('users/', views.get_users, name='users'),
     path('users/<int:pk>/', views.get_user, name='user'),
+    path('users/<int:pk>/profile/', views.user_profile, name='user-profile'),
     path('users/update/', views.update_user, name='update-user'),
     
     # Rooms
@@ -23,15 +24,29 @@ urlpatterns = [
     path('rooms/<int:pk>/', views.room_detail, name='room-detail'),
     path('rooms/<int:pk>/update/', views.update_delete_room, name='update-room'),
     path('rooms/<int:pk>/delete/', views.update_delete_room, name='delete-room'),
+    path('rooms/batch/update/', views.batch_update_rooms, name='batch-update-rooms'),
+    path('rooms/batch/delete/', views.batch_delete_rooms, name='batch-delete-rooms'),
     
     # Messages
     path('rooms/<int:room_pk>/create-message/', views.create_message, name='create-message'),
+    path('rooms/<int:room_pk>/messages/bulk/', views.create_messages_bulk, name='create-messages-bulk'),
     path('messages/', views.message_list, name='message-list'),
+    path('rooms/<int:room_pk>/messages/history/', views.room_history, name='room-history'),
     path('messages/<int:msg_pk>/', views.message_detail, name='message-detail'),
 
+    # Feed
+    path('feed/', views.feed, name='feed'),
+
+    # Delta sync
+    path('sync/', views.sync_changes, name='sync'),
+
     # Search
     path('search/', views.search, name='search'),
 
     # Topics
     path('topics/', views.topics_list, name='topics-list'),
+
+    # Operations
+    path('_pool/', views.db_pool_stats, name='db-pool-stats'),
+    path('_metrics/', views.metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -1,35 +1,58 @@
-from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import update_last_login
 from base.models import User, Room
 from .serializers import (
     RoomSerializer, 
     UserSerializer, 
     RegisterSerializer, 
     MessageSerializer,
+    MessageSummarySerializer,
     UserUpdateSerializer,
+    RoomBatchUpdateSerializer,
 )
-from base.models import Room, Topic, Message
+from base.models import MAX_ID, Room, Topic, Message, Tombstone
 from django.db.models import Q
 from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from .serializers import RoomSerializer, TopicSerializer, MessageSerializer
 from base.models import Room, Topic, Message
-from django.http import JsonResponse
-import requests
+from django.http import HttpResponse, JsonResponse
 from django.conf import settings
 import logging
+from study_companion_api.db_pool import pool_stats
+from study_companion_api.profiling import render_metrics
+from .permissions import HasMetricsToken
+from .topics import adjust_room_counts, forget_deleted_topics, resolve_topic, resolve_topics
+from .archive import room_history as archived_room_history
+from .feed import feed_page, remember_messages
+from .profiles import get_profile, invalidate_profiles
+from .soft_delete import soft_delete_messages, soft_delete_rooms
+from .sync import (
+    ExpiredToken, decode_token, deleted_page, encode_cursor, full_sync_positions, next_token, page,
+)
+from .throttling import (
+    LoginIPRateThrottle,
+    LoginEmailRateThrottle,
+    RegisterIPRateThrottle,
+    RegisterEmailRateThrottle,
+)
 
 def verify_recaptcha(token):
     """Verify reCAPTCHA token with Google"""
     if not token or not settings.RECAPTCHA_SECRET_KEY:
         return False
     
+    # Only needed at login; keep it off the worker's import path
+    import requests
     response = requests.post(
         'https://www.google.com/recaptcha/api/siteverify',
         data={
@@ -44,17 +67,27 @@ def get_routes(request):
     routes = [
         'GET /api',
         'GET /api/topics/',
+        'GET /api/topics/?sort=popular&limit=:n',
         'GET /api/search/',
         'POST /api/rooms/create/'
         'GET /api/rooms/',
         'GET /api/rooms/:id/',
         'POST /api/rooms/:id/update/',
         'POST /api/rooms/:id/delete/',
+        'PUT /api/rooms/batch/update/',
+        'DELETE /api/rooms/batch/delete/',
         'POST /api/rooms/:id/create-message/',
+        'POST /api/rooms/:id/messages/bulk/',
         'GET /api/messages/',
         'GET /api/messages/:id/',
+        'GET /api/rooms/:id/messages/history/?before=:id&limit=:n',
+        'GET /api/feed/?before=:id&limit=:n',
+        'GET /api/sync/?since=:token',
         'GET /api/users/',
+        'GET /api/users/?ids=:id,:id',
+        'POST /api/users/',
         'GET /api/users/:id/',
+        'GET /api/users/:id/profile/',
         'POST /api/token/',
         'POST /api/token/refresh/',
         'POST /api/register/',
@@ -63,12 +96,37 @@ def get_routes(request):
     ]
     return Response(routes)
 
+def room_queryset():
+    # Everything RoomSerializer renders, in a constant number of queries
+    return Room.objects.select_related('host', 'topic').prefetch_related('participants')
+
+def message_queryset():
+    # Everything MessageSerializer renders, including the nested room. A
+    # soft-deleted room hides its messages; the room is joined anyway
+    return Message.objects.filter(room__deleted_at__isnull=True).select_related(
+        'user', 'room__host', 'room__topic'
+    ).prefetch_related('room__participants')
+
 def empty_response():
     return JsonResponse([], safe=False)  # Return empty array instead of 404
 
 @api_view(["GET"])
 def topics_list(request):
     topics = Topic.objects.all()
+
+    # Sidebar ordering, served straight from the (room_count, name) index
+    if request.query_params.get('sort') == 'popular':
+        topics = topics.order_by('-room_count', 'name')
+    limit = request.query_params.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            return Response('limit must be an integer', status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response('limit must be positive', status=status.HTTP_400_BAD_REQUEST)
+        topics = topics[:min(limit, settings.TOPICS_MAX_LIMIT)]
+
     if not topics.exists():
             return JsonResponse([], safe=False)
     topics_serializer = TopicSerializer(topics, many=True, context={'request': request})
@@ -79,7 +137,7 @@ def search(request):
     query = request.query_params.get('q', '')
     
     # Search rooms
-    rooms = Room.objects.filter(
+    rooms = room_queryset().filter(
         Q(name__icontains=query) |
         Q(description__icontains=query) |
         Q(topic__name__icontains=query) |
@@ -92,7 +150,7 @@ def search(request):
     topic_serializer = TopicSerializer(topics, many=True, context={'request': request})
     
     # Search messages (for activity feed)
-    messages = Message.objects.filter(
+    messages = message_queryset().filter(
         Q(body__icontains=query) |
         Q(room__name__icontains=query) |
         Q(user__username__icontains=query)
@@ -116,7 +174,7 @@ def create_room(request):
         return Response('Topic is required', status=status.HTTP_400_BAD_REQUEST)
     
     # Get or create the topic
-    topic, created = Topic.objects.get_or_create(name=topic_name)
+    topic = resolve_topic(topic_name)
 
     # Prepare data for serializer
     data = request.data.copy()
@@ -129,14 +187,23 @@ def create_room(request):
     )
 
     if serializer.is_valid():
-        serializer.save(host=request.user, topic=topic)
+        try:
+            serializer.save(host=request.user, topic=topic)
+        except IntegrityError:
+            # A cached topic another worker has deleted since
+            if not forget_deleted_topics([topic]):
+                raise
+            topic = resolve_topic(topic_name)
+            serializer.save(host=request.user, topic=topic)
+        # The save just bumped the count; the resolved topic predates it
+        topic.refresh_from_db(fields=['room_count'])
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
 def room_list(request):
     if request.method == 'GET':
-        rooms = Room.objects.all()
+        rooms = room_queryset()
         if not rooms.exists():
             return JsonResponse([], safe=False)
         serializer = RoomSerializer(rooms, many=True, context={'request': request})
@@ -145,7 +212,7 @@ def room_list(request):
 @api_view(['GET'])
 def room_detail(request, pk):
     try:
-        room = Room.objects.get(pk=pk)
+        room = room_queryset().get(pk=pk)
     except Room.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -167,18 +234,27 @@ def update_delete_room(request, pk):
             return Response('You are not the host of this room', status=status.HTTP_403_FORBIDDEN)
 
         # Handle topic update
+        changes = {}
         topic_name = request.data.get('topic')
         if topic_name:
             topic_name = topic_name.strip()
             if topic_name:
-                topic, created = Topic.objects.get_or_create(name=topic_name)
-                request.data['topic'] = topic.id
+                changes['topic'] = resolve_topic(topic_name)
             else:
                 return Response('Topic cannot be empty', status=status.HTTP_400_BAD_REQUEST)
         
         serializer = RoomSerializer(room, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save(**changes)
+            except IntegrityError:
+                # A cached topic another worker has deleted since
+                if 'topic' not in changes or not forget_deleted_topics([changes['topic']]):
+                    raise
+                changes['topic'] = resolve_topic(topic_name)
+                serializer.save(**changes)
+            if 'topic' in changes:
+                changes['topic'].refresh_from_db(fields=['room_count'])
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -186,10 +262,117 @@ def update_delete_room(request, pk):
         if room.host != request.user:
             return Response('You are not the host of this room', status=status.HTTP_403_FORBIDDEN)
         
-        room.delete()
+        soft_delete_rooms([room.pk])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+def check_room_hosts(room_ids, user):
+    """
+    Verify in one query that every room exists and is hosted by ``user``.
+
+    Returns an error Response, or None when all rooms belong to the user.
+    """
+    hosts = dict(Room.objects.filter(id__in=room_ids).order_by().values_list('id', 'host_id'))
+    missing = [pk for pk in room_ids if pk not in hosts]
+    if missing:
+        return Response({'missing': missing}, status=status.HTTP_404_NOT_FOUND)
+    not_hosted = [pk for pk in room_ids if hosts[pk] != user.pk]
+    if not_hosted:
+        return Response(
+            {'error': 'You are not the host of these rooms', 'ids': not_hosted},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return None
+
+def is_id(value):
+    # bool is an int subclass, but true is not room 1
+    return type(value) is int and 1 <= value <= MAX_ID
+
+def parse_room_ids(ids):
+    if not isinstance(ids, list) or not ids:
+        return None, Response('A non-empty list of room ids is required', status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > settings.ROOM_BATCH_MAX_SIZE:
+        return None, Response(
+            f'At most {settings.ROOM_BATCH_MAX_SIZE} rooms can be changed at once',
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not all(is_id(pk) for pk in ids):
+        return None, Response('Room ids must be positive integers', status=status.HTTP_400_BAD_REQUEST)
+    if len(set(ids)) != len(ids):
+        return None, Response('Room ids must be unique', status=status.HTTP_400_BAD_REQUEST)
+    return ids, None
+
+@api_view(['PUT'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def batch_update_rooms(request):
+    items = request.data.get('rooms') if hasattr(request.data, 'get') else None
+    if not isinstance(items, list):
+        return Response('A list of rooms is required', status=status.HTTP_400_BAD_REQUEST)
+    serializer = RoomBatchUpdateSerializer(data=items, many=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    room_ids, error = parse_room_ids([item['id'] for item in serializer.validated_data])
+    if error:
+        return error
+    changes = {item.pop('id'): item for item in serializer.validated_data}
+
+    # A cached topic another worker has deleted since fails its foreign key
+    # at commit, rolling back the batch; forget it and apply the batch again
+    for attempt in range(2):
+        topics = {}
+        try:
+            with transaction.atomic():
+                error = check_room_hosts(room_ids, request.user)
+                if error:
+                    return error
+
+                # Resolve every topic name in the batch with at most one lookup and one insert
+                topics = resolve_topics({change['topic'] for change in changes.values() if 'topic' in change})
+
+                now = timezone.now()
+                fields = {'updated'}
+                topic_deltas = {}
+                rooms = Room.objects.filter(id__in=room_ids)
+                for room in rooms:
+                    change = dict(changes[room.id])
+                    if 'topic' in change:
+                        change['topic'] = topics[change['topic']]
+                        topic_deltas[room.topic_id] = topic_deltas.get(room.topic_id, 0) - 1
+                        topic_deltas[change['topic'].id] = topic_deltas.get(change['topic'].id, 0) + 1
+                    for field, value in change.items():
+                        setattr(room, field, value)
+                    fields.update(change)
+                    room.updated = now
+                Room.objects.bulk_update(rooms, sorted(fields))
+                # bulk_update bypasses the Room signals that maintain topic counters
+                adjust_room_counts(topic_deltas)
+            break
+        except IntegrityError:
+            if attempt or not forget_deleted_topics(topics.values()):
+                raise
+
+    return Response({'ids': room_ids})
+
+@api_view(['DELETE'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def batch_delete_rooms(request):
+    ids = request.data.get('ids') if hasattr(request.data, 'get') else None
+    room_ids, error = parse_room_ids(ids)
+    if error:
+        return error
+
+    with transaction.atomic():
+        error = check_room_hosts(room_ids, request.user)
+        if error:
+            return error
+        soft_delete_rooms(room_ids)
+
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
 @api_view(['POST'])
+@throttle_classes([RegisterIPRateThrottle, RegisterEmailRateThrottle])
 def register_user(request):
     if request.method == 'POST':
         # Verify reCAPTCHA
@@ -213,6 +396,7 @@ def register_user(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['POST'])
+@throttle_classes([LoginIPRateThrottle, LoginEmailRateThrottle])
 def login_user(request):
     # Verify reCAPTCHA
     recaptcha_token = request.data.get('recaptcha_token')
@@ -226,7 +410,7 @@ def login_user(request):
     password = request.data.get('password')
 
     # Validate input
-    if not email or not password:
+    if not isinstance(email, str) or not isinstance(password, str) or not email or not password:
         return Response(
             'Both email and password are required', 
             status=status.HTTP_400_BAD_REQUEST
@@ -245,8 +429,9 @@ def login_user(request):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # This is optional - only needed if you want session-based auth too
-        login(request, user)
+        # The API is JWT-only (no session middleware on /api/), so record the
+        # login directly instead of calling django.contrib.auth.login()
+        update_last_login(None, user)
         refresh = RefreshToken.for_user(user)
         user_serializer = UserSerializer(user, context={'request': request})
         return Response({
@@ -270,8 +455,6 @@ def logout_user(request):
         refresh_token = request.data.get("refresh")
         token = RefreshToken(refresh_token)
         token.blacklist()
-        
-        logout(request)
         return Response(status=status.HTTP_205_RESET_CONTENT)
     except Exception as e:
         logging.exception("An error occurred during logout.")
@@ -282,12 +465,75 @@ def logout_user(request):
 
 @api_view(['GET'])
 def get_user(request, pk):
-    user = User.objects.get(pk=pk)
+    try:
+        user = User.objects.get(pk=pk)
+    except User.DoesNotExist:
+        return Response(status=status.HTTP_404_NOT_FOUND)
     serializer = UserSerializer(user, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 @api_view(['GET'])
+def user_profile(request, pk):
+    """
+    The user with hosted and joined room counts and their newest messages,
+    cached per user (base/profiles.py).
+    """
+    profile = get_profile(pk)
+    if profile is None:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    data = dict(profile)
+    if data['avatar']:
+        # Already absolute for S3; relative to this host in development
+        data['avatar'] = request.build_absolute_uri(data['avatar'])
+    return Response(data)
+
+def decimal_id(value):
+    # "42" becomes 42; "4.2", "+4", non-ASCII digits and 40-digit strings stay strings
+    if isinstance(value, str) and value.isascii() and value.isdigit() and len(value) <= len(str(MAX_ID)):
+        return int(value)
+    return value
+
+def parse_user_ids(ids):
+    """
+    User ids from ``?ids=1,2,3`` or a JSON list, deduplicated in order, or
+    an error response.
+    """
+    if isinstance(ids, str):
+        ids = [part.strip() for part in ids.split(',') if part.strip()]
+    if not isinstance(ids, list) or not ids:
+        return None, Response('A non-empty list of user ids is required', status=status.HTTP_400_BAD_REQUEST)
+    # Before looking at the ids, so an oversized list is rejected cheaply
+    if len(ids) > settings.USER_BATCH_MAX_SIZE:
+        return None, Response(
+            f'At most {settings.USER_BATCH_MAX_SIZE} users can be looked up at once',
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    ids = [decimal_id(user_id) for user_id in ids]
+    if not all(is_id(user_id) for user_id in ids):
+        return None, Response('User ids must be positive integers', status=status.HTTP_400_BAD_REQUEST)
+    return list(dict.fromkeys(ids)), None
+
+@api_view(['GET', 'POST'])
 def get_users(request):
+    """
+    Every user, or with ``?ids=1,2,3`` (or POST ``{"ids": [...]}`` for long
+    lists) just those, in one query, as ``{"users": {id: user}, "missing": [id]}``.
+    """
+    if request.method == 'POST' or 'ids' in request.query_params:
+        if request.method == 'POST':
+            ids = request.data.get('ids') if hasattr(request.data, 'get') else None
+        else:
+            ids = request.query_params.get('ids')
+        user_ids, error = parse_user_ids(ids)
+        if error:
+            return error
+        found = User.objects.in_bulk(user_ids)
+        serializer = UserSerializer(list(found.values()), many=True, context={'request': request})
+        return Response({
+            'users': {str(user['id']): user for user in serializer.data},
+            'missing': [user_id for user_id in user_ids if user_id not in found],
+        })
+
     users = User.objects.all()
     if not users.exists():
             return JsonResponse([], safe=False)
@@ -325,40 +571,197 @@ def update_user(request):
             return Response(user_serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def touch_room(room_pk, user):
+    """
+    Record activity by ``user`` in a room without loading it.
+
+    Bumps ``Room.updated`` with a single UPDATE (which doubles as the
+    existence check) and inserts the participant row with
+    ``ignore_conflicts`` so repeat posters cost no extra lookup.
+    Returns False if the room does not exist.
+    """
+    if not Room.objects.filter(pk=room_pk).update(updated=timezone.now()):
+        return False
+    Participant = Room.participants.through
+    Participant.objects.bulk_create(
+        [Participant(room_id=room_pk, user_id=user.pk)],
+        ignore_conflicts=True
+    )
+    return True
+
 @api_view(['POST'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def create_message(request, room_pk):
-    try:
-        room = Room.objects.get(pk=room_pk)
-    except Room.DoesNotExist:
-        return Response(status=status.HTTP_404_NOT_FOUND)
-    
     if request.method == 'POST':
         serializer = MessageSerializer(data=request.data, context={'request': request})
-        if serializer.is_valid():
-            room.participants.add(request.user)
-            
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            if not touch_room(room_pk, request.user):
+                return Response(status=status.HTTP_404_NOT_FOUND)
+
             # Save the message with the user and room
-            serializer.save(user=request.user, room=room)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            message = serializer.save(user=request.user, room_id=room_pk)
+            remember_messages(room_pk, [message.id])
+
+        response_serializer = MessageSummarySerializer(message, context={'request': request})
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def create_messages_bulk(request, room_pk):
+    items = request.data
+    if hasattr(items, 'get'):
+        items = items.get('messages')
+    if not isinstance(items, list) or not items:
+        return Response('A non-empty list of messages is required', status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.MESSAGE_BULK_MAX_SIZE:
+        return Response(
+            f'At most {settings.MESSAGE_BULK_MAX_SIZE} messages can be sent at once',
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = MessageSerializer(data=items, many=True, context={'request': request})
+    if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
+
+    messages = [
+        Message(user=request.user, room_id=room_pk, **data)
+        for data in serializer.validated_data
+    ]
+    with transaction.atomic():
+        if not touch_room(room_pk, request.user):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        messages = Message.objects.bulk_create(messages)
+        remember_messages(room_pk, [message.id for message in messages])
+        invalidate_profiles([request.user.pk])
+
+    return Response({'ids': [message.id for message in messages]}, status=status.HTTP_201_CREATED)
+
 @api_view(['GET'])
 def message_list(request):
     if request.method == 'GET':
-        messages = Message.objects.all()
+        messages = message_queryset()
         if not messages.exists():
             return JsonResponse([], safe=False)
         serializer = MessageSerializer(messages, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+def cursor_params(request, max_limit, cursor='before'):
+    """
+    ``before`` (a message id, unless another ``cursor`` name or ``None`` is
+    given) and ``limit`` (capped at ``max_limit``) from the query string, or
+    an error response.
+    """
+    params = {'limit': max_limit}
+    if cursor:
+        params[cursor] = None
+    for name in params:
+        value = request.query_params.get(name)
+        if value is None:
+            continue
+        try:
+            params[name] = int(value)
+        except ValueError:
+            return None, Response(f'{name} must be an integer', status=status.HTTP_400_BAD_REQUEST)
+        if params[name] < 1:
+            return None, Response(f'{name} must be positive', status=status.HTTP_400_BAD_REQUEST)
+    params['limit'] = min(params['limit'], max_limit)
+    return params, None
+
+@api_view(['GET'])
+def room_history(request, room_pk):
+    """
+    A room's messages newest first, including archived ones (base/archive.py).
+    Page with ``?before=<next>``; ``next`` is null on the last page.
+    """
+    params, error = cursor_params(request, settings.MESSAGE_HISTORY_MAX_LIMIT)
+    if error:
+        return error
+
+    if not Room.objects.filter(pk=room_pk).exists():
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    messages = archived_room_history(room_pk, **params)
+    serializer = MessageSummarySerializer(messages, many=True, context={'request': request})
+    return Response({
+        'messages': serializer.data,
+        'next': messages[-1].id if len(messages) == params['limit'] else None,
+    })
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def feed(request):
+    """
+    Recent messages from the rooms the user participates in, newest first
+    (base/feed.py). Page with ``?before=<next>``; ``next`` is null on the last page.
+    """
+    params, error = cursor_params(request, settings.FEED_MAX_LIMIT)
+    if error:
+        return error
+    ids, next_cursor = feed_page(request.user, **params)
+    messages = Message.objects.filter(id__in=ids).select_related('user').order_by('-id') if ids else []
+    serializer = MessageSummarySerializer(messages, many=True, context={'request': request})
+    return Response({'messages': serializer.data, 'next': next_cursor})
+
+@api_view(['GET'])
+def sync_changes(request):
+    """
+    Rooms, messages and topics changed since ``?since=<token>`` plus the ids
+    deleted since then; everything (and no deletions) without a token. At
+    most ``?limit=`` (``SYNC_MAX_LIMIT``) of each per response: while
+    ``has_more`` is true, sync again at once with ``next`` (see base/sync.py).
+    """
+    params, error = cursor_params(request, settings.SYNC_MAX_LIMIT, cursor=None)
+    if error:
+        return error
+    limit = params['limit']
+    now = timezone.now()
+
+    token = request.query_params.get('since')
+    if token:
+        try:
+            positions = decode_token(token)
+        except ValueError:
+            return Response('Invalid sync token', status=status.HTTP_400_BAD_REQUEST)
+        except ExpiredToken:
+            return Response('Sync token expired; sync again without since', status=status.HTTP_410_GONE)
+        deleted, more_deleted, positions['deleted'] = deleted_page(positions['deleted'], limit)
+    else:
+        positions = full_sync_positions(now)
+        deleted, more_deleted = {Tombstone.ROOM: [], Tombstone.MESSAGE: [], Tombstone.TOPIC: []}, False
+
+    rooms, more_rooms, positions['rooms'] = page(room_queryset(), 'updated', positions['rooms'], limit)
+    messages, more_messages, positions['messages'] = page(
+        Message.objects.filter(room__deleted_at__isnull=True).select_related('user'),
+        'updated', positions['messages'], limit,
+    )
+    topics, more_topics, positions['topics'] = page(Topic.objects.all(), 'updated', positions['topics'], limit)
+    has_more = more_rooms or more_messages or more_topics or more_deleted
+
+    context = {'request': request}
+    return Response({
+        'rooms': RoomSerializer(rooms, many=True, context=context).data,
+        'messages': MessageSummarySerializer(messages, many=True, context=context).data,
+        'topics': TopicSerializer(topics, many=True, context=context).data,
+        'deleted': {
+            'rooms': deleted[Tombstone.ROOM],
+            'messages': deleted[Tombstone.MESSAGE],
+            'topics': deleted[Tombstone.TOPIC],
+        },
+        'has_more': has_more,
+        'next': encode_cursor(positions) if has_more else next_token(now),
+    })
+
 @api_view(['GET', 'DELETE'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def message_detail(request, msg_pk):
     try:
-        message = Message.objects.get(pk=msg_pk)
+        message = message_queryset().get(pk=msg_pk)
 
         if request.method == 'GET':
             serializer = MessageSerializer(message, context={'request': request})
@@ -370,7 +773,7 @@ def message_detail(request, msg_pk):
                     'You can only delete your own messages',
                     status=status.HTTP_403_FORBIDDEN
                 )
-            message.delete()
+            soft_delete_messages([message.pk])
             return Response(
                 {'success': 'Message deleted successfully'},
                 status=status.HTTP_204_NO_CONTENT
@@ -381,4 +784,17 @@ def message_detail(request, msg_pk):
             'Message not found',
             status=status.HTTP_404_NOT_FOUND
         )
-    
\ No newline at end of file
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAdminUser])
+def db_pool_stats(request):
+    # Stats are per worker process; repeated calls may land on different workers
+    return Response(pool_stats())
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAdminUser | HasMetricsToken])
+def metrics(request):
+    # Prometheus text exposition format; like the pool stats, per worker process
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,77 @@
+"""
+Micro and load benchmarks for the Study Companion API.
+
+Each module is runnable on its own, e.g.::
+
+    python -m benchmarks.message_writes
+
+Benchmarks run against a throwaway test database created from the project
+settings, so they never touch ``db.sqlite3`` or a production database.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'study_companion_api.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Create a fresh test database for the duration of the block."""
+    setup_django()
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    total = sum(samples)
+    return {
+        'count': len(samples),
+        'mean_ms': statistics.mean(samples) * 1000,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'throughput_per_s': len(samples) / total if total else 0.0,
+    }
+
+
+def measure(fn, iterations, warmup=10):
+    """Call ``fn`` repeatedly and return its latency summary."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def print_table(results):
+    print(f"{'case':<28}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>12}")
+    for name, stats in results.items():
+        print(
+            f"{name:<28}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}"
+            f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['throughput_per_s']:>12.1f}"
+        )
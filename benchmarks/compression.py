@@ -0,0 +1,81 @@
+"""
+CPU cost against bytes saved for response compression.
+
+Seeds a dataset with base/seeding.py, fetches the ``room-list``,
+``message-list`` and ``search`` responses uncompressed, then compresses each
+body with every installed codec of study_companion_api/compression.py at a
+range of levels. For each it reports the compression ratio, the time to
+compress one response and the time saved sending it over a link of
+``--mbps`` megabits per second, which is what the CPU time buys.
+
+    python -m benchmarks.compression [--scale small] [--mbps 20]
+"""
+import argparse
+import time
+
+from benchmarks import setup_django, test_database
+
+LEVELS = {
+    'gzip': [1, 4, 6, 9],
+    'br': [1, 4, 5, 6, 9],
+    'zstd': [1, 3, 6, 9, 12],
+}
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Response compression benchmark')
+    parser.add_argument('--scale', default='small', help='base.seeding.SCALES preset to seed')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--mbps', type=float, default=20.0, help='Link speed for the transfer-time column')
+    args = parser.parse_args()
+
+    setup_django()
+    from base.seeding import SCALES
+    with test_database():
+        from rest_framework.test import APIClient
+        from base.models import User
+        from base.seeding import seed
+        from study_companion_api import compression
+
+        seed(**SCALES[args.scale])
+        client = APIClient()
+        client.force_authenticate(user=User.objects.first())
+        bodies = {
+            'room-list': client.get('/api/rooms/').content,
+            'message-list': client.get('/api/messages/').content,
+            'search': client.get('/api/search/', {'q': 'Topic 1'}).content,
+        }
+
+        codecs = {'gzip': compression.GzipCodec}
+        if compression.brotli is not None:
+            codecs['br'] = compression.BrotliCodec
+        if compression.zstandard is not None:
+            codecs['zstd'] = compression.ZstdCodec
+
+        bytes_per_s = args.mbps * 1_000_000 / 8
+        print(f"{'endpoint':<14}{'codec':<9}{'KiB':>9}{'ratio':>8}{'cpu ms':>9}{'MB/s':>8}{'saved ms':>10}")
+        for endpoint, body in bodies.items():
+            print(f"{endpoint:<14}{'identity':<9}{len(body) / 1024:>9.0f}")
+            for name, codec_class in codecs.items():
+                for level in LEVELS[name]:
+                    codec = codec_class(level)
+                    size = len(codec.compress(body))
+                    seconds = best_of(lambda: codec.compress(body), args.repeat)
+                    saved = (len(body) - size) / bytes_per_s
+                    print(
+                        f"{'':<14}{f'{name}-{level}':<9}{size / 1024:>9.0f}{len(body) / size:>8.1f}"
+                        f"{seconds * 1000:>9.2f}{len(body) / seconds / 1e6:>8.0f}{saved * 1000:>10.1f}"
+                    )
+
+
+if __name__ == '__main__':
+    main()
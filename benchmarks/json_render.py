@@ -0,0 +1,53 @@
+"""
+Encode-time benchmark for the ``message_list`` payload.
+
+Seeds a dataset with base/seeding.py, serializes ``message_list``'s
+response data once (every message with its nested room) and then times
+only the rendering step with DRF's stdlib ``JSONRenderer`` against
+``base.renderers.ORJSONRenderer``, checking both produce the same bytes.
+A parse benchmark of the same document compares the two parsers.
+
+    python -m benchmarks.json_render [--messages N] [--iterations N]
+"""
+import argparse
+import io
+
+from benchmarks import measure, print_table, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON renderer/parser benchmark on the message_list payload')
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    with test_database():
+        from rest_framework.parsers import JSONParser
+        from rest_framework.renderers import JSONRenderer
+        from base.parsers import ORJSONParser
+        from base.renderers import ORJSONRenderer
+        from base.seeding import seed
+        from base.serializers import MessageSerializer
+        from base.views import message_queryset
+
+        seed(users=200, topics=20, rooms=100, messages=args.messages)
+        data = MessageSerializer(message_queryset(), many=True).data
+
+        stdlib, fast = JSONRenderer(), ORJSONRenderer()
+        body = stdlib.render(data)
+        if fast.render(data) != body:
+            raise SystemExit('ORJSONRenderer output differs from JSONRenderer')
+
+        results = {
+            'render JSONRenderer': measure(lambda: stdlib.render(data), args.iterations, warmup=3),
+            'render ORJSONRenderer': measure(lambda: fast.render(data), args.iterations, warmup=3),
+            'parse JSONParser': measure(lambda: JSONParser().parse(io.BytesIO(body)), args.iterations, warmup=3),
+            'parse ORJSONParser': measure(lambda: ORJSONParser().parse(io.BytesIO(body)), args.iterations, warmup=3),
+        }
+
+    print(f'{args.messages} messages, {len(body) / 1024:.0f} KiB of JSON')
+    print_table(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+Load benchmark for every endpoint in base/urls.py.
+
+Seeds a test database (see base/seeding.py, also used by ``manage.py
+seed``), then drives each endpoint through the in-process ASGI application
+and writes a JSON report with p50/p95/p99 latency, throughput, queries per
+request and peak memory per endpoint, so runs can be compared across commits.
+
+    python -m benchmarks.load --scale small --iterations 50 --output bench.json
+    python -m benchmarks.load --only room-list message-list
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from unittest.mock import patch
+from urllib.parse import urlencode
+
+from benchmarks import setup_django, summarize, test_database
+
+
+class QueryCounter:
+    """Counts queries on every connection, whichever thread opens it."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        def add_wrapper(sender, connection, **kwargs):
+            if self not in connection.execute_wrappers:
+                connection.execute_wrappers.append(self)
+
+        self._receiver = add_wrapper
+        connection_created.connect(add_wrapper, weak=False)
+        for connection in connections.all():
+            add_wrapper(None, connection)
+
+
+class ASGIClient:
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method, path, data=None, token=None, query=None):
+        body = json.dumps(data).encode() if data is not None else b''
+        headers = [
+            (b'host', b'testserver'),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ]
+        if token:
+            headers.append((b'authorization', f'Bearer {token}'.encode()))
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': urlencode(query or {}).encode(),
+            'root_path': '',
+            'headers': headers,
+            'client': ('127.0.0.1', 50000),
+            'server': ('testserver', 80),
+        }
+        pending = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+        async def receive():
+            if pending:
+                return pending.pop()
+            # Never disconnect; the handler cancels this when it is done
+            await asyncio.Future()
+
+        response = {'status': None, 'body': b''}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            elif message['type'] == 'http.response.body':
+                response['body'] += message.get('body', b'')
+
+        await self.app(scope, receive, send)
+        return response
+
+
+def build_cases(fixtures):
+    """
+    One entry per URL name (``users`` also with ids by GET and POST, ``sync``
+    also from a recent token): a function returning the request to send.
+
+    Destructive endpoints create their own target rows first (outside the
+    timed section) so every iteration exercises the success path.
+    """
+    from django.urls import reverse
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from base.models import Room
+
+    user, token = fixtures['user'], fixtures['token']
+    room_id, message_id = fixtures['room_id'], fixtures['message_id']
+    counter = itertools.count()
+
+    def own_room():
+        return Room.objects.create(host=user, topic_id=fixtures['topic_id'], name='Bench target').id
+
+    def register():
+        n = next(counter)
+        return 'POST', reverse('register'), {
+            'username': f'bench{n}', 'email': f'bench{n}@example.com', 'name': 'Bench',
+            'password1': 'bench-password-123', 'password2': 'bench-password-123',
+        }, None, None
+
+    def refresh():
+        return 'POST', reverse('token_refresh'), {'refresh': str(RefreshToken.for_user(user))}, None, None
+
+    return {
+        'api-routes': lambda: ('GET', reverse('api-routes'), None, None, None),
+        'token_obtain_pair': lambda: ('POST', reverse('token_obtain_pair'), {'email': user.email, 'password': fixtures['password']}, None, None),
+        'token_refresh': refresh,
+        'register': register,
+        'login': lambda: ('POST', reverse('login'), {'email': user.email, 'password': fixtures['password']}, None, None),
+        'logout': lambda: ('POST', reverse('logout'), {'refresh': str(RefreshToken.for_user(user))}, token, None),
+        'users': lambda: ('GET', reverse('users'), None, None, None),
+        'users-ids': lambda: ('GET', reverse('users'), None, None, {'ids': ','.join(map(str, fixtures['user_ids']))}),
+        'users-ids-post': lambda: ('POST', reverse('users'), {'ids': fixtures['user_ids']}, None, None),
+        'user': lambda: ('GET', reverse('user', kwargs={'pk': user.id}), None, None, None),
+        'user-profile': lambda: ('GET', reverse('user-profile', kwargs={'pk': user.id}), None, None, None),
+        'update-user': lambda: ('PUT', reverse('update-user'), {'bio': f'Bio {next(counter)}'}, token, None),
+        'room-list': lambda: ('GET', reverse('room-list'), None, None, None),
+        'create-room': lambda: ('POST', reverse('create-room'), {'name': 'Bench room', 'topic': 'Topic 1'}, token, None),
+        'room-detail': lambda: ('GET', reverse('room-detail', kwargs={'pk': room_id}), None, None, None),
+        'update-room': lambda: ('PUT', reverse('update-room', kwargs={'pk': room_id}), {'name': f'Renamed {next(counter)}'}, token, None),
+        'delete-room': lambda: ('DELETE', reverse('delete-room', kwargs={'pk': own_room()}), None, token, None),
+        'batch-update-rooms': lambda: ('PUT', reverse('batch-update-rooms'), {'rooms': [{'id': room_id, 'topic': 'Topic 2'}]}, token, None),
+        'batch-delete-rooms': lambda: ('DELETE', reverse('batch-delete-rooms'), {'ids': [own_room(), own_room()]}, token, None),
+        'create-message': lambda: ('POST', reverse('create-message', kwargs={'room_pk': room_id}), {'body': 'Bench message'}, token, None),
+        'create-messages-bulk': lambda: ('POST', reverse('create-messages-bulk', kwargs={'room_pk': room_id}), {'messages': [{'body': 'Bench'}] * 20}, token, None),
+        'message-list': lambda: ('GET', reverse('message-list'), None, None, None),
+        'room-history': lambda: ('GET', reverse('room-history', kwargs={'room_pk': room_id}), None, None, None),
+        'message-detail': lambda: ('GET', reverse('message-detail', kwargs={'msg_pk': message_id}), None, token, None),
+        'feed': lambda: ('GET', reverse('feed'), None, token, None),
+        'sync': lambda: ('GET', reverse('sync'), None, None, None),
+        'sync-since': lambda: ('GET', reverse('sync'), None, None, {'since': fixtures['sync_token']}),
+        'search': lambda: ('GET', reverse('search'), None, None, {'q': 'Room 1'}),
+        'topics-list': lambda: ('GET', reverse('topics-list'), None, None, None),
+        'db-pool-stats': lambda: ('GET', reverse('db-pool-stats'), None, fixtures['staff_token'], None),
+        'metrics': lambda: ('GET', reverse('metrics'), None, fixtures['staff_token'], None),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_case(client, make_request, counter, iterations, warmup):
+    from django.core.cache import caches
+
+    async def once():
+        # Credential endpoints are rate limited; reset so every call is served
+        caches['throttle'].clear()
+        method, path, data, token, query = await asyncio.to_thread(make_request)
+        counter.count = 0
+        start = time.perf_counter()
+        response = await client.request(method, path, data, token, query)
+        return time.perf_counter() - start, counter.count, response
+
+    for _ in range(warmup):
+        await once()
+
+    samples, queries, statuses = [], [], {}
+    for _ in range(iterations):
+        elapsed, count, response = await once()
+        samples.append(elapsed)
+        queries.append(count)
+        statuses[response['status']] = statuses.get(response['status'], 0) + 1
+        size = len(response['body'])
+
+    tracemalloc.start()
+    await once()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = summarize(samples)
+    result.update({
+        'queries_per_request': max(queries),
+        'response_bytes': size,
+        'peak_memory_kb': peak / 1024,
+        'statuses': statuses,
+    })
+    return result
+
+
+def main():
+    setup_django()
+    from base.seeding import SCALES
+
+    parser = argparse.ArgumentParser(description='Load benchmark for every API endpoint')
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', nargs='*', help='URL names to run (default: all)')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    with test_database():
+        from django.core.asgi import get_asgi_application
+        from django.utils import timezone
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from base.models import User, Room, Message, Topic
+        from base.seeding import PASSWORD, seed
+        from base.sync import next_token
+
+        started = time.perf_counter()
+        counts = seed(**SCALES[args.scale])
+        seed_seconds = time.perf_counter() - started
+
+        user = User.objects.order_by('id').first()
+        staff = User.objects.create_user(username='staff', email='staff@example.com', password=PASSWORD, is_staff=True)
+        room = Room.objects.create(host=user, topic=Topic.objects.first(), name='Bench room')
+        fixtures = {
+            'user': user,
+            'password': PASSWORD,
+            'token': str(RefreshToken.for_user(user).access_token),
+            'staff_token': str(RefreshToken.for_user(staff).access_token),
+            'room_id': room.id,
+            'topic_id': room.topic_id,
+            'message_id': Message.objects.create(user=user, room=room, body='Bench').id,
+            'user_ids': list(User.objects.order_by('id').values_list('id', flat=True)[:50]),
+            # A client that last synced just before the benchmark started
+            'sync_token': next_token(timezone.now()),
+        }
+
+        cases = build_cases(fixtures)
+        if args.only:
+            cases = {name: cases[name] for name in args.only}
+
+        counter = QueryCounter()
+        counter.install()
+        client = ASGIClient(get_asgi_application())
+
+        async def run_all():
+            results = {}
+            for name, make_request in cases.items():
+                results[name] = await run_case(client, make_request, counter, args.iterations, args.warmup)
+                print(f"{name:<24} p50 {results[name]['p50_ms']:8.2f} ms  p99 {results[name]['p99_ms']:8.2f} ms  "
+                      f"{results[name]['queries_per_request']:4d} queries", file=sys.stderr)
+            return results
+
+        # Expected 4xx responses would otherwise flood stderr
+        logging.disable(logging.ERROR)
+        # reCAPTCHA is an outbound call to Google; benchmark our own code path
+        with patch('base.views.verify_recaptcha', return_value=True):
+            results = asyncio.run(run_all())
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'scale': args.scale,
+        'dataset': counts,
+        'seed_seconds': seed_seconds,
+        'iterations': args.iterations,
+        'endpoints': results,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
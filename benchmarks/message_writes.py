@@ -0,0 +1,73 @@
+"""
+Write-throughput benchmark for ``create_message``.
+
+Compares the current view against the previous write path (load the room,
+``participants.add``, save, re-serialize the nested room) in a room with a
+realistic number of participants. Both views are called through DRF with
+the same request factory, so only the write path differs.
+
+    python -m benchmarks.message_writes [--iterations N] [--participants N]
+"""
+import argparse
+
+from benchmarks import measure, print_table, test_database
+
+
+def legacy_view():
+    from rest_framework import status
+    from rest_framework.decorators import api_view
+    from rest_framework.response import Response
+    from base.models import Room
+    from base.serializers import MessageSerializer
+
+    @api_view(['POST'])
+    def legacy_create_message(request, room_pk):
+        room = Room.objects.get(pk=room_pk)
+        serializer = MessageSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        room.participants.add(request.user)
+        serializer.save(user=request.user, room=room)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    return legacy_create_message
+
+
+def main():
+    parser = argparse.ArgumentParser(description='create_message write-throughput benchmark')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--participants', type=int, default=50)
+    args = parser.parse_args()
+
+    with test_database():
+        from rest_framework.test import APIRequestFactory, force_authenticate
+        from base import views
+        from base.models import User, Room, Topic
+
+        users = User.objects.bulk_create([
+            User(username=f'bench{i}', email=f'bench{i}@example.com')
+            for i in range(args.participants)
+        ])
+        user = users[0]
+        room = Room.objects.create(host=user, topic=Topic.objects.create(name='Benchmarks'), name='Bench room')
+        room.participants.add(*users)
+
+        factory = APIRequestFactory()
+        legacy = legacy_view()
+
+        def call(view):
+            request = factory.post('/', {'body': 'Benchmark message'}, format='json')
+            force_authenticate(request, user=user)
+            response = view(request, room_pk=room.pk)
+            response.render()
+
+        results = {
+            'legacy write path': measure(lambda: call(legacy), args.iterations),
+            'create_message': measure(lambda: call(views.create_message), args.iterations),
+        }
+
+    print(f'{args.iterations} writes, {args.participants} participants per room')
+    print_table(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-request middleware overhead for API routes.
+
+Calls the same endpoints through Django's WSGI handler twice: with
+the stock session/CSRF/auth/messages/clickjacking middleware, and with the
+API profile from study_companion_api/middleware.py that skips them under
+``/api/``. Requests carry a session cookie, as browsers that also use the
+admin do. The stock layers are lazy, so expect a difference of tens of
+microseconds per request rather than milliseconds.
+
+    python -m benchmarks.middleware [--iterations N]
+"""
+import argparse
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks import measure, print_table, test_database
+
+STOCK = {
+    'study_companion_api.middleware.BrowserSessionMiddleware':
+        'django.contrib.sessions.middleware.SessionMiddleware',
+    'study_companion_api.middleware.BrowserCsrfViewMiddleware':
+        'django.middleware.csrf.CsrfViewMiddleware',
+    'study_companion_api.middleware.BrowserAuthenticationMiddleware':
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'study_companion_api.middleware.BrowserMessageMiddleware':
+        'django.contrib.messages.middleware.MessageMiddleware',
+    'study_companion_api.middleware.BrowserXFrameOptionsMiddleware':
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API middleware overhead benchmark')
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    with test_database():
+        from django.conf import settings
+        from django.contrib.sessions.backends.db import SessionStore
+        from django.core.handlers.wsgi import WSGIHandler
+        from django.test import override_settings
+        from django.urls import reverse
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from base.models import Room, Topic, User
+
+        user = User.objects.create_user(username='bench', email='bench@example.com', password='bench-password')
+        Room.objects.create(host=user, topic=Topic.objects.create(name='Benchmarks'), name='Bench room')
+        token = str(RefreshToken.for_user(user).access_token)
+        session = SessionStore()
+        session['seen'] = True
+        session.create()
+
+        profiles = {
+            'stock': [STOCK.get(path, path) for path in settings.MIDDLEWARE],
+            'api profile': list(settings.MIDDLEWARE),
+        }
+        endpoints = {
+            'routes': reverse('api-routes'),
+            'room list': reverse('room-list'),
+        }
+
+        def wsgi_call(handler, path):
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'HTTP_HOST': 'testserver',
+                'HTTP_AUTHORIZATION': f'Bearer {token}',
+                'HTTP_COOKIE': f'{settings.SESSION_COOKIE_NAME}={session.session_key}',
+            }
+            setup_testing_defaults(environ)
+            response = handler(environ, lambda status, headers: None)
+            b''.join(response)
+            response.close()
+
+        results = {}
+        for endpoint, path in endpoints.items():
+            for profile, middleware in profiles.items():
+                with override_settings(MIDDLEWARE=middleware):
+                    # WSGIHandler loads the middleware chain once, as a worker does
+                    handler = WSGIHandler()
+                results[f'{endpoint}: {profile}'] = measure(lambda: wsgi_call(handler, path), args.iterations)
+
+    print(f'{args.iterations} GET requests per case')
+    print_table(results)
+
+
+if __name__ == '__main__':
+    main()
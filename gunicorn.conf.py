@@ -0,0 +1,21 @@
+"""
+Gunicorn settings, read automatically from the working directory.
+
+Workers default to WEB_CONCURRENCY (set in render.yaml). With preload_app
+the master imports the application and the modules behind it once (see
+study_companion_api/preload.py) and forks workers that share them
+copy-on-write, instead of every worker paying the import time and memory.
+Set GUNICORN_PRELOAD=False to load the app in each worker, e.g. so
+``--reload`` picks up code changes.
+"""
+from decouple import config
+
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = config('GUNICORN_PRELOAD', default=True, cast=bool)
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before workers are forked
+    if server.cfg.preload_app:
+        from study_companion_api.preload import warm_up
+        warm_up()
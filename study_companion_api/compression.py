@@ -0,0 +1,202 @@
+"""
+Response compression for the JSON API.
+
+List endpoints return large, repetitive JSON (the same nested users and
+rooms on every row), which compresses 10-20x. ``CompressionMiddleware``
+compresses ``API_PATH_PREFIX`` responses of at least
+``COMPRESSION_MIN_SIZE`` bytes with the best coding the client accepts:
+
+* ``zstd`` (needs the ``zstandard`` package),
+* ``br`` (needs ``brotli``),
+* ``gzip`` (always available).
+
+Levels default to what ``python -m benchmarks.compression`` shows as the
+knee of CPU time against bytes saved for these payloads, and can be tuned
+with ``COMPRESSION_ZSTD_LEVEL``, ``COMPRESSION_BROTLI_QUALITY`` and
+``COMPRESSION_GZIP_LEVEL``.
+
+Streaming responses are compressed chunk by chunk with one compressor per
+response, flushed after every chunk so clients aren't kept waiting.
+
+Responses of the credential endpoints (``SECRET_URL_NAMES``) are never
+compressed: they carry tokens next to request input, the combination BREACH
+attacks rely on.
+"""
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional codec
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional codec
+    zstandard = None
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .middleware import is_api_request
+
+SECRET_URL_NAMES = {'login', 'register', 'token_obtain_pair', 'token_refresh'}
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes after every chunk."""
+
+    def __init__(self, compress, flush, finish):
+        self._compress, self._flush, self.finish = compress, flush, finish
+
+    def compress(self, chunk):
+        return self._compress(chunk) + self._flush()
+
+
+class GzipCodec:
+    name = 'gzip'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def compressobj(self):
+        # wbits=31: gzip header and trailer around the deflate stream
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return StreamCompressor(
+            compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+        )
+
+
+class BrotliCodec:
+    name = 'br'
+
+    def __init__(self, quality):
+        self.quality = quality
+
+    def compress(self, data):
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=self.quality)
+
+    def compressobj(self):
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=self.quality)
+        return StreamCompressor(compressor.process, compressor.flush, compressor.finish)
+
+
+class ZstdCodec:
+    name = 'zstd'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        # Compressors are cheap to create and not thread-safe, so one per call
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def compressobj(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return StreamCompressor(
+            compressor.compress,
+            lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+
+def available_codecs():
+    """Installed codecs, most preferred first."""
+    codecs = []
+    if zstandard is not None:
+        codecs.append(ZstdCodec(settings.COMPRESSION_ZSTD_LEVEL))
+    if brotli is not None:
+        codecs.append(BrotliCodec(settings.COMPRESSION_BROTLI_QUALITY))
+    codecs.append(GzipCodec(settings.COMPRESSION_GZIP_LEVEL))
+    return codecs
+
+
+def parse_accept_encoding(header):
+    """Map each coding in an ``Accept-Encoding`` header to its q-value."""
+    qualities = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities['gzip' if coding == 'x-gzip' else coding] = quality
+    return qualities
+
+
+def negotiate(header, codecs):
+    """
+    The codec the client accepts with the highest q-value; ties go to the
+    earlier (preferred) codec. ``None`` when nothing acceptable is installed.
+    """
+    qualities = parse_accept_encoding(header)
+    wildcard = qualities.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for codec in codecs:
+        quality = qualities.get(codec.name, wildcard)
+        if quality > best_quality:
+            best, best_quality = codec, quality
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.codecs = available_codecs()
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not is_api_request(request) or response.has_header('Content-Encoding'):
+            return response
+        match = request.resolver_match
+        if match is not None and match.url_name in SECRET_URL_NAMES:
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.codecs)
+        if codec is None:
+            return response
+
+        if response.streaming:
+            # Pull to a local so later reassignments of streaming_content
+            # don't change what is compressed
+            original = response.streaming_content
+            compressor = codec.compressobj()
+            if response.is_async:
+                async def compressed():
+                    async for chunk in original:
+                        yield compressor.compress(chunk)
+                    yield compressor.finish()
+            else:
+                def compressed():
+                    for chunk in original:
+                        yield compressor.compress(chunk)
+                    yield compressor.finish()
+            response.streaming_content = compressed()
+            # The compressed size isn't known until the stream ends
+            del response.headers['Content-Length']
+        else:
+            compressed = codec.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag would now describe different bytes (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = codec.name
+        return response
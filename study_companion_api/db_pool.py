@@ -0,0 +1,27 @@
+"""Connection-pool metrics for databases configured with OPTIONS['pool']."""
+import os
+
+from django.db import connections
+
+
+def pool_stats():
+    """
+    Return psycopg_pool statistics for this worker, keyed by database alias.
+
+    ``requests_wait_ms`` is the total time requests spent waiting for a
+    connection; ``avg_wait_ms`` divides it by the number of requests served.
+    Aliases without a pool (SQLite, pooling disabled) are omitted.
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        if not connection.settings_dict.get('OPTIONS', {}).get('pool'):
+            continue
+        pool = connection.pool
+        if pool is None:
+            continue
+        alias_stats = pool.get_stats()
+        requests = alias_stats.get('requests_num', 0)
+        alias_stats['avg_wait_ms'] = alias_stats.get('requests_wait_ms', 0) / requests if requests else 0.0
+        stats[alias] = alias_stats
+    return {'pid': os.getpid(), 'pools': stats}
@@ -0,0 +1,138 @@
+"""
+Read-replica routing.
+
+``ReplicaRoutingMiddleware`` marks safe-method requests as replica-eligible;
+``ReplicaRouter`` then sends their reads to a healthy replica from
+``settings.DATABASE_REPLICAS``. Everything else (writes, unsafe requests,
+management commands, the shell) uses the primary ``default`` database.
+
+After a client's own write, its following reads are pinned to the primary
+for ``DATABASE_REPLICA_STICKY_SECONDS`` so it always sees what it just
+wrote, whatever the replica lag. Browsers get a short-lived cookie; clients
+that don't send cookies (the cross-origin frontend authenticates with a
+bearer token) echo the write time from the ``X-Primary-Pin`` response
+header back in the same request header.
+
+A request picks its replica on its first read and keeps it for every later
+query, so one response never mixes data from replicas at different lags.
+Replica health is probed at most once per
+``DATABASE_REPLICA_HEALTH_CHECK_SECONDS``; an unreachable replica is skipped
+for ``DATABASE_REPLICA_RETRY_SECONDS``.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+STICKY_COOKIE = 'db_primary_pin'
+# Carries the time of the client's last write, in milliseconds since the epoch
+PIN_HEADER = 'X-Primary-Pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# The current request's ReadTarget; None outside requests
+_read_target = ContextVar('read_target', default=None)
+
+# alias -> monotonic time until which the replica is skipped
+_unhealthy_until = {}
+# alias -> monotonic time until which the last successful probe is trusted
+_healthy_until = {}
+
+
+class ReadTarget:
+    """
+    Where one request's reads go: the primary when pinned, otherwise a
+    replica chosen on the first read. Mutable, so the choice made inside a
+    view is seen by the rest of the request.
+    """
+    __slots__ = ('alias',)
+
+    def __init__(self, use_replica):
+        self.alias = None if use_replica else DEFAULT_DB_ALIAS
+
+
+def mark_unhealthy(alias):
+    _unhealthy_until[alias] = time.monotonic() + settings.DATABASE_REPLICA_RETRY_SECONDS
+
+
+def healthy_replicas():
+    now = time.monotonic()
+    replicas = []
+    for alias in settings.DATABASE_REPLICAS:
+        if _unhealthy_until.get(alias, 0) > now:
+            continue
+        if _healthy_until.get(alias, 0) <= now:
+            try:
+                connections[alias].ensure_connection()
+            except DatabaseError:
+                mark_unhealthy(alias)
+                continue
+            _healthy_until[alias] = now + settings.DATABASE_REPLICA_HEALTH_CHECK_SECONDS
+        replicas.append(alias)
+    return replicas
+
+
+def pick_replica():
+    replicas = healthy_replicas()
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        target = _read_target.get()
+        if target is None:
+            return DEFAULT_DB_ALIAS
+        if target.alias is None:
+            target.alias = pick_replica()
+        return target.alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary through replication
+        return db not in settings.DATABASE_REPLICAS
+
+
+def pinned_to_primary(request):
+    if STICKY_COOKIE in request.COOKIES:
+        return True
+    written = request.headers.get(PIN_HEADER)
+    if written is None:
+        return False
+    try:
+        written = int(written) / 1000
+    except ValueError:
+        return False
+    # Bounded both ways: a timestamp from the future must not pin for longer
+    return abs(time.time() - written) < settings.DATABASE_REPLICA_STICKY_SECONDS
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        use_replica = request.method in SAFE_METHODS and not pinned_to_primary(request)
+        token = _read_target.set(ReadTarget(use_replica))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_target.reset(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                STICKY_COOKIE,
+                '1',
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite='None' if settings.SESSION_COOKIE_SECURE else 'Lax',
+            )
+            response[PIN_HEADER] = str(time.time_ns() // 1_000_000)
+        return response
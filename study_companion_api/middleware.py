@@ -0,0 +1,52 @@
+"""
+Browser-only middleware that steps aside for the JSON API.
+
+The API authenticates with JWT (``JWTAuthentication``), DRF views are
+CSRF-exempt and never use sessions, flash messages or frames, so for
+``/api/`` requests Django's session, CSRF, authentication, messages and
+clickjacking middleware are pure overhead, and any code that touched
+``request.session`` or ``request.user`` there would load the session row. Each class below is the stock
+middleware, skipped when the path starts with ``API_PATH_PREFIX``;
+``/admin/`` and any other route keep the full stack. Being subclasses, they
+still satisfy the admin's system checks for the stock classes.
+
+``python -m benchmarks.middleware`` measures the per-request difference.
+"""
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+
+def is_api_request(request):
+    return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+
+class SkipForApiMixin:
+    def __call__(self, request):
+        if is_api_request(request):
+            # In async mode get_response returns an awaitable, as super() would
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class BrowserSessionMiddleware(SkipForApiMixin, SessionMiddleware):
+    pass
+
+
+class BrowserCsrfViewMiddleware(SkipForApiMixin, CsrfViewMiddleware):
+    pass
+
+
+class BrowserAuthenticationMiddleware(SkipForApiMixin, AuthenticationMiddleware):
+    pass
+
+
+class BrowserMessageMiddleware(SkipForApiMixin, MessageMiddleware):
+    pass
+
+
+class BrowserXFrameOptionsMiddleware(SkipForApiMixin, XFrameOptionsMiddleware):
+    pass
@@ -0,0 +1,196 @@
+"""
+Query-count and latency regression guard for the API test suite.
+
+``PerfTestRunner`` runs the normal Django tests while recording, for every
+request made through the test client, the number of SQL queries, the wall
+time and the size of the result. Calls are grouped by endpoint as
+``"<METHOD> <url name> <status>"``. After the run it fails when:
+
+* an endpoint issues more queries as its result grows (an N+1 pattern),
+* an endpoint issues more queries than recorded in the baseline, or
+* an endpoint's fastest call is slower than the baseline by more than
+  ``PERF_TIME_TOLERANCE`` (a fraction, default 1.0) plus ``PERF_TIME_SLACK_MS``
+  (default 20). The fastest call is compared because scheduling noise only
+  ever adds time.
+
+    python test_runner.py perf            # check against perf_baseline.json
+    python test_runner.py perf --update   # rewrite the baseline
+"""
+import json
+import os
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.db import connections
+from django.test.client import Client
+from django.test.runner import DiscoverRunner
+from django.urls import Resolver404, resolve
+
+BASELINE_PATH = Path(__file__).resolve().parent.parent / 'perf_baseline.json'
+
+
+def result_size(response):
+    """Number of items in a JSON list response (or in the lists of a dict), else None."""
+    if 'json' not in response.get('Content-Type', ''):
+        return None
+    try:
+        data = json.loads(response.content)
+    except ValueError:
+        return None
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict):
+        lists = [value for value in data.values() if isinstance(value, list)]
+        if lists:
+            return sum(len(value) for value in lists)
+    return None
+
+
+class PerfRecorder:
+    def __init__(self):
+        # endpoint -> [(queries, seconds, result size)]
+        self.samples = {}
+        self._original_request = None
+
+    def endpoint(self, method, path, status_code):
+        try:
+            name = resolve(path).url_name
+        except Resolver404:
+            name = path
+        return f'{method} {name} {status_code}'
+
+    def install(self):
+        recorder = self
+        original = self._original_request = Client.request
+
+        def request(client, **request):
+            count = [0]
+
+            def counter(execute, sql, params, many, context):
+                count[0] += 1
+                return execute(sql, params, many, context)
+
+            with ExitStack() as stack:
+                # Covers every alias without opening connections a test didn't ask for
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                start = time.perf_counter()
+                response = original(client, **request)
+                elapsed = time.perf_counter() - start
+
+            key = recorder.endpoint(request['REQUEST_METHOD'], request['PATH_INFO'], response.status_code)
+            recorder.samples.setdefault(key, []).append((count[0], elapsed, result_size(response)))
+            return response
+
+        Client.request = request
+
+    def uninstall(self):
+        if self._original_request is not None:
+            Client.request = self._original_request
+            self._original_request = None
+
+    def summary(self):
+        return {
+            key: {
+                'queries': max(queries for queries, _, _ in samples),
+                'best_ms': round(min(seconds for _, seconds, _ in samples) * 1000, 2),
+                'calls': len(samples),
+            }
+            for key, samples in sorted(self.samples.items())
+        }
+
+    def n_plus_one(self):
+        """Endpoints whose query count rises with the size of their result."""
+        problems = []
+        for key, samples in sorted(self.samples.items()):
+            by_size = {}
+            for queries, _, size in samples:
+                # Empty results skip prefetch queries, so they aren't comparable
+                if size:
+                    by_size[size] = max(by_size.get(size, 0), queries)
+            sizes = sorted(by_size)
+            for smaller, larger in zip(sizes, sizes[1:]):
+                if by_size[larger] > by_size[smaller]:
+                    problems.append(
+                        f'{key}: {by_size[smaller]} queries for {smaller} results, '
+                        f'{by_size[larger]} for {larger} (N+1)'
+                    )
+                    break
+        return problems
+
+
+def compare(summary, baseline, tolerance, slack_ms):
+    problems = []
+    for key, current in summary.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        if current['queries'] > expected['queries']:
+            problems.append(f"{key}: {current['queries']} queries, baseline {expected['queries']}")
+        limit = expected['best_ms'] * (1 + tolerance) + slack_ms
+        if current['best_ms'] > limit:
+            problems.append(
+                f"{key}: best {current['best_ms']} ms, baseline {expected['best_ms']} ms "
+                f"(limit {limit:.2f} ms)"
+            )
+    return problems
+
+
+class PerfTestRunner(DiscoverRunner):
+    def __init__(self, update_baseline=False, **kwargs):
+        super().__init__(**kwargs)
+        self.update_baseline = update_baseline
+        self.recorder = PerfRecorder()
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help=f'Write the recorded query counts and timings to {BASELINE_PATH.name}.',
+        )
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.recorder.install()
+
+    def teardown_test_environment(self, **kwargs):
+        self.recorder.uninstall()
+        super().teardown_test_environment(**kwargs)
+
+    def run_suite(self, suite, **kwargs):
+        if self.parallel > 1:
+            # Requests made in worker processes would not be recorded
+            self.parallel = 1
+        return super().run_suite(suite, **kwargs)
+
+    def suite_result(self, suite, result, **kwargs):
+        failures = super().suite_result(suite, result, **kwargs)
+        summary = self.recorder.summary()
+        problems = self.recorder.n_plus_one()
+
+        if self.update_baseline:
+            BASELINE_PATH.write_text(json.dumps(summary, indent=2) + '\n')
+            print(f'\nWrote {len(summary)} endpoints to {BASELINE_PATH.name}')
+        elif BASELINE_PATH.exists():
+            baseline = json.loads(BASELINE_PATH.read_text())
+            problems += compare(
+                summary,
+                baseline,
+                float(os.environ.get('PERF_TIME_TOLERANCE', 1.0)),
+                float(os.environ.get('PERF_TIME_SLACK_MS', 20)),
+            )
+            new = sorted(summary.keys() - baseline.keys())
+            if new:
+                print(f'\nNot in {BASELINE_PATH.name} (run with --update-baseline): ' + ', '.join(new))
+        else:
+            print(f'\n{BASELINE_PATH.name} not found; run with --update-baseline to create it')
+
+        if problems:
+            print('\nPerformance regressions:')
+            for problem in problems:
+                print(f'  {problem}')
+        else:
+            print(f'\nPerformance check passed for {len(summary)} endpoints')
+        return failures + len(problems)
@@ -0,0 +1,27 @@
+"""
+Import everything a request needs before gunicorn forks its workers.
+
+``get_asgi_application()`` only sets Django up; the URLconf, and with it
+``base.views``, DRF, simplejwt and the serializers, is imported on each
+worker's first request, and the storage backend (boto3 in S3 mode) on its
+first file access. With ``preload_app`` (see gunicorn.conf.py) the master
+calls ``warm_up()`` once so every worker starts from the same imported
+modules, shared copy-on-write. ``python manage.py importtime`` audits the
+same import path.
+"""
+import gc
+
+
+def warm_up():
+    from django.core.files.storage import storages
+    from django.db import connections
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    storages['default']
+    # Connections must not be shared with forked workers
+    connections.close_all()
+    # Keep the garbage collector from touching (and so copying) the
+    # preloaded objects in every worker
+    gc.collect()
+    gc.freeze()
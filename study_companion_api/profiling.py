@@ -0,0 +1,213 @@
+"""
+Sampled request profiling.
+
+``ProfilingMiddleware`` profiles a ``PROFILING_SAMPLE_RATE`` fraction of
+requests. For each sampled request the time is split into phases:
+
+* ``db`` - SQL queries on any database alias
+* ``serialization`` - DRF serializer validation and ``.data``
+* ``authentication`` - DRF request authentication
+* ``http`` - outbound HTTP through ``requests`` (reCAPTCHA verification)
+* ``storage`` - calls to the default file storage (avatars on S3)
+* ``other`` - everything else (view logic, middleware, rendering)
+
+Phases are exclusive: a query run while serializing counts as ``db``, not
+``serialization``. Durations are aggregated per URL name from
+``base/urls.py`` into histograms, served in Prometheus text format by
+``/api/_metrics/``. Like the pool stats, metrics are per worker process.
+
+The instrumented functions only check a context variable when the current
+request isn't sampled, and nothing is instrumented unless the middleware is
+installed (it is added to MIDDLEWARE only when the sample rate is above 0).
+"""
+import functools
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PHASES = ('db', 'serialization', 'authentication', 'http', 'storage', 'other')
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_profile = ContextVar('request_profile', default=None)
+
+
+class Profile:
+    """Exclusive time per phase; entering a nested phase pauses the outer one."""
+
+    def __init__(self):
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self._stack = []
+        self._last = time.perf_counter()
+
+    def enter(self, phase):
+        now = time.perf_counter()
+        if self._stack:
+            self.totals[self._stack[-1]] += now - self._last
+        self._stack.append(phase)
+        self._last = now
+
+    def exit(self):
+        now = time.perf_counter()
+        self.totals[self._stack.pop()] += now - self._last
+        self._last = now
+
+
+def timed(phase, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _profile.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        profile.enter(phase)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.exit()
+    wrapper.profiled = True
+    return wrapper
+
+
+def _instrument_method(cls, name, phase):
+    func = cls.__dict__.get(name)
+    if func is not None and not getattr(func, 'profiled', False):
+        setattr(cls, name, timed(phase, func))
+
+
+def _instrument_property(cls, name, phase):
+    prop = cls.__dict__[name]
+    if not getattr(prop.fget, 'profiled', False):
+        setattr(cls, name, property(timed(phase, prop.fget)))
+
+
+def _time_query(execute, sql, params, many, context):
+    profile = _profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    profile.enter('db')
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.exit()
+
+
+def _add_query_timer(sender=None, connection=None, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+_instrumented = False
+_instrument_lock = threading.Lock()
+
+
+def instrument():
+    """Wrap the hot-path functions once per process."""
+    global _instrumented
+    with _instrument_lock:
+        if _instrumented:
+            return
+        import requests
+        from django.core.files.storage import storages
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+        from rest_framework.request import Request
+        from rest_framework.serializers import BaseSerializer
+
+        connection_created.connect(_add_query_timer)
+        for connection in connections.all(initialized_only=True):
+            _add_query_timer(connection=connection)
+
+        _instrument_property(BaseSerializer, 'data', 'serialization')
+        _instrument_method(BaseSerializer, 'is_valid', 'serialization')
+        _instrument_method(Request, '_authenticate', 'authentication')
+        _instrument_method(requests.Session, 'request', 'http')
+        for cls in type(storages['default']).__mro__:
+            for name in ('save', 'open', 'delete', 'exists', 'url', 'size'):
+                _instrument_method(cls, name, 'storage')
+        _instrumented = True
+
+
+class Histograms:
+    """Per-(endpoint, phase) histograms with fixed buckets, in seconds."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (endpoint, phase) -> [count per bucket..., +Inf count, sum]
+        self._data = {}
+
+    def observe(self, endpoint, phase, seconds):
+        with self._lock:
+            row = self._data.get((endpoint, phase))
+            if row is None:
+                row = self._data[(endpoint, phase)] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    row[i] += 1
+            row[-2] += 1
+            row[-1] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def render(self, name, help_text):
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        with self._lock:
+            rows = sorted((key, list(row)) for key, row in self._data.items())
+        for (endpoint, phase), row in rows:
+            labels = f'endpoint="{endpoint}",phase="{phase}"'
+            for bound, count in zip(self.buckets, row):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {row[-2]}')
+            lines.append(f'{name}_sum{{{labels}}} {row[-1]:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {row[-2]}')
+        return '\n'.join(lines) + '\n'
+
+
+histograms = Histograms()
+
+
+def api_url_names():
+    from base.urls import urlpatterns
+    return {pattern.name for pattern in urlpatterns if pattern.name}
+
+
+def render_metrics():
+    return histograms.render(
+        'api_request_phase_seconds',
+        'Time spent per phase of sampled API requests, by URL name.'
+    )
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.url_names = api_url_names()
+        instrument()
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = Profile()
+        token = _profile.set(profile)
+        profile.enter('other')
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            elapsed = time.perf_counter() - started
+            profile.exit()
+            _profile.reset(token)
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.url_name if match else None
+        if endpoint in self.url_names:
+            histograms.observe(endpoint, 'total', elapsed)
+            for phase, seconds in profile.totals.items():
+                histograms.observe(endpoint, phase, seconds)
+        return response
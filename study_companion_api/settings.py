@@ -14,8 +14,10 @@ import dj_database_url
 from datetime import timedelta
 import os
 import sys
+import tempfile
 from pathlib import Path
 from decouple import config
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -58,16 +60,30 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'base.User'
 
 MIDDLEWARE = [
+    # First, so it compresses the final response body
+    'study_companion_api.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Browser-only layers, skipped for API_PATH_PREFIX (study_companion_api/middleware.py)
+    'study_companion_api.middleware.BrowserSessionMiddleware',
+    'study_companion_api.middleware.BrowserCsrfViewMiddleware',
+    'study_companion_api.middleware.BrowserAuthenticationMiddleware',
+    'study_companion_api.middleware.BrowserMessageMiddleware',
+    'study_companion_api.middleware.BrowserXFrameOptionsMiddleware',
 ]
 
+# Requests under this path are JWT-authenticated JSON and skip the
+# session, CSRF, auth, messages and clickjacking middleware
+API_PATH_PREFIX = '/api/'
+
+# Response compression for API_PATH_PREFIX (study_companion_api/compression.py).
+# Levels trade CPU per request for bytes; see benchmarks/compression.py
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_ZSTD_LEVEL = config('COMPRESSION_ZSTD_LEVEL', default=3, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=4, cast=int)
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+
 ROOT_URLCONF = 'study_companion_api.urls'
 
 TEMPLATES = [
@@ -95,8 +111,22 @@ if 'test' in sys.argv or 'pytest' in sys.modules:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': ':memory:',
-        }
+        },
+        # Separate databases for the read-replica routing tests; they are
+        # only created for tests that ask for them and are not routed to
+        # unless a test lists them in DATABASE_REPLICAS
+        'replica_1': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+        'replica_2': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
     }
+    DATABASE_REPLICAS = []
+    # PBKDF2 is deliberately slow; tests only need passwords to round-trip
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
 else:
     DATABASES = {
         'default': dj_database_url.config(
@@ -106,6 +136,59 @@ else:
         )
     }
 
+    # Read replicas, as a comma-separated list of database URLs. Safe-method
+    # requests read from these aliases (see study_companion_api/db_router.py)
+    DATABASE_REPLICAS = []
+    for url in config('DATABASE_REPLICA_URLS', default='').split(','):
+        if url.strip():
+            alias = f'replica_{len(DATABASE_REPLICAS) + 1}'
+            DATABASES[alias] = dj_database_url.parse(
+                url.strip(),
+                conn_max_age=600,
+                ssl_require=False
+            )
+            DATABASE_REPLICAS.append(alias)
+
+    # Connection pooling (Django 5.1+ with psycopg 3). Connections go back to
+    # a per-worker pool at the end of each request instead of being kept per
+    # thread, which leaks under the ASGI worker's sync_to_async threads.
+    DB_POOL_ENABLED = config('DB_POOL_ENABLED', default=True, cast=bool)
+    DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=2, cast=int)
+    DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=4, cast=int)
+    DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=float)
+
+    for database in DATABASES.values():
+        database['CONN_HEALTH_CHECKS'] = True
+        if DB_POOL_ENABLED and database['ENGINE'] == 'django.db.backends.postgresql':
+            # Pooling requires non-persistent connections
+            database['CONN_MAX_AGE'] = 0
+            database.setdefault('OPTIONS', {})['pool'] = {
+                'min_size': DB_POOL_MIN_SIZE,
+                'max_size': DB_POOL_MAX_SIZE,
+                'timeout': DB_POOL_TIMEOUT,
+            }
+
+DATABASE_ROUTERS = ['study_companion_api.db_router.ReplicaRouter']
+# How long a client's reads stay on the primary after its own write
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=10, cast=int)
+# How long an unreachable replica is skipped before being retried
+DATABASE_REPLICA_RETRY_SECONDS = config('DATABASE_REPLICA_RETRY_SECONDS', default=30, cast=int)
+# How long a successful replica health probe is trusted before probing again
+DATABASE_REPLICA_HEALTH_CHECK_SECONDS = config('DATABASE_REPLICA_HEALTH_CHECK_SECONDS', default=5, cast=int)
+
+if DATABASE_REPLICAS:
+    MIDDLEWARE.append('study_companion_api.db_router.ReplicaRoutingMiddleware')
+
+# Request profiling (study_companion_api/profiling.py): the fraction of
+# requests whose time is broken down by phase and exported at /api/_metrics/.
+# 0 disables profiling entirely.
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+# Lets a scraper read /api/_metrics/ with an X-Metrics-Token header instead of a staff JWT
+METRICS_TOKEN = config('METRICS_TOKEN', default=None)
+
+if PROFILING_SAMPLE_RATE > 0:
+    MIDDLEWARE.insert(0, 'study_companion_api.profiling.ProfilingMiddleware')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -152,11 +235,167 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # orjson-backed JSON (base/renderers.py, base/parsers.py); both fall
+    # back to DRF's stdlib implementation when orjson isn't installed
+    'DEFAULT_RENDERER_CLASSES': (
+        'base.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'base.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     # 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     # 'PAGE_SIZE': 5,
+    # Proxies in front of the app that append to X-Forwarded-For. The
+    # throttles key on the address the outermost of them saw; with 0 they use
+    # REMOTE_ADDR, and client-supplied X-Forwarded-For is never trusted
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('RATE_LIMIT_LOGIN_IP', default='20/min'),
+        'login_email': config('RATE_LIMIT_LOGIN_EMAIL', default='5/min'),
+        'register_ip': config('RATE_LIMIT_REGISTER_IP', default='10/hour'),
+        'register_email': config('RATE_LIMIT_REGISTER_EMAIL', default='3/hour'),
+    },
 }
 
 
+# Caches
+# Login/register rate limits are kept in the 'throttle' cache. Set
+# RATE_LIMIT_CACHE_URL (e.g. redis://host:6379/1) so every worker shares
+# the same counters; otherwise each process keeps its own in memory.
+RATE_LIMIT_CACHE_URL = config('RATE_LIMIT_CACHE_URL', default=None)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'throttle',
+    },
+}
+
+if RATE_LIMIT_CACHE_URL:
+    CACHES['throttle'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': RATE_LIMIT_CACHE_URL,
+    }
+
+# /api/feed/ (base/feed.py) keeps each room's FEED_ROOM_CACHE_SIZE newest
+# message ids in the 'feed' cache for FEED_CACHE_TIMEOUT seconds. Set
+# FEED_CACHE_URL so every worker sees new messages; otherwise each process
+# keeps its own copy and may lag another's writes by up to the timeout.
+FEED_CACHE_URL = config('FEED_CACHE_URL', default=None)
+FEED_ROOM_CACHE_SIZE = config('FEED_ROOM_CACHE_SIZE', default=50, cast=int)
+FEED_CACHE_TIMEOUT = config('FEED_CACHE_TIMEOUT', default=300, cast=int)
+# Page size (and cap) of /api/feed/
+FEED_MAX_LIMIT = config('FEED_MAX_LIMIT', default=50, cast=int)
+
+CACHES['feed'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'feed',
+}
+if FEED_CACHE_URL:
+    CACHES['feed'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': FEED_CACHE_URL,
+    }
+
+# /api/users/<pk>/profile/ (base/profiles.py) shows the PROFILE_RECENT_MESSAGES
+# newest messages and keeps each profile in the 'profiles' cache, dropping it
+# after every write that changes it. Set PROFILE_CACHE_URL so those drops
+# reach every worker. The in-memory fallback is only right for a single
+# process: another worker's writes aren't seen until the entry expires, so
+# its timeout defaults to a few seconds.
+PROFILE_CACHE_URL = config('PROFILE_CACHE_URL', default=None)
+PROFILE_RECENT_MESSAGES = config('PROFILE_RECENT_MESSAGES', default=10, cast=int)
+PROFILE_CACHE_TIMEOUT = config('PROFILE_CACHE_TIMEOUT', default=300 if PROFILE_CACHE_URL else 5, cast=int)
+
+CACHES['profiles'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'profiles',
+}
+if PROFILE_CACHE_URL:
+    CACHES['profiles'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': PROFILE_CACHE_URL,
+    }
+
+
+# Slow-query log (study_companion_api/slow_queries.py). Queries at or over
+# the threshold are logged with their view and serializer field, and the
+# SLOW_QUERY_TOP_N worst fingerprints by total time are kept per
+# SLOW_QUERY_BUCKET_SECONDS interval; `python manage.py slow_queries` merges
+# the last SLOW_QUERY_WINDOW_BUCKETS of them. Set SLOW_QUERY_CACHE_URL to
+# share the tables between hosts; by default workers on one host share a
+# file cache.
+SLOW_QUERY_LOG_ENABLED = config('SLOW_QUERY_LOG_ENABLED', default=True, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=100, cast=float)
+SLOW_QUERY_TOP_N = config('SLOW_QUERY_TOP_N', default=50, cast=int)
+SLOW_QUERY_BUCKET_SECONDS = config('SLOW_QUERY_BUCKET_SECONDS', default=600, cast=int)
+SLOW_QUERY_WINDOW_BUCKETS = config('SLOW_QUERY_WINDOW_BUCKETS', default=6, cast=int)
+SLOW_QUERY_CACHE_URL = config('SLOW_QUERY_CACHE_URL', default=None)
+
+if SLOW_QUERY_CACHE_URL:
+    CACHES['slow_queries'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': SLOW_QUERY_CACHE_URL,
+    }
+elif 'test' in sys.argv or 'pytest' in sys.modules:
+    CACHES['slow_queries'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'slow_queries',
+    }
+else:
+    CACHES['slow_queries'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'study_companion_slow_queries'),
+    }
+
+
+# Maximum number of messages accepted by a single bulk ingestion request
+MESSAGE_BULK_MAX_SIZE = config('MESSAGE_BULK_MAX_SIZE', default=500, cast=int)
+
+# Maximum number of rooms changed by a single batch update/delete request
+ROOM_BATCH_MAX_SIZE = config('ROOM_BATCH_MAX_SIZE', default=100, cast=int)
+
+# Maximum number of ids accepted by a single /api/users/?ids= lookup
+USER_BATCH_MAX_SIZE = config('USER_BATCH_MAX_SIZE', default=200, cast=int)
+
+# Number of topic name -> id entries each worker keeps in memory. Not shared:
+# other workers see an admin rename only after eviction or restart, and a
+# delete when a room write fails on the old id and resolves the name again
+TOPIC_CACHE_SIZE = config('TOPIC_CACHE_SIZE', default=1024, cast=int)
+
+# Upper bound for /api/topics/?limit=N
+TOPICS_MAX_LIMIT = config('TOPICS_MAX_LIMIT', default=100, cast=int)
+
+# /api/sync/ (base/sync.py): each token repeats the last SYNC_OVERLAP_SECONDS
+# so rows committed late aren't missed. Deletions are remembered for
+# SYNC_TOMBSTONE_RETENTION_DAYS; older tokens get 410 and a full resync.
+SYNC_OVERLAP_SECONDS = config('SYNC_OVERLAP_SECONDS', default=5, cast=int)
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+# Page size (and cap) of each collection in a /api/sync/ response
+SYNC_MAX_LIMIT = config('SYNC_MAX_LIMIT', default=200, cast=int)
+
+# Deleted rooms and messages are hidden at once and removed by
+# `python manage.py purge_deleted` (base/soft_delete.py) once they are older
+# than SOFT_DELETE_PURGE_AFTER_HOURS, SOFT_DELETE_PURGE_BATCH_SIZE rows per
+# statement.
+SOFT_DELETE_PURGE_AFTER_HOURS = config('SOFT_DELETE_PURGE_AFTER_HOURS', default=24, cast=int)
+SOFT_DELETE_PURGE_BATCH_SIZE = config('SOFT_DELETE_PURGE_BATCH_SIZE', default=1000, cast=int)
+
+# `python manage.py archive_messages` (base/archive.py) moves messages not
+# updated for MESSAGE_ARCHIVE_AFTER_DAYS out of the hot table,
+# MESSAGE_ARCHIVE_BATCH_SIZE per transaction. Page size (and cap) of
+# /api/rooms/<id>/messages/history/:
+MESSAGE_ARCHIVE_AFTER_DAYS = config('MESSAGE_ARCHIVE_AFTER_DAYS', default=90, cast=int)
+MESSAGE_ARCHIVE_BATCH_SIZE = config('MESSAGE_ARCHIVE_BATCH_SIZE', default=1000, cast=int)
+MESSAGE_HISTORY_MAX_LIMIT = config('MESSAGE_HISTORY_MAX_LIMIT', default=50, cast=int)
+
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     "https://studycomp.vercel.app",  # Production frontend URL - COMMA ADDED
@@ -165,6 +404,10 @@ CORS_ALLOWED_ORIGINS = [
 # Add production frontend URL if needed
 CORS_ALLOW_CREDENTIALS = True
 
+# The replica router's read-your-writes pin, for clients that don't send cookies
+CORS_ALLOW_HEADERS = [*default_headers, 'x-primary-pin']
+CORS_EXPOSE_HEADERS = ['X-Primary-Pin']
+
 CORS_ALLOW_METHODS = [
     "DELETE",
     "GET",
@@ -0,0 +1,188 @@
+"""
+Slow-query log.
+
+An execute wrapper on every database connection times each query. Queries
+slower than ``SLOW_QUERY_THRESHOLD_MS`` are logged to the
+``study_companion_api.slow_queries`` logger together with:
+
+* the view that issued them (the outermost ``base.views`` function),
+* the serializer field being rendered, if any (e.g. ``RoomSerializer.participants``),
+* a normalized SQL fingerprint, so the same ORM call groups together
+  whatever its parameters or ``IN (...)`` list length.
+
+Each fingerprint's count and total/max time is kept in the ``slow_queries``
+cache, in one top-N table (``SLOW_QUERY_TOP_N``, ranked by total time) per
+``SLOW_QUERY_BUCKET_SECONDS`` interval. ``python manage.py slow_queries``
+merges the last ``SLOW_QUERY_WINDOW_BUCKETS`` tables, and older ones expire,
+so a query that was slow last week doesn't outrank today's. A full table
+evicts its smallest entry other than the one just recorded, so a new
+fingerprint gets a chance to accumulate.
+
+With a shared cache (``SLOW_QUERY_CACHE_URL``) the tables cover every
+worker. Updates are serialized by a short lock in the cache (``add`` is
+atomic). It is tried once and never waited for, since the query path would
+wait with it: a sample that finds the table busy is dropped rather than
+lost silently by a concurrent overwrite.
+
+Attribution walks the stack, so it only happens for queries over the
+threshold; fast queries cost two ``perf_counter()`` calls.
+"""
+import hashlib
+import logging
+import re
+import sys
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'slow_queries:lock'
+# How long a crashed writer holds the lock
+LOCK_TIMEOUT_SECONDS = 2
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?|\$\d+)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Replace literals and placeholder lists so one ORM call maps to one string."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()[:12]
+
+
+def attribute(frame):
+    """Return (view, serializer field) for the query being run from ``frame``."""
+    view = field = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module == 'base.views':
+            # Keep going: the outermost base.views frame is the view itself
+            view = f'{module}.{frame.f_code.co_name}'
+        elif field is None and frame.f_code.co_name == 'to_representation':
+            serializer, current = frame.f_locals.get('self'), frame.f_locals.get('field')
+            if serializer is not None and current is not None:
+                field = f'{type(serializer).__name__}.{current.field_name}'
+        frame = frame.f_back
+    return view, field
+
+
+def bucket_key(bucket):
+    return f'slow_queries:{bucket}'
+
+
+def window_keys(now):
+    """Cache keys of the tables in the window ending at ``now``, oldest first."""
+    current = int(now // settings.SLOW_QUERY_BUCKET_SECONDS)
+    return [bucket_key(bucket) for bucket in range(current - settings.SLOW_QUERY_WINDOW_BUCKETS + 1, current + 1)]
+
+
+def _acquire(cache):
+    token = uuid.uuid4().hex
+    return token if cache.add(LOCK_KEY, token, timeout=LOCK_TIMEOUT_SECONDS) else None
+
+
+def _release(cache, token):
+    if cache.get(LOCK_KEY) == token:
+        cache.delete(LOCK_KEY)
+
+
+def record(sql, duration_ms, view, field, now=None):
+    now = time.time() if now is None else now
+    key = fingerprint(sql)
+    cache = caches['slow_queries']
+    table_key = window_keys(now)[-1]
+    token = _acquire(cache)
+    if token is None:
+        logger.debug('Slow-query table busy; dropped a sample of %s', key)
+        return
+    try:
+        top = cache.get(table_key) or {}
+        entry = top.get(key)
+        if entry is None:
+            entry = top[key] = {
+                'fingerprint': key,
+                'sql': normalize_sql(sql),
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+            }
+        entry['count'] += 1
+        entry['total_ms'] += duration_ms
+        entry['max_ms'] = max(entry['max_ms'], duration_ms)
+        entry['view'] = view
+        entry['field'] = field
+        entry['last_seen'] = now
+        if len(top) > settings.SLOW_QUERY_TOP_N:
+            del top[min((k for k in top if k != key), key=lambda k: top[k]['total_ms'])]
+        timeout = settings.SLOW_QUERY_BUCKET_SECONDS * settings.SLOW_QUERY_WINDOW_BUCKETS
+        cache.set(table_key, top, timeout=timeout)
+    finally:
+        _release(cache, token)
+
+
+def top_queries(limit=None, now=None):
+    """The window's tables merged by fingerprint, by total time; view and field are the latest seen."""
+    keys = window_keys(time.time() if now is None else now)
+    tables = caches['slow_queries'].get_many(keys)
+    merged = {}
+    for key in keys:
+        for entry in tables.get(key, {}).values():
+            current = merged.get(entry['fingerprint'])
+            if current is None:
+                merged[entry['fingerprint']] = dict(entry)
+                continue
+            current['count'] += entry['count']
+            current['total_ms'] += entry['total_ms']
+            current['max_ms'] = max(current['max_ms'], entry['max_ms'])
+            current.update(view=entry['view'], field=entry['field'], last_seen=entry['last_seen'])
+    entries = sorted(merged.values(), key=lambda entry: entry['total_ms'], reverse=True)
+    return entries[:limit] if limit else entries
+
+
+def reset():
+    caches['slow_queries'].delete_many(window_keys(time.time()))
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+            view, field = attribute(sys._getframe(1))
+            logger.warning(
+                'Slow query (%.1f ms) [%s] view=%s field=%s: %s',
+                duration_ms, fingerprint(sql), view, field, normalize_sql(sql),
+                extra={'duration_ms': duration_ms, 'view': view, 'field': field},
+            )
+            try:
+                record(sql, duration_ms, view, field)
+            except Exception:
+                # Never fail a request because the stats cache is unavailable
+                logger.exception('Could not record slow query')
+
+
+def _add_wrapper(sender=None, connection=None, **kwargs):
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
+
+
+def install():
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(_add_wrapper)
+    for connection in connections.all(initialized_only=True):
+        _add_wrapper(connection=connection)
@@ -48,12 +48,16 @@ Available commands:
   coverage     - Run tests with coverage report
   fast         - Run tests without migrations
   verbose      - Run tests with verbose output
+  parallel     - Run all tests across one process per CPU core
+  perf         - Check query counts and timings against perf_baseline.json
+                 (add --update to rewrite the baseline)
   help         - Show this help message
 
 Examples:
   python test_runner.py all
   python test_runner.py models
   python test_runner.py coverage
+  python test_runner.py perf --update
         """)
         return
 
@@ -129,6 +133,20 @@ Examples:
             "Verbose Tests"
         )
     
+    elif command == "parallel":
+        success = run_command(
+            f"{base_cmd} base --parallel auto",
+            "All Tests (Parallel)"
+        )
+    
+    elif command == "perf":
+        update = "--update-baseline" if "--update" in sys.argv[2:] else ""
+        success = run_command(
+            f"{base_cmd} base.test_views base.test_integration "
+            f"--testrunner=study_companion_api.perf_runner.PerfTestRunner {update}",
+            "Performance Regression Tests"
+        )
+    
     else:
         print(f"❌ Unknown command: {command}")
         print("Run 'python test_runner.py help' for available commands")